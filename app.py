@@ -1,13 +1,26 @@
 from fastapi import FastAPI
 from cors import setup_cors
-from service.db import init_db
-from routes import auth_routes, resume_routes, job_routes, recommendation_routes, dashboard_routes, user_profile_routes, candidates_routes, matches_routes, chat_routes
+from service.db import init_db, get_db_pool_stats, close_db_pool
+from service.async_db import shutdown_async_db
+from cache import get_cache_stats
+from cpu_pool import start_cpu_pool, shutdown_cpu_pool, get_cpu_pool_stats
+from pdf_loader import get_pdf_extraction_stats
+import tasks  # noqa: F401 - registers the background task handlers
+from task_queue import start_app_task_workers, stop_app_task_workers, get_task_queue_stats
+from config import TASK_WORKERS_IN_APP
+from routes import auth_routes, resume_routes, job_routes, recommendation_routes, dashboard_routes, user_profile_routes, candidates_routes, matches_routes, chat_routes, upload_routes
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    start_cpu_pool()
+    start_app_task_workers(TASK_WORKERS_IN_APP)
     yield
+    stop_app_task_workers()
+    shutdown_cpu_pool()
+    shutdown_async_db()
+    close_db_pool()
 
 app = FastAPI(
     title="Resume_job Matcher",
@@ -32,11 +45,22 @@ app.include_router(user_profile_routes.router)
 app.include_router(candidates_routes.router)
 app.include_router(matches_routes.router)
 app.include_router(chat_routes.router)
+app.include_router(upload_routes.router)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "caches": get_cache_stats(),
+        "cpu_pool": get_cpu_pool_stats(),
+        "db_pool": get_db_pool_stats(),
+        "pdf_extraction": get_pdf_extraction_stats(),
+        "task_queue": get_task_queue_stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -4,7 +4,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from service.users_service import get_user_by_email
+from service.users_service import get_principal
  
 # Secret key (use env var in prod)
 SECRET_KEY = "supersecretkey"
@@ -20,6 +20,10 @@ def verify_password(plain_password, hashed_password):
 def hash_password(password: str):
     return pwd_context.hash(password)
  
+def token_claims(user) -> dict:
+    """Subject and identity claims for a users row (id, username, email, password, role)"""
+    return {"sub": user[2], "uid": user[0], "username": user[1], "role": user[4]}
+ 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
@@ -40,8 +44,13 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
  
-    user = get_user_by_email(email)
+    # Cached per subject, so most requests authenticate without a database call
+    user = get_principal(email)
     if user is None:
         raise credentials_exception
+    # Tokens carry the identity they were issued for; one issued before the account's id or role
+    # changed is rejected (tokens from before these claims existed only carry sub)
+    if "uid" in payload and (payload["uid"] != user[0] or payload.get("role") != user[4]):
+        raise credentials_exception
     return user
  
\ No newline at end of file
@@ -0,0 +1,205 @@
+# bulk_ingest.py
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from config import CPU_POOL_WORKERS, BULK_INSERT_BATCH_SIZE, UPLOAD_CHUNK_SIZE, RESUME_UPLOAD_DIRECTORY
+from entities import extract_entities
+from file_storage import store_file_by_hash, remove_stored_file
+from pdf_loader import extract_text, take_tier_counts, merge_tier_counts, log_pdf_extraction_stats
+from service.resumes_service import insert_resumes_batch, count_resumes_with_hash
+from service.jobs_service import insert_jobs_batch
+
+CHECKPOINT_FILENAME = ".ingest_checkpoint.jsonl"
+
+# Checkpoint statuses that a rerun does not retry ("failed" files are retried)
+FINISHED_STATUSES = ("done", "skipped")
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_checkpoint(checkpoint_path: str) -> dict:
+    """file hash -> latest status recorded in the JSONL checkpoint"""
+    statuses = {}
+    if not os.path.exists(checkpoint_path):
+        return statuses
+    with open(checkpoint_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line after a crash
+            statuses[entry["hash"]] = entry["status"]
+    return statuses
+
+
+def _record(checkpoint, file_hash: str, fname: str, status: str, error: str = None):
+    entry = {"hash": file_hash, "file": fname, "status": status}
+    if error:
+        entry["error"] = error
+    checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _process_file(file_path: str) -> dict:
+    """
+    Worker: parse the PDF and extract entities. Pages are parsed sequentially, the pool parallelizes files.
+    The page tier counters of this file go back with the result, since pool workers' own counters are never reported.
+    """
+    raw_text = extract_text(file_path, parallel=False)
+    if not raw_text or len(raw_text.strip()) < 50:
+        return {"status": "skipped", "error": f"No sufficient text found (length: {len(raw_text)})",
+                "pdf_stats": take_tier_counts()}
+    return {"status": "ok", "text": raw_text, "entities": extract_entities(raw_text), "pdf_stats": take_tier_counts()}
+
+
+def _flush(batch: list, type_: str, checkpoint, stats: dict):
+    """Insert a batch in one transaction, then mark its files done (or failed) in the checkpoint"""
+    if not batch:
+        return
+    if type_ == "resume":
+        inserted = insert_resumes_batch([
+            {"name": item["file"], "description": item["text"], "entities": item["entities"], "file_hash": item["hash"]}
+            for item in batch
+        ])
+    else:
+        inserted = insert_jobs_batch([
+            {"title": item["file"], "description": item["text"], "entities": item["entities"]}
+            for item in batch
+        ])
+
+    if type_ == "resume" and not inserted:
+        # Files copied into storage for this batch are referenced by nothing now
+        for item in batch:
+            if item.get("stored_new") and count_resumes_with_hash(item["hash"]) == 0:
+                remove_stored_file(RESUME_UPLOAD_DIRECTORY, item["hash"])
+
+    status = "done" if inserted else "failed"
+    for item in batch:
+        _record(checkpoint, item["hash"], item["file"], status, None if inserted else "batch insert failed")
+    checkpoint.flush()
+    stats[status] += len(batch)
+    batch.clear()
+
+
+def ingest_folder(folder_path: str, type_: str = "resume", workers: int = CPU_POOL_WORKERS,
+                  batch_size: int = BULK_INSERT_BATCH_SIZE, checkpoint_path: str = None) -> dict:
+    """
+    Ingest every PDF in a folder as resumes or jobs (type_ = "resume" or "job").
+    PDF parsing and NLP run on a process pool, inserts are batched, and each file's outcome
+    is appended to a checkpoint keyed by file hash so a rerun skips finished files.
+    """
+    if not os.path.exists(folder_path):
+        print(f"[ERROR] Folder not found: {folder_path}")
+        return {}
+
+    checkpoint_path = checkpoint_path or os.path.join(folder_path, CHECKPOINT_FILENAME)
+    finished = {h for h, status in load_checkpoint(checkpoint_path).items() if status in FINISHED_STATUSES}
+
+    pdf_files = sorted(f for f in os.listdir(folder_path) if f.lower().endswith(".pdf"))
+    print(f"[INFO] Found {len(pdf_files)} PDF files in {folder_path} ({len(finished)} finished in checkpoint)")
+
+    stats = {"done": 0, "skipped": 0, "failed": 0, "already_done": 0}
+    started = time.perf_counter()
+    batch = []
+    seen = set()
+    last_reported = [0]
+    max_in_flight = max(1, workers) * 4  # Bounded so results for 50k files are never queued at once
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        in_flight = {}
+
+        def collect(done_futures):
+            for future in done_futures:
+                fname, file_hash = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ [ERROR] Failed to process {fname}: {str(e)}")
+                    _record(checkpoint, file_hash, fname, "failed", str(e))
+                    stats["failed"] += 1
+                    continue
+                merge_tier_counts(result.pop("pdf_stats", None))
+                if result["status"] == "skipped":
+                    print(f"⚠️ Skipped {fname}: {result['error']}")
+                    _record(checkpoint, file_hash, fname, "skipped", result["error"])
+                    stats["skipped"] += 1
+                    continue
+                item = {"file": fname, "hash": file_hash, "text": result["text"], "entities": result["entities"]}
+                if type_ == "resume":
+                    # Rows carry file_hash, so the PDF must be in content-addressed storage before
+                    # they are inserted (dedupe and downloads resolve files by hash)
+                    try:
+                        stored = store_file_by_hash(os.path.join(folder_path, fname), RESUME_UPLOAD_DIRECTORY, file_hash)
+                    except OSError as e:
+                        print(f"❌ [ERROR] Could not store {fname}: {str(e)}")
+                        _record(checkpoint, file_hash, fname, "failed", str(e))
+                        stats["failed"] += 1
+                        continue
+                    item["stored_new"] = not stored["existing"]
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    _flush(batch, type_, checkpoint, stats)
+            checkpoint.flush()
+            _report_progress(stats, started, last_reported)
+
+        for fname in pdf_files:
+            file_path = os.path.join(folder_path, fname)
+            try:
+                file_hash = file_sha256(file_path)
+            except OSError as e:
+                print(f"❌ [ERROR] Could not read {fname}: {str(e)}")
+                stats["failed"] += 1
+                continue
+            if file_hash in finished or file_hash in seen:
+                stats["already_done"] += 1
+                continue
+            seen.add(file_hash)
+
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[executor.submit(_process_file, file_path)] = (fname, file_hash)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            collect(done)
+        _flush(batch, type_, checkpoint, stats)
+
+    elapsed = time.perf_counter() - started
+    processed = stats["done"] + stats["skipped"] + stats["failed"]
+    stats["seconds"] = round(elapsed, 2)
+    stats["files_per_second"] = round(processed / elapsed, 2) if elapsed > 0 else 0.0
+    print(f"[INFO] Completed processing {len(pdf_files)} files: {stats['done']} inserted, "
+          f"{stats['skipped']} skipped, {stats['failed']} failed, {stats['already_done']} already done "
+          f"in {stats['seconds']}s ({stats['files_per_second']} files/s)")
+    log_pdf_extraction_stats("bulk ingest")
+    return stats
+
+
+def _report_progress(stats: dict, started: float, last_reported: list, every: int = 100):
+    processed = stats["done"] + stats["skipped"] + stats["failed"]
+    if processed // every > last_reported[0] // every:
+        elapsed = time.perf_counter() - started
+        print(f"[INFO] {processed} files processed ({processed / elapsed:.2f} files/s)")
+    last_reported[0] = processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk ingest a folder of PDF resumes or jobs")
+    parser.add_argument("folder")
+    parser.add_argument("type", nargs="?", choices=["resume", "job"], default="resume")
+    parser.add_argument("--workers", type=int, default=CPU_POOL_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=BULK_INSERT_BATCH_SIZE)
+    parser.add_argument("--checkpoint", default=None)
+    args = parser.parse_args()
+    ingest_folder(args.folder, args.type, workers=args.workers, batch_size=args.batch_size,
+                  checkpoint_path=args.checkpoint)
@@ -0,0 +1,81 @@
+# cache.py
+import time
+import threading
+from collections import OrderedDict
+
+# Named caches, reported by the metrics endpoint
+_caches = {}
+
+
+class TTLCache:
+    """
+    Small in-process cache: entries expire ttl_seconds after they were stored, and the least
+    recently used entry is evicted beyond max_entries. Thread-safe, so it can be shared by
+    route handlers and the async DB threads. Each API process has its own copy, so writers
+    invalidate locally and the TTL bounds how stale other processes can be.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        _caches[name] = self
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Cached value for key, or loader() stored on a miss (None results are not cached)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def get_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
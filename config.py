@@ -1,3 +1,5 @@
+import os
+
 DB_CONFIG = {
     "host": "localhost",
     "user": "root",           
@@ -5,5 +7,75 @@ DB_CONFIG = {
     "database": "resume_matcher",
 }
 
+# MySQL connection pool (per process): idle connections kept, extra connections allowed under
+# load, seconds to wait for a free connection, and idle seconds after which a connection is pinged
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+DB_POOL_PING_INTERVAL_SECONDS = float(os.getenv("DB_POOL_PING_INTERVAL_SECONDS", "30"))
+# Threads running blocking DB calls for async routes (service/async_db.py); at most the pool size
+# so they never queue on the pool
+DB_ASYNC_WORKERS = int(os.getenv("DB_ASYNC_WORKERS", str(DB_POOL_SIZE)))
+
+# Keyset pagination of list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+# Dashboard counters (service/stats_service.py): seconds a process reuses the row counts it read
+DASHBOARD_STATS_TTL_SECONDS = float(os.getenv("DASHBOARD_STATS_TTL_SECONDS", "5"))
+# Per-recruiter candidate statistics; writers in this process invalidate immediately
+CANDIDATE_STATS_TTL_SECONDS = float(os.getenv("CANDIDATE_STATS_TTL_SECONDS", "10"))
+CANDIDATE_STATS_CACHE_SIZE = int(os.getenv("CANDIDATE_STATS_CACHE_SIZE", "1024"))
+
+# Authenticated principals (users rows) cached per token subject by auth.get_current_user
+AUTH_PRINCIPAL_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_TTL_SECONDS", "60"))
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+
+# Entity extraction cache
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "10000"))
+ENTITY_MEMORY_CACHE_SIZE = int(os.getenv("ENTITY_MEMORY_CACHE_SIZE", "256"))
+
+# CPU worker pool for PDF parsing and NLP (process pool used by async routes)
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+# PDF extraction bounds
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_EXTRACT_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "60"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "2"))
+
+# Fast-path quality thresholds; pages failing any of these are re-extracted in layout mode
+PDF_FAST_MIN_CHARS = int(os.getenv("PDF_FAST_MIN_CHARS", "50"))
+PDF_FAST_MAX_AVG_LINE_LENGTH = int(os.getenv("PDF_FAST_MAX_AVG_LINE_LENGTH", "150"))
+PDF_FAST_MAX_GARBLED_RATIO = float(os.getenv("PDF_FAST_MAX_GARBLED_RATIO", "0.02"))
+
+# Content-addressed resume storage (PDFs plus extracted-text sidecars)
+RESUME_UPLOAD_DIRECTORY = os.getenv("RESUME_UPLOAD_DIRECTORY", "uploads/resumes")
+JOB_UPLOAD_DIRECTORY = os.getenv("JOB_UPLOAD_DIRECTORY", "uploads/jobs")
+
+# Uploads are streamed to disk in chunks of this many bytes
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Bulk PDF ingestion (bulk_ingest.py)
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "100"))
 
- 
+# Durable background task queue (task_queue table, task_worker.py)
+TASK_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv("TASK_VISIBILITY_TIMEOUT_SECONDS", "300"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_SECONDS = int(os.getenv("TASK_RETRY_BASE_SECONDS", "10"))
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", "1.0"))
+# Max tasks of each class running at once across all workers; interactive work (a user is
+# waiting) is always claimed before batch work such as full rematch blocks
+TASK_INTERACTIVE_CONCURRENCY = int(os.getenv("TASK_INTERACTIVE_CONCURRENCY", "4"))
+TASK_BATCH_CONCURRENCY = int(os.getenv("TASK_BATCH_CONCURRENCY", "1"))
+# Resumes per full-rematch block (interactive tasks can run between blocks)
+MATCHER_BLOCK_SIZE = int(os.getenv("MATCHER_BLOCK_SIZE", "200"))
+# Rows per fetch when streaming matcher input from server-side cursors (also the IN-list size
+# for embedding lookups)
+MATCHER_FETCH_ROWS = int(os.getenv("MATCHER_FETCH_ROWS", "1000"))
+# Matches per resume materialized in resume_top_matches for /recommendation/getRecommendations
+# (larger top_n requests are served from matches directly)
+RESUME_TOP_MATCHES = int(os.getenv("RESUME_TOP_MATCHES", "50"))
+# Description embeddings kept in the embedding_cache table (least recently used evicted)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+# Worker threads inside the API process (0 = only external task_worker.py processes)
+TASK_WORKERS_IN_APP = int(os.getenv("TASK_WORKERS_IN_APP", "1"))
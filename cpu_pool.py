@@ -0,0 +1,72 @@
+# cpu_pool.py
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import CPU_POOL_WORKERS
+
+# Dedicated process pool for CPU-bound work (pdfplumber, spaCy) so async routes
+# can await it without blocking the event loop. Stats are per API process.
+_executor = None
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "total_seconds": 0.0,
+}
+
+
+def start_cpu_pool():
+    """Create the worker pool (called from the app lifespan)."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS)
+        print(f"[INFO] CPU worker pool started with {CPU_POOL_WORKERS} workers")
+    return _executor
+
+
+def shutdown_cpu_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        print("[INFO] CPU worker pool stopped")
+
+
+async def run_cpu_bound(func, *args):
+    """Run a picklable function with args on the CPU pool and await its result."""
+    executor = start_cpu_pool()
+    loop = asyncio.get_running_loop()
+
+    _stats["submitted"] += 1
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    started = time.perf_counter()
+    try:
+        result = await loop.run_in_executor(executor, func, *args)
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    else:
+        # Only successful runs count as completed and towards avg_seconds
+        _stats["completed"] += 1
+        _stats["total_seconds"] += time.perf_counter() - started
+        return result
+    finally:
+        _stats["in_flight"] -= 1
+
+
+def get_cpu_pool_stats() -> dict:
+    """Queue depth and throughput counters for the metrics endpoint."""
+    completed = _stats["completed"]
+    return {
+        "workers": CPU_POOL_WORKERS,
+        "running": min(_stats["in_flight"], CPU_POOL_WORKERS),
+        "queue_depth": max(0, _stats["in_flight"] - CPU_POOL_WORKERS),
+        "max_in_flight": _stats["max_in_flight"],
+        "submitted": _stats["submitted"],
+        "completed": completed,
+        "failed": _stats["failed"],
+        "avg_seconds": round(_stats["total_seconds"] / completed, 4) if completed else 0.0,
+    }
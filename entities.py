@@ -1,9 +1,16 @@
 import csv
 import re
+import copy
+import hashlib
 import spacy
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from spacy.matcher import PhraseMatcher
 from typing import List
 from preprocess import clean_text, normalize_tokens
+from sections import segment_document, select_sections, EDUCATION_SECTION_TYPES, EXPERIENCE_SECTION_TYPES
+from config import ENTITY_MEMORY_CACHE_SIZE
+from service.entity_cache_service import get_cached_entities, store_cached_entities
  
 # -------------------------------
 # Load spaCy model (English NER)
@@ -18,12 +25,59 @@ with open("data/skills.csv", "r", encoding="utf-8") as f:
  
 SKILLS = [skill for skill in all_skills if len(skill) > 2 and not skill.isdigit()]
 print(f"Filtered skills inline: {len(SKILLS)} skills loaded")
+
+# -------------------------------
+# Cache versioning
+# -------------------------------
+# Bump EXTRACTOR_VERSION whenever extraction logic changes so cached results are not reused.
+EXTRACTOR_VERSION = "4"
+TAXONOMY_VERSION = hashlib.sha1("\n".join(SKILLS).encode("utf-8")).hexdigest()[:12]
  
 # Create a PhraseMatcher for faster matching
 skill_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
 patterns = [nlp.make_doc(skill) for skill in SKILLS]
 skill_matcher.add("SKILL", patterns) 
  
+# -------------------------------
+# Combined pattern tables
+# -------------------------------
+def compile_alternation(table: dict, lookahead: bool = False, flags: int = 0):
+    """
+    Compile a {pattern: value} table into one regex with a named group per entry.
+    Returns (regex, {group_name: (table_index, value)}). With lookahead=True the
+    alternation is wrapped in a zero-width lookahead so every start position is
+    tried and overlapping hits from different entries are all reported.
+    """
+    values = {}
+    parts = []
+    for index, (pattern, value) in enumerate(table.items()):
+        name = f"p{index}"
+        values[name] = (index, value)
+        parts.append(f"(?P<{name}>{pattern})")
+    body = "|".join(parts)
+    if lookahead:
+        body = f"(?=(?:{body}))"
+    return re.compile(body, flags), values
+
+
+SKILL_VARIATIONS = {
+    r'\bcore\s+java\b': 'java',
+    r'\bjava\s*script\b': 'javascript',
+    r'\bnode\.?js\b': 'nodejs',
+    r'\breact\.?js\b': 'react',
+    r'\bspring\s+boot\b': 'spring boot',
+    r'\bhibernate/jpa\b': ['hibernate', 'jpa'],
+    r'\bmy\s*sql\b': 'mysql',
+    r'\bpost\s*gre\s*sql\b': 'postgresql',
+    r'\bmongo\s*db\b': 'mongodb',
+    r'\bc\+\+\b': 'c++',
+    r'\bc#\b': 'c#',
+    r'\b\.net\b': '.net',
+    r'\brest\s*(?:api|ful)?\b': 'rest',
+    r'\bci/cd\b': 'ci/cd'
+}
+SKILL_VARIATION_REGEX, SKILL_VARIATION_VALUES = compile_alternation(SKILL_VARIATIONS, lookahead=True)
+
 # -------------------------------
 # Skills Extraction (Hybrid: CSV + NER)
 # -------------------------------
@@ -40,30 +94,13 @@ def extract_skills(text: str) -> list:
         span = doc[start:end]
         found_skills.add(span.text.lower())
  
-    # ---- 2) Regex-based normalization for common variants ----
-    skill_variations = {
-        r'\bcore\s+java\b': 'java',
-        r'\bjava\s*script\b': 'javascript',
-        r'\bnode\.?js\b': 'nodejs',
-        r'\breact\.?js\b': 'react',
-        r'\bspring\s+boot\b': 'spring boot',
-        r'\bhibernate/jpa\b': ['hibernate', 'jpa'],
-        r'\bmy\s*sql\b': 'mysql',
-        r'\bpost\s*gre\s*sql\b': 'postgresql',
-        r'\bmongo\s*db\b': 'mongodb',
-        r'\bc\+\+\b': 'c++',
-        r'\bc#\b': 'c#',
-        r'\b\.net\b': '.net',
-        r'\brest\s*(?:api|ful)?\b': 'rest',
-        r'\bci/cd\b': 'ci/cd'
-    }
-    for pattern, mapped_skills in skill_variations.items():
-        if re.search(pattern, text_normalized):
-            if isinstance(mapped_skills, list):
-                for mapped_skill in mapped_skills:
-                    found_skills.add(mapped_skill)
-            else:
-                found_skills.add(mapped_skills)
+    # ---- 2) Regex-based normalization for common variants (single combined scan) ----
+    for match in SKILL_VARIATION_REGEX.finditer(text_normalized):
+        _, mapped_skills = SKILL_VARIATION_VALUES[match.lastgroup]
+        if isinstance(mapped_skills, list):
+            found_skills.update(mapped_skills)
+        else:
+            found_skills.add(mapped_skills)
  
     # ---- 3) Fallback with spaCy NER (ORG/PRODUCT/WORK_OF_ART often contain tools/skills) ----
     for ent in doc.ents:
@@ -134,6 +171,11 @@ SPECIALIZATION_MAP = {
     r"arts": "Arts",
     r"engineering": "Engineering",
 }
+
+DEGREE_REGEX, DEGREE_VALUES = compile_alternation(DEGREE_CANONICAL, flags=re.IGNORECASE)
+SPECIALIZATION_REGEX, SPECIALIZATION_VALUES = compile_alternation(
+    SPECIALIZATION_MAP, lookahead=True, flags=re.IGNORECASE
+)
  
 # Enhanced experience patterns
 EXPERIENCE_PATTERNS = [
@@ -152,248 +194,288 @@ def normalize_text_for_matching(text: str) -> str:
     return re.sub(r'[^\w\s]', ' ', text.lower()).strip()
  
  
+def _first_specialization(context: str):
+    """Return the highest-priority SPECIALIZATION_MAP entry found anywhere in context"""
+    best = None
+    for match in SPECIALIZATION_REGEX.finditer(context):
+        order, canon = SPECIALIZATION_VALUES[match.lastgroup]
+        if best is None or order < best[0]:
+            best = (order, canon)
+            if order == 0:
+                break
+    return best[1] if best else None
+
+
 def canonical_degree_from_text(text: str) -> List[str]:
     """Extract and canonicalize degrees from text"""
     txt = normalize_text_for_matching(text)
-    out = []
+    found = []
     
-    for patt, canon in DEGREE_CANONICAL.items():
-        matches = re.finditer(patt, txt, re.IGNORECASE)
-        for match in matches:
-            # Look for specialization in the surrounding context
-            context_start = max(0, match.start() - 100)
-            context_end = min(len(txt), match.end() + 100)
-            context = txt[context_start:context_end]
-            
-            spec = None
-            for sp_patt, sp_canon in SPECIALIZATION_MAP.items():
-                if re.search(sp_patt, context, re.IGNORECASE):
-                    spec = sp_canon
-                    break
-            
-            degree_name = f"{canon} ({spec})" if spec else canon
-            if degree_name not in out:
-                out.append(degree_name)
+    for match in DEGREE_REGEX.finditer(txt):
+        order, canon = DEGREE_VALUES[match.lastgroup]
+
+        # Look for specialization in the surrounding context
+        context_start = max(0, match.start() - 100)
+        context_end = min(len(txt), match.end() + 100)
+        spec = _first_specialization(txt[context_start:context_end])
+        
+        degree_name = f"{canon} ({spec})" if spec else canon
+        found.append((order, match.start(), degree_name))
     
+    # Keep the table order of the old per-pattern loop
+    out = []
+    for _, _, degree_name in sorted(found):
+        if degree_name not in out:
+            out.append(degree_name)
     return out
  
 
-def extract_education(text: str) -> List[str]:
-    """Enhanced education extraction with multiple approaches"""
+def extract_education(text: str, sections: List[dict] = None) -> List[str]:
+    """Education extraction restricted to education/requirements sections of the document"""
     if not text:
         return []
+    if sections is None:
+        sections = segment_document(text)
  
     results = []
+
+    def add(value):
+        if value not in results:
+            results.append(value)
     
-    # Method 1: Direct degree extraction from full text
-    degrees = canonical_degree_from_text(text)
-    results.extend(degrees)
-    
-    # Method 2: Look for education sections
-    education_sections = re.findall(
-        r'(?:education|qualification|academic|degree).*?(?=\n\n|\n[A-Z]|\n\d+\.|\Z)', 
-        text, 
-        re.IGNORECASE | re.DOTALL
-    )
+    for section in select_sections(sections, EDUCATION_SECTION_TYPES):
+        section_text = section["text"]
+
+        # Method 1: Degrees with section-wide specialization context
+        for deg in canonical_degree_from_text(section_text):
+            add(deg)
     
-    for section in education_sections:
-        section_degrees = canonical_degree_from_text(section)
-        for deg in section_degrees:
-            if deg not in results:
-                results.append(deg)
+        # Method 2: NER approach for institutions
+        doc = nlp(section_text)
+        for ent in doc.ents:
+            if ent.label_ in ("ORG", "FAC"):
+                ent_text = ent.text.strip()
+                # Check if it's likely an educational institution
+                if re.search(r"(university|college|institute|school|iit|nit|bits)", ent_text, re.I):
+                    add(ent_text)
     
-    # Method 3: NER approach for institutions
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ in ("ORG", "FAC"):
-            ent_text = ent.text.strip()
-            # Check if it's likely an educational institution
-            if re.search(r"(university|college|institute|school|iit|nit|bits)", ent_text, re.I):
-                if ent_text not in results:
-                    results.append(ent_text)
-    
-    # Method 4: Line-by-line analysis for missed degrees
-    lines = text.split('\n')
-    for line in lines:
-        line_degrees = canonical_degree_from_text(line)
-        for deg in line_degrees:
-            if deg not in results:
-                results.append(deg)
+        # Method 3: Line-by-line analysis for specializations stated on the degree's own line
+        for line in section_text.split('\n'):
+            for deg in canonical_degree_from_text(line):
+                add(deg)
  
-    return list(set(results))
+    return results
  
 
-def extract_experience_list(text: str) -> List[str]:
-    """Enhanced experience extraction with NER context and number word extraction"""
+WORD_TO_NUM = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+    'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20
+}
+
+# One scanner for everything extract_experience_list needs. The zero-width lookahead tries
+# every start position once, so overlapping mentions ("5 to 7 years" -> 5 and 7) are all seen.
+# "over N years" is its own alternative so its span (and keyword window) starts at "over".
+# "work" also covers "working"/"worked", matching the old substring keyword checks.
+EXPERIENCE_SCANNER = re.compile(
+    r"(?=(?P<over>(?:over|more\s+than)\s+(?P<over_value>\d+|" + "|".join(WORD_TO_NUM) + r")\s+(?:years?|yrs?))"
+    r"|(?P<range>(?<!\d)(?P<range_value>\d+)\s+to\s+\d+\s+(?:years?|yrs?))"
+    r"|(?P<years>(?<!\d)(?P<years_value>\d+)\s*\+?\s*(?:years?|yrs?))"
+    r"|(?P<words>(?P<words_value>" + "|".join(WORD_TO_NUM) + r")\s+(?:years?|yrs?))"
+    r"|(?P<dates>(?P<date_start>\d{4})\s*[-–]\s*(?P<date_end>\d{4}))"
+    r"|(?P<keyword>experience|employment|professional|career|work)"
+    r"|(?P<boundary>\n(?:\n|[a-z]|\d+\.)))",
+    re.IGNORECASE,
+)
+SECTION_KEYWORDS = ("experience", "work", "employment", "career")
+
+
+def scan_experience_tokens(text: str) -> dict:
+    """
+    Single pass over text collecting year mentions, date ranges, experience keywords
+    and section boundaries, each with character offsets.
+    """
+    tokens = {"mentions": [], "dates": [], "keywords": [], "boundaries": []}
+    for match in EXPERIENCE_SCANNER.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span(kind)
+        if kind in ("over", "range", "years", "words"):
+            value = match.group(f"{kind}_value").lower()
+            years = int(value) if value.isdigit() else WORD_TO_NUM[value]
+            tokens["mentions"].append((start, end, years))
+        elif kind == "dates":
+            years_diff = int(match.group("date_end")) - int(match.group("date_start"))
+            tokens["dates"].append((start, end, years_diff))
+        elif kind == "keyword":
+            tokens["keywords"].append((start, end, match.group("keyword").lower()))
+        else:
+            tokens["boundaries"].append(start)
+    return tokens
+
+
+def _has_keyword_within(keyword_starts: list, keyword_ends: list, lo: int, hi: int) -> bool:
+    """True if a keyword lies entirely inside [lo, hi). Keyword spans never overlap, so ends are sorted too."""
+    i = bisect_left(keyword_starts, lo)
+    return i < len(keyword_starts) and keyword_ends[i] <= hi
+
+
+def extract_experience_list(text: str, sections: List[dict] = None) -> List[str]:
+    """Experience extraction from one offset-based scan per relevant section plus spaCy sentence context"""
     if not text:
         return []
+    if sections is None:
+        sections = segment_document(text)
  
     out = []
-    text_lower = text.lower()
-    
-    # Process with spaCy for NER context
-    doc = nlp(text)
-    
-    # Word-to-number mapping for converting written numbers
-    word_to_num = {
-        'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-        'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
-        'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20
-    }
-    
-    # Enhanced experience patterns including word numbers
-    enhanced_patterns = [
-        r"(\d+)\s*\+?\s*(?:years?|yrs?)\s+(?:of\s+)?experience",
-        r"experience\s*:?\s*(\d+)\s*\+?\s*(?:years?|yrs?)",
-        r"(\d+)\s*\+?\s*(?:years?|yrs?)",
-        r"(\d+)\+\s*(?:years?|yrs?)",
-        r"over\s+(\d+)\s+(?:years?|yrs?)",
-        r"more\s+than\s+(\d+)\s+(?:years?|yrs?)",
-        r"(\d+)\s+to\s+\d+\s+(?:years?|yrs?)",
-        # Word number patterns
-        r"(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty)\s+(?:years?|yrs?)\s+(?:of\s+)?experience",
-        r"experience\s*:?\s*(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty)\s+(?:years?|yrs?)",
-        r"(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty)\s+(?:years?|yrs?)",
-        r"over\s+(one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty)\s+(?:years?|yrs?)",
-    ]
-    
-    # Method 1: NER-based context-aware extraction
-    experience_keywords = ['experience', 'work', 'working', 'worked', 'employment', 'career', 'professional']
-    
-    for sent in doc.sents:
-        sent_text = sent.text.lower()
-        
-        # Check if sentence contains experience-related keywords
-        has_experience_context = any(keyword in sent_text for keyword in experience_keywords)
-        
-        if has_experience_context:
-            # Look for numeric entities in experience context
+
+    def add(years, max_years=50):
+        if 0 < years < max_years:
+            val = f"{years} years"
+            if val not in out:
+                out.append(val)
+
+    mentions = []
+    dates = []
+    keywords = []
+    experience_spans = []
+
+    for section in select_sections(sections, EXPERIENCE_SECTION_TYPES):
+        offset = section["start"]
+        section_text = section["text"]
+        tokens = scan_experience_tokens(section_text)
+        section_mentions = tokens["mentions"]
+        mention_starts = [m[0] for m in section_mentions]
+        keyword_starts = [k[0] for k in tokens["keywords"]]
+        keyword_ends = [k[1] for k in tokens["keywords"]]
+
+        # Method 1: sentences with experience keywords (NER cardinals, then pattern mentions)
+        doc = nlp(section_text)
+        for sent in doc.sents:
+            if not _has_keyword_within(keyword_starts, keyword_ends, sent.start_char, sent.end_char):
+                continue
+
             for ent in sent.ents:
-                if ent.label_ == "CARDINAL":  # Numbers
-                    try:
-                        num_value = int(ent.text)
-                        if 0 < num_value < 50:
-                            # Check surrounding context for year indicators
-                            context_words = sent_text.split()
-                            ent_words = ent.text.lower().split()
-                            
-                            for i, word in enumerate(context_words):
-                                if any(ent_word in word for ent_word in ent_words):
-                                    # Check next few words for year indicators
-                                    next_words = context_words[i:i+3]
-                                    if any(indicator in ' '.join(next_words) for indicator in ['year', 'years', 'yr', 'yrs']):
-                                        val = f"{num_value} years"
-                                        if val not in out:
-                                            out.append(val)
-                    except ValueError:
-                        continue
-            
-            # Also check with regex patterns in experience context
-            for pattern in enhanced_patterns:
-                matches = re.findall(pattern, sent_text)
-                for match in matches:
-                    try:
-                        if match.isdigit():
-                            years = int(match)
-                        else:
-                            years = word_to_num.get(match.lower(), 0)
-                        
-                        if years > 0 and years < 50:
-                            val = f"{years} years"
-                            if val not in out:
-                                out.append(val)
-                    except (ValueError, AttributeError):
-                        continue
-    
-    # Method 2: Traditional regex patterns with context checking
-    for pattern in enhanced_patterns:
-        for match in re.finditer(pattern, text_lower):
-            # Get surrounding context (50 characters before and after)
-            start = max(0, match.start() - 50)
-            end = min(len(text_lower), match.end() + 50)
-            context = text_lower[start:end]
-            
-            # Check if context contains experience-related keywords
-            has_context = any(keyword in context for keyword in experience_keywords)
-            
-            if has_context:
-                matched_text = match.group(1)
-                try:
-                    if matched_text.isdigit():
-                        years = int(matched_text)
-                    else:
-                        years = word_to_num.get(matched_text.lower(), 0)
-                    
-                    if years > 0 and years < 50:
-                        val = f"{years} years"
-                        if val not in out:
-                            out.append(val)
-                except (ValueError, AttributeError):
+                if ent.label_ != "CARDINAL" or not ent.text.isdigit():
                     continue
+                # Year indicator within the next couple of tokens after the number
+                following = doc[ent.start:min(len(doc), ent.end + 2)].text.lower()
+                if "year" in following or "yr" in following:
+                    add(int(ent.text))
+
+            i = bisect_left(mention_starts, sent.start_char)
+            while i < len(section_mentions) and section_mentions[i][0] < sent.end_char:
+                if section_mentions[i][1] <= sent.end_char:
+                    add(section_mentions[i][2])
+                i += 1
+
+        mentions.extend((start + offset, end + offset, years) for start, end, years in section_mentions)
+        dates.extend((start + offset, end + offset, diff) for start, end, diff in tokens["dates"])
+        keywords.extend((start + offset, end + offset) for start, end, _ in tokens["keywords"])
+
+        # A typed experience section counts as a whole; elsewhere an experience span runs from
+        # a section keyword to the next blank line, numbered item or line starting with a letter
+        if section["type"] == "experience":
+            experience_spans.append((section["start"], section["end"]))
+            continue
+        boundaries = tokens["boundaries"]
+        for start, end, keyword in tokens["keywords"]:
+            if keyword in SECTION_KEYWORDS:
+                b = bisect_left(boundaries, end)
+                span_end = boundaries[b] if b < len(boundaries) else len(section_text)
+                experience_spans.append((start + offset, span_end + offset))
+
+    keyword_starts = [k[0] for k in keywords]
+    keyword_ends = [k[1] for k in keywords]
+    span_starts = [span[0] for span in experience_spans]
+
+    def in_experience_span(start, end):
+        i = bisect_right(span_starts, start) - 1
+        return i >= 0 and end <= experience_spans[i][1]
     
-    # Method 4: Look in experience sections specifically
-    experience_sections = re.findall(
-        r'(?:experience|work|employment|career).*?(?=\n\n|\n[A-Z]|\n\d+\.|\Z)', 
-        text_lower, 
-        re.IGNORECASE | re.DOTALL
-    )
+    # Method 2: mentions with an experience keyword within 50 characters
+    for start, end, years in mentions:
+        if _has_keyword_within(keyword_starts, keyword_ends, start - 50, end + 50):
+            add(years)
     
-    for section in experience_sections:
-        for pattern in enhanced_patterns:
-            matches = re.findall(pattern, section)
-            for match in matches:
-                try:
-                    if match.isdigit():
-                        years = int(match)
-                    else:
-                        years = word_to_num.get(match.lower(), 0)
-                    
-                    if years > 0 and years < 50:
-                        val = f"{years} years"
-                        if val not in out:
-                            out.append(val)
-                except (ValueError, AttributeError):
-                    continue
+    # Method 3: mentions inside an experience section
+    for start, end, years in mentions:
+        if in_experience_span(start, end):
+            add(years)
     
-    # Method 5: Date range analysis (e.g., "2020-2023" implies 3 years)
-    date_ranges = re.findall(r'(\d{4})\s*[-–]\s*(\d{4})', text)
-    for start_year, end_year in date_ranges:
-        try:
-            years_diff = int(end_year) - int(start_year)
-            if 0 < years_diff < 20:  # Reasonable range
-                # Check if this date range is in experience context
-                date_pattern = f"{start_year}.*{end_year}"
-                for match in re.finditer(date_pattern, text):
-                    start = max(0, match.start() - 100)
-                    end = min(len(text), match.end() + 100)
-                    context = text[start:end].lower()
-                    
-                    if any(keyword in context for keyword in experience_keywords):
-                        val = f"{years_diff} years"
-                        if val not in out:
-                            out.append(val)
-                        break
-        except ValueError:
-            continue
+    # Method 4: date ranges (e.g., "2020-2023" implies 3 years) in experience sections or near keywords
+    for start, end, years_diff in dates:
+        if in_experience_span(start, end) or _has_keyword_within(keyword_starts, keyword_ends, start - 100, end + 100):
+            add(years_diff, max_years=20)
     
     return out
  
+# -------------------------------
+# Entity Cache
+# -------------------------------
+_memory_cache = OrderedDict()
+
+
+def normalize_text_for_cache(text: str) -> str:
+    """Collapse whitespace per line so re-extracted copies of the same document hash identically"""
+    if not text:
+        return ""
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    normalized = "\n".join(lines).strip()
+    return re.sub(r'\n{3,}', '\n\n', normalized)
+
+
+def entity_cache_key(normalized_text: str) -> str:
+    """SHA-256 over extractor version, taxonomy version and normalized text"""
+    digest = hashlib.sha256()
+    digest.update(f"{EXTRACTOR_VERSION}:{TAXONOMY_VERSION}:".encode("utf-8"))
+    digest.update(normalized_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _remember(cache_key: str, entities: dict):
+    _memory_cache[cache_key] = entities
+    _memory_cache.move_to_end(cache_key)
+    while len(_memory_cache) > ENTITY_MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
 # -------------------------------
 # Main Entity Extractor
 # -------------------------------
-def extract_entities(text: str) -> dict:
-    """Extract all entities from text with debugging info"""
+def extract_entities(text: str, use_cache: bool = True) -> dict:
+    """Extract all entities from text, reusing cached results for identical normalized text"""
+    text = normalize_text_for_cache(text)
+    cache_key = entity_cache_key(text)
+
+    if use_cache:
+        if cache_key in _memory_cache:
+            _memory_cache.move_to_end(cache_key)
+            print(f"[DEBUG] Entity cache hit (memory): {cache_key[:12]}")
+            # Callers mutate the returned lists, so never hand out the cached object itself
+            return copy.deepcopy(_memory_cache[cache_key])
+
+        cached = get_cached_entities(cache_key)
+        if cached is not None:
+            print(f"[DEBUG] Entity cache hit (db): {cache_key[:12]}")
+            _remember(cache_key, copy.deepcopy(cached))
+            return cached
     
     # Add some debugging
     print(f"[DEBUG] Text length: {len(text)} characters")
     print(f"[DEBUG] First 200 chars: {text[:200]}")
     
+    # Segment once; education and experience only look at their relevant sections
+    sections = segment_document(text)
     entities = {
         "skills": extract_skills(text),
-        "education": extract_education(text),
-        "experience": extract_experience_list(text),
+        "education": extract_education(text, sections),
+        "experience": extract_experience_list(text, sections),
     }
     
     print(f"[DEBUG] Extracted entities: {entities}")
+
+    if use_cache:
+        _remember(cache_key, copy.deepcopy(entities))
+        store_cached_entities(cache_key, entities)
     return entities
\ No newline at end of file
@@ -0,0 +1,232 @@
+# file_storage.py
+import os
+import re
+import glob
+import gzip
+import json
+import uuid
+import shutil
+import hashlib
+import aiofiles
+import aiofiles.os
+from fastapi import Request, UploadFile
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from config import UPLOAD_CHUNK_SIZE
+
+RANGE_REGEX = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+async def _stream_to_temp(upload: UploadFile, directory: str, chunk_size: int):
+    """Copy an upload into a temporary file in `directory`, hashing it on the way"""
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                await f.write(chunk)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+
+async def save_upload_to_disk(upload: UploadFile, file_path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> dict:
+    """
+    Stream an upload to file_path in fixed-size chunks, hashing it on the way, so memory
+    per upload stays constant regardless of file size. The file is written under a
+    temporary name and renamed into place, so readers never see a partial file and an
+    existing file is only replaced once the new one is complete.
+    Returns {"path", "sha256", "size"}.
+    """
+    tmp_path, sha256, size = await _stream_to_temp(upload, os.path.dirname(file_path) or ".", chunk_size)
+    try:
+        await aiofiles.os.replace(tmp_path, file_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return {"path": file_path, "sha256": sha256, "size": size}
+
+
+# -------------------------------
+# Content-addressed storage
+# -------------------------------
+def content_path(root: str, file_hash: str, extension: str = ".pdf") -> str:
+    """Storage path for a file hash, sharded by the first two hex digits"""
+    return os.path.join(root, file_hash[:2], f"{file_hash}{extension}")
+
+
+async def store_upload_by_hash(upload: UploadFile, root: str, extension: str = ".pdf",
+                               chunk_size: int = UPLOAD_CHUNK_SIZE) -> dict:
+    """
+    Stream an upload into content-addressed storage under `root`. Identical content is
+    stored once; "existing" is True when the file was already present.
+    Returns {"path", "sha256", "size", "existing"}.
+    """
+    tmp_path, sha256, size = await _stream_to_temp(upload, root, chunk_size)
+    path = content_path(root, sha256, extension)
+    try:
+        existing = os.path.exists(path)
+        if existing:
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            await aiofiles.os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {"path": path, "sha256": sha256, "size": size, "existing": existing}
+
+
+def store_file_by_hash(source_path: str, root: str, file_hash: str, extension: str = ".pdf") -> dict:
+    """
+    Copy a local file (already hashed by the caller) into content-addressed storage under `root`.
+    Like store_upload_by_hash, the copy is renamed into place and identical content is stored once.
+    Returns {"path", "sha256", "existing"}.
+    """
+    path = content_path(root, file_hash, extension)
+    if os.path.exists(path):
+        return {"path": path, "sha256": file_hash, "existing": True}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = os.path.join(root, f".{uuid.uuid4().hex}.part")
+    try:
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {"path": path, "sha256": file_hash, "existing": False}
+
+
+def remove_stored_file(root: str, file_hash: str, extension: str = ".pdf") -> bool:
+    """
+    Delete a stored file that is no longer referenced, together with its sidecars
+    (<hash>.*), and its shard folder once empty
+    """
+    path = content_path(root, file_hash, extension)
+    shard = os.path.dirname(path)
+    try:
+        if not os.path.exists(path):
+            return False
+        for stored in glob.glob(os.path.join(shard, f"{file_hash}.*")):
+            os.remove(stored)
+        if not os.listdir(shard):
+            os.rmdir(shard)
+        print(f"[INFO] Removed unreferenced file {path}")
+        return True
+    except OSError as e:
+        print(f"[WARNING] Could not remove stored file {path}: {str(e)}")
+        return False
+
+
+def write_json_gz(path: str, data) -> None:
+    """Write gzip-compressed JSON atomically (temporary file + rename)"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json_gz(path: str):
+    """Read gzip-compressed JSON, or None if the file is missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable file {path}: {str(e)}")
+        return None
+
+
+# -------------------------------
+# Conditional / range downloads
+# -------------------------------
+def _etag_matches(header_value: str, etag: str) -> bool:
+    if not header_value:
+        return False
+    candidates = [tag.strip() for tag in header_value.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _parse_range(header_value: str, size: int):
+    """(start, end) inclusive for a single "bytes=" range, "invalid" if unsatisfiable, None to ignore"""
+    match = RANGE_REGEX.match(header_value.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None  # Syntactically invalid ranges are ignored
+    if start >= size:
+        return "invalid"
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+async def _iter_file_range(path: str, start: int, end: int, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def conditional_file_response(request: Request, path: str, etag: str, filename: str,
+                              media_type: str = "application/pdf") -> Response:
+    """
+    Serve a stored file with a strong ETag: 304 when If-None-Match matches, 206 for a single
+    byte range (honouring If-Range), otherwise the full file. Clients must revalidate, so a
+    repeat download costs a 304 instead of the whole file.
+    """
+    etag = f'"{etag}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = os.path.getsize(path)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range == "invalid":
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update({
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            })
+            return StreamingResponse(_iter_file_range(path, start, end), status_code=206,
+                                     media_type=media_type, headers=headers)
+
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
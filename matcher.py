@@ -7,8 +7,16 @@ from sklearn.metrics.pairwise import cosine_similarity as sklearn_cosine_similar
 from difflib import SequenceMatcher
 import torch
 
+BERT_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Bump when the model or _prepare_text_for_bert changes: cached description embeddings are keyed by it
+EMBEDDING_VERSION = "1"
+EMBEDDING_CACHE_KEY = f"{BERT_MODEL_NAME}@{EMBEDDING_VERSION}"
+
+_bert_matcher = None
+
+
 class BERTMatcher:
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
+    def __init__(self, model_name=BERT_MODEL_NAME):
         print(f"Loading BERT model: {model_name}")
         self.model = SentenceTransformer(model_name)
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -36,6 +44,14 @@ class BERTMatcher:
             text = ' '.join(words[:400])
         return text
 
+def get_bert_matcher() -> BERTMatcher:
+    """Process-wide matcher, so the model is loaded once rather than on every scoring run"""
+    global _bert_matcher
+    if _bert_matcher is None:
+        _bert_matcher = BERTMatcher()
+    return _bert_matcher
+
+
 def safe_json(val):
     if val is None:
         return []
@@ -404,7 +420,16 @@ def compute_similarity_bert(resumes, jobs, posted_jobs=None,
                            weight_bert=0.20,
                            weight_skills=0.50,
                            weight_education=0.20,
-                           weight_experience=0.10):
+                           weight_experience=0.10,
+                           resume_embeddings=None,
+                           job_embeddings=None):
+    """
+    Score every resume against every job. Rows are positional: resumes (id, user_id, name,
+    description, skills, education, experience), jobs (id, title, description, skills,
+    education, experience, company, location, creator_email).
+    resume_embeddings / job_embeddings (aligned with resumes and jobs + posted_jobs) skip
+    encoding the descriptions; the description columns are not read then.
+    """
     if not resumes:
         return []
 
@@ -424,19 +449,20 @@ def compute_similarity_bert(resumes, jobs, posted_jobs=None,
 
     print(f"Computing similarities for {len(resumes)} resumes and {len(all_jobs)} jobs...")
     
-    bert_matcher = BERTMatcher()
+    bert_matcher = get_bert_matcher()
 
-    resume_texts = [row[3] if len(row) > 2 and row[3] else "" for row in resumes]
-    job_texts = [row[2] if len(row) > 2 and row[2] else "" for row in all_jobs]
+    if resume_embeddings is None or job_embeddings is None:
+        resume_texts = [row[3] if len(row) > 2 and row[3] else "" for row in resumes]
+        job_texts = [row[2] if len(row) > 2 and row[2] else "" for row in all_jobs]
 
-    print("Encoding texts with BERT...")
-    resume_embeddings = bert_matcher.encode_texts(resume_texts)
-    job_embeddings = bert_matcher.encode_texts(job_texts)
+        print("Encoding texts with BERT...")
+        resume_embeddings = bert_matcher.encode_texts(resume_texts)
+        job_embeddings = bert_matcher.encode_texts(job_texts)
 
     if len(resume_embeddings) > 0 and len(job_embeddings) > 0:
         bert_similarity_matrix = sklearn_cosine_similarity(resume_embeddings, job_embeddings)
     else:
-        bert_similarity_matrix = np.zeros((len(resume_texts), len(job_texts)))
+        bert_similarity_matrix = np.zeros((len(resumes), len(all_jobs)))
 
     resume_skills_list = [safe_json(r[4]) for r in resumes]
     job_skills_list = [safe_json(j[3]) for j in all_jobs]
@@ -75,4 +75,5 @@ class CandidateStatisticsResponse(BaseModel):
     recent_candidates: int
 
 class CandidateListResponse(BaseModel):
-    candidates: List[CandidateResponse]
\ No newline at end of file
+    candidates: List[CandidateResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -22,6 +22,7 @@ class JobUploadResponse(BaseModel):
 class JobListResponse(BaseModel):
     jobs: List[dict]
     posted_jobs: List[dict]
+    next_cursor: Optional[str] = None
 
 class JobPosting(BaseModel):
     title: str
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional, Literal
+from datetime import datetime
+
+UploadStatus = Literal["queued", "extracting", "extracted", "stored", "scored", "failed"]
+
+class UploadStatusResponse(BaseModel):
+    job_id: str
+    kind: Literal["resume", "job"]
+    filename: Optional[str] = None
+    status: UploadStatus
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,21 +1,105 @@
 import os
-import re
+import time
+import asyncio
 import pdfplumber
-from entities import extract_entities
-from service.resumes_service import insert_resume
-from service.jobs_service import insert_job
- 
- 
-def extract_text_from_pdf(file_path: str) -> str:
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+from cpu_pool import run_cpu_bound
+from file_storage import read_json_gz, write_json_gz
+from config import (
+    CPU_POOL_WORKERS, PDF_MAX_PAGES, PDF_EXTRACT_TIMEOUT_SECONDS, PDF_PAGES_PER_CHUNK,
+    PDF_FAST_MIN_CHARS, PDF_FAST_MAX_AVG_LINE_LENGTH, PDF_FAST_MAX_GARBLED_RATIO,
+)
+
+# Bump whenever page extraction or line cleaning changes; sidecars of older versions are ignored
+PDF_EXTRACTOR_VERSION = "2"
+
+# A PDF source is either a file path or the raw bytes of the document
+PdfSource = Union[str, bytes]
+
+# Process pool for scripts that call the sync engine outside the API (lazily created)
+_page_pool = None
+
+# Per-tier counters for the adaptive extractor (fast plain text vs layout fallback). They are
+# per process: /metrics reports the API process, task workers and scripts log their own
+# (log_pdf_extraction_stats) and pool workers hand theirs back with take_tier_counts.
+_tier_stats = {
+    "pages": 0,
+    "fast_hits": 0,
+    "layout_fallbacks": 0,
+    "fast_seconds": 0.0,
+    "layout_seconds": 0.0,
+}
+
+
+# -------------------------------
+# Page-level extraction engine
+# -------------------------------
+def _open_pdf(source: PdfSource):
+    return pdfplumber.open(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def _clean_page_lines(page_text: str) -> List[str]:
+    """Remove excessive whitespace per line and drop empty lines, preserving line structure"""
+    if not page_text:
+        return []
+    cleaned_lines = []
+    for line in page_text.split('\n'):
+        cleaned_line = ' '.join(line.split())
+        if cleaned_line:  # Only add non-empty lines
+            cleaned_lines.append(cleaned_line)
+    return cleaned_lines
+
+
+def count_pdf_pages(source: PdfSource) -> int:
+    with _open_pdf(source) as pdf:
+        return len(pdf.pages)
+
+
+def _page_quality_ok(page_text: str) -> bool:
     """
-    Extract text from a single PDF file using pdfplumber,
-    preserving line breaks and formatting for better entity extraction.
+    Quality signals for the fast plain-text tier: enough characters, lines that are not
+    suspiciously long (merged columns) and few garbled glyphs such as "(cid:12)".
     """
-    text_lines = []
-    
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
+    if not page_text:
+        return False
+    visible = sum(1 for ch in page_text if not ch.isspace())
+    if visible < PDF_FAST_MIN_CHARS:
+        return False
+
+    lines = [line for line in page_text.split('\n') if line.strip()]
+    if len(page_text) / max(1, len(lines)) > PDF_FAST_MAX_AVG_LINE_LENGTH:
+        return False
+
+    garbled = page_text.count("(cid:") + page_text.count("\ufffd")
+    garbled += sum(1 for ch in page_text if ord(ch) < 32 and ch not in "\n\t\r")
+    return garbled / visible <= PDF_FAST_MAX_GARBLED_RATIO
+
+
+def iter_page_range(source: PdfSource, start: int, end: int, deadline: float = None) -> Iterator[dict]:
+    """
+    Yield cleaned pages [start, end) as they are parsed, as dicts with a 1-based
+    page_number and the page text. Stops early once the wall-clock deadline has passed.
+    Each page first gets a cheap plain-text extraction and only escalates to layout
+    mode when that fails the quality checks.
+    """
+    with _open_pdf(source) as pdf:
+        for page_num in range(start, min(end, len(pdf.pages))):
+            if deadline is not None and time.time() > deadline:
+                print(f"[WARNING] PDF extraction deadline reached at page {page_num + 1}")
+                break
+
+            page = pdf.pages[page_num]
+            fast_started = time.perf_counter()
+            page_text = page.extract_text(x_tolerance=2, y_tolerance=2)
+            fast_seconds = time.perf_counter() - fast_started
+            tier = "fast"
+            layout_seconds = 0.0
+
+            if not _page_quality_ok(page_text):
+                tier = "layout"
+                layout_started = time.perf_counter()
                 # Extract text with better formatting preservation
                 page_text = page.extract_text(
                     x_tolerance=2,  # Slightly more tolerance for character spacing
@@ -24,140 +108,289 @@ def extract_text_from_pdf(file_path: str) -> str:
                     x_density=7.25, # Default density for character extraction
                     y_density=13    # Default density for line extraction
                 )
-                
-                if page_text:
-                    # Clean up the text while preserving structure
-                    lines = page_text.split('\n')
-                    cleaned_lines = []
-                    
-                    for line in lines:
-                        # Remove excessive whitespace but preserve some structure
-                        cleaned_line = ' '.join(line.split())
-                        if cleaned_line:  # Only add non-empty lines
-                            cleaned_lines.append(cleaned_line)
-                    
-                    if cleaned_lines:
-                        text_lines.extend(cleaned_lines)
-                        text_lines.append('')  # Add separator between pages
-                
-                print(f"[INFO] Processed page {page_num + 1}, extracted {len(page_text) if page_text else 0} characters")
-    
+                layout_seconds = time.perf_counter() - layout_started
+
+            page.close()  # Release cached page objects
+            print(f"[INFO] Processed page {page_num + 1} ({tier}), extracted {len(page_text) if page_text else 0} characters")
+
+            yield {
+                "page_number": page_num + 1,
+                "text": '\n'.join(_clean_page_lines(page_text)),
+                "tier": tier,
+                "fast_seconds": fast_seconds,
+                "layout_seconds": layout_seconds,
+            }
+
+
+def extract_page_range(source: PdfSource, start: int, end: int, deadline: float = None) -> List[dict]:
+    """Materialized iter_page_range for worker processes (generators cannot cross the pool)"""
+    return list(iter_page_range(source, start, end, deadline))
+
+
+def record_page_stats(page: dict):
+    """Aggregate per-tier hit counts and timings (called in the API/script process)"""
+    _tier_stats["pages"] += 1
+    _tier_stats["fast_seconds"] += page["fast_seconds"]
+    _tier_stats["layout_seconds"] += page["layout_seconds"]
+    if page["tier"] == "fast":
+        _tier_stats["fast_hits"] += 1
+    else:
+        _tier_stats["layout_fallbacks"] += 1
+
+
+def take_tier_counts() -> dict:
+    """Return and reset this process's raw tier counters (pool workers hand them to the parent)"""
+    counts = dict(_tier_stats)
+    for key in _tier_stats:
+        _tier_stats[key] = 0.0 if isinstance(_tier_stats[key], float) else 0
+    return counts
+
+
+def merge_tier_counts(counts: dict):
+    """Add raw tier counters taken in another process to this process's totals"""
+    for key, value in (counts or {}).items():
+        if key in _tier_stats:
+            _tier_stats[key] += value
+
+
+def get_pdf_extraction_stats() -> dict:
+    """Tier hit rates and timings of pages extracted by (or merged into) this process only"""
+    pages = _tier_stats["pages"]
+    fallbacks = _tier_stats["layout_fallbacks"]
+    return {
+        "pid": os.getpid(),
+        "pages": pages,
+        "fast_hits": _tier_stats["fast_hits"],
+        "layout_fallbacks": fallbacks,
+        "fast_hit_rate": round(_tier_stats["fast_hits"] / pages, 4) if pages else 0.0,
+        "avg_fast_seconds": round(_tier_stats["fast_seconds"] / pages, 4) if pages else 0.0,
+        "avg_layout_seconds": round(_tier_stats["layout_seconds"] / fallbacks, 4) if fallbacks else 0.0,
+    }
+
+
+def log_pdf_extraction_stats(label: str):
+    """Print this process's tier stats, for processes that /metrics does not see"""
+    if _tier_stats["pages"]:
+        print(f"[INFO] PDF extraction stats ({label}): {get_pdf_extraction_stats()}")
+
+
+def plan_page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Split pages into at most `workers` contiguous ranges of at least PDF_PAGES_PER_CHUNK pages"""
+    if page_count <= 0:
+        return []
+    chunks = max(1, min(workers, page_count // max(1, PDF_PAGES_PER_CHUNK)))
+    size, extra = divmod(page_count, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def join_pages(pages: Iterable[dict]) -> str:
+    """Join page texts in the order given, with a blank line between non-empty pages"""
+    return '\n\n'.join(page["text"] for page in pages if page["text"])
+
+
+def _get_page_pool():
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS)
+    return _page_pool
+
+
+def iter_pdf_pages(source: PdfSource, parallel: bool = True, max_pages: int = PDF_MAX_PAGES) -> Iterator[dict]:
+    """
+    Yield cleaned pages of a PDF path or bytes in page order, as soon as each is available.
+    Pages beyond max_pages are ignored and extraction stops after PDF_EXTRACT_TIMEOUT_SECONDS.
+    With parallel=True, page ranges are spread over a process pool and yielded as each range
+    completes; use parallel=False inside worker processes. Closing the generator early
+    cancels ranges that have not started yet.
+    """
+    deadline = time.time() + PDF_EXTRACT_TIMEOUT_SECONDS
+    page_count = min(count_pdf_pages(source), max_pages)
+    ranges = plan_page_ranges(page_count, CPU_POOL_WORKERS if parallel else 1)
+
+    if len(ranges) <= 1:
+        for page in iter_page_range(source, 0, page_count, deadline):
+            record_page_stats(page)
+            yield page
+        return
+
+    futures = [_get_page_pool().submit(extract_page_range, source, start, end, deadline)
+               for start, end in ranges]
+    try:
+        for future in futures:
+            try:
+                pages = future.result(timeout=max(0.0, deadline - time.time()))
+            except FutureTimeoutError:
+                print("[WARNING] PDF extraction timed out, returning pages parsed so far")
+                return
+            for page in pages:
+                record_page_stats(page)
+                yield page
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def aiter_pdf_pages(source: PdfSource, max_pages: int = PDF_MAX_PAGES) -> AsyncIterator[dict]:
+    """Async variant of iter_pdf_pages for routes, fanning page ranges out over the shared CPU pool"""
+    deadline = time.time() + PDF_EXTRACT_TIMEOUT_SECONDS
+    page_count = min(await run_cpu_bound(count_pdf_pages, source), max_pages)
+    tasks = [asyncio.ensure_future(run_cpu_bound(extract_page_range, source, start, end, deadline))
+             for start, end in plan_page_ranges(page_count, CPU_POOL_WORKERS)]
+    try:
+        for task in tasks:
+            try:
+                pages = await asyncio.wait_for(task, timeout=max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                print("[WARNING] PDF extraction timed out, returning pages parsed so far")
+                return
+            for page in pages:
+                record_page_stats(page)
+                yield page
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def extract_text(source: PdfSource, parallel: bool = True) -> str:
+    """Extract the full text of a PDF path or bytes (see iter_pdf_pages)"""
+    try:
+        full_text = join_pages(iter_pdf_pages(source, parallel=parallel))
     except Exception as e:
-        print(f"[ERROR] Failed to extract text from {file_path}: {str(e)}")
+        print(f"[ERROR] Failed to extract text from PDF: {str(e)}")
         return ""
-    
-    # Join all lines with newlines
-    full_text = '\n'.join(text_lines).strip()
-    
-    # Remove excessive consecutive newlines (more than 2)
-    full_text = re.sub(r'\n{3,}', '\n\n', full_text)
-    
     print(f"[INFO] Total extracted text length: {len(full_text)} characters")
-    print(f"[INFO] First 300 characters: {full_text[:300]}")
-    
     return full_text
 
 
-def extract_text_from_uploaded_file(file_obj) -> str:
-    """
-    Extract text from an uploaded PDF file object.
-    This version works with FastAPI's UploadFile.
-    """
-    text_lines = []
-    
+async def extract_text_async(source: PdfSource) -> str:
+    """Async variant of extract_text for routes"""
     try:
-        # Reset file pointer to beginning
-        file_obj.seek(0)
-        
-        with pdfplumber.open(file_obj) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # Extract text with better formatting preservation
-                page_text = page.extract_text(
-                    x_tolerance=2,
-                    y_tolerance=2, 
-                    layout=True,
-                    x_density=7.25,
-                    y_density=13
-                )
-                
-                if page_text:
-                    # Clean up the text while preserving structure
-                    lines = page_text.split('\n')
-                    cleaned_lines = []
-                    
-                    for line in lines:
-                        # Remove excessive whitespace but preserve some structure
-                        cleaned_line = ' '.join(line.split())
-                        if cleaned_line:  # Only add non-empty lines
-                            cleaned_lines.append(cleaned_line)
-                    
-                    if cleaned_lines:
-                        text_lines.extend(cleaned_lines)
-                        text_lines.append('')  # Add separator between pages
-                
-                print(f"[INFO] Processed page {page_num + 1}, extracted {len(page_text) if page_text else 0} characters")
-    
+        full_text = join_pages([page async for page in aiter_pdf_pages(source)])
     except Exception as e:
-        print(f"[ERROR] Failed to extract text from uploaded file: {str(e)}")
+        print(f"[ERROR] Failed to extract text from PDF: {str(e)}")
         return ""
-    
-    # Join all lines with newlines
-    full_text = '\n'.join(text_lines).strip()
-    
-    # Remove excessive consecutive newlines (more than 2)
-    import re
-    full_text = re.sub(r'\n{3,}', '\n\n', full_text)
-    
     print(f"[INFO] Total extracted text length: {len(full_text)} characters")
-    print(f"[INFO] First 300 characters: {full_text[:300]}")
-    
     return full_text
+
+
+# -------------------------------
+# Extracted-text sidecars
+# -------------------------------
+def text_sidecar_path(pdf_path: str, file_hash: str) -> str:
+    """Sidecar next to a content-addressed PDF: <hash>.pages.v<extractor version>.json.gz"""
+    return os.path.join(os.path.dirname(pdf_path), f"{file_hash}.pages.v{PDF_EXTRACTOR_VERSION}.json.gz")
+
+
+def load_text_sidecar(pdf_path: str, file_hash: str) -> Optional[List[dict]]:
+    """Cleaned pages stored for this file and extractor version, or None"""
+    data = read_json_gz(text_sidecar_path(pdf_path, file_hash))
+    if not data or data.get("file_hash") != file_hash or data.get("extractor_version") != PDF_EXTRACTOR_VERSION:
+        return None
+    return data["pages"]
+
+
+def save_text_sidecar(pdf_path: str, file_hash: str, pages: List[dict]) -> bool:
+    """
+    Store cleaned pages as a compressed sidecar. Only complete extractions are stored,
+    so a run cut short by the deadline is never served from the cache later.
+    """
+    try:
+        if len(pages) < min(count_pdf_pages(pdf_path), PDF_MAX_PAGES):
+            print(f"[WARNING] Not caching partial extraction of {pdf_path}")
+            return False
+        write_json_gz(text_sidecar_path(pdf_path, file_hash), {
+            "file_hash": file_hash,
+            "extractor_version": PDF_EXTRACTOR_VERSION,
+            "pages": [{"page_number": page["page_number"], "text": page["text"], "tier": page["tier"]}
+                      for page in pages],
+        })
+        return True
+    except Exception as e:
+        print(f"[WARNING] Failed to write text sidecar for {pdf_path}: {str(e)}")
+        return False
+
+
+def extract_text_cached(pdf_path: str, file_hash: str, parallel: bool = True) -> str:
+    """extract_text for a stored PDF, reading/writing its page-text sidecar"""
+    try:
+        pages = load_text_sidecar(pdf_path, file_hash)
+        if pages is None:
+            pages = list(iter_pdf_pages(pdf_path, parallel=parallel))
+            save_text_sidecar(pdf_path, file_hash, pages)
+        return join_pages(pages)
+    except Exception as e:
+        print(f"[ERROR] Failed to extract text from PDF: {str(e)}")
+        return ""
+
+
+async def extract_text_cached_async(pdf_path: str, file_hash: str) -> str:
+    """Async variant of extract_text_cached for routes"""
+    try:
+        pages = await asyncio.to_thread(load_text_sidecar, pdf_path, file_hash)
+        if pages is None:
+            pages = [page async for page in aiter_pdf_pages(pdf_path)]
+            await asyncio.to_thread(save_text_sidecar, pdf_path, file_hash, pages)
+        return join_pages(pages)
+    except Exception as e:
+        print(f"[ERROR] Failed to extract text from PDF: {str(e)}")
+        return ""
+
+
+def extract_text_from_pdf(file_path: str, parallel: bool = True) -> str:
+    """
+    Extract text from a single PDF file using pdfplumber,
+    preserving line breaks and formatting for better entity extraction.
+    """
+    return extract_text(file_path, parallel=parallel)
+
+
+def extract_text_from_uploaded_file(file_obj) -> str:
+    """
+    Extract text from an uploaded PDF file object.
+    This version works with FastAPI's UploadFile.
+    """
+    # Reset file pointer to beginning and let pdfplumber read from the (spooled) file
+    # directly instead of copying it into memory
+    file_obj.seek(0)
+    return extract_text(file_obj, parallel=False)
+
+
+def extract_text_from_pdf_bytes(data: bytes) -> str:
+    """
+    Extract text from PDF bytes. Picklable entry point for the CPU worker pool,
+    which cannot receive open file objects.
+    """
+    return extract_text(data, parallel=False)
  
  
 def load_pdfs_from_folder(folder_path: str, type_: str = "resume"):
     """
     Load multiple PDFs from a folder and insert into DB.
     type_ = "resume" or "job"
+    Delegates to the parallel, checkpointed bulk ingestion (bulk_ingest.py).
     """
-    if not os.path.exists(folder_path):
-        print(f"[ERROR] Folder not found: {folder_path}")
-        return
-    
-    pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith(".pdf")]
-    print(f"[INFO] Found {len(pdf_files)} PDF files in {folder_path}")
-    
-    for fname in pdf_files:
-        file_path = os.path.join(folder_path, fname)
-        print(f"[INFO] Processing {fname}...")
- 
-        raw_text = extract_text_from_pdf(file_path)
-        if not raw_text or len(raw_text.strip()) < 50:
-            print(f"⚠️ Skipped {fname}: No sufficient text found (length: {len(raw_text)}).")
-            continue
- 
-        print(f"[INFO] Extracting entities from {fname}...")
-        entities = extract_entities(raw_text)
-        print(f"[INFO] Entities extracted: {entities}")
- 
-        try:
-            if type_ == "resume":
-                insert_resume(fname, raw_text, entities)
-                print(f"✅ [SUCCESS] Inserted resume {fname}")
-            elif type_ == "job":
-                insert_job(fname, raw_text, entities)
-                print(f"✅ [SUCCESS] Inserted job {fname}")
-        except Exception as e:
-            print(f"❌ [ERROR] Failed to insert {fname}: {str(e)}")
-            continue
- 
-    print(f"[INFO] Completed processing {len(pdf_files)} files")
+    from bulk_ingest import ingest_folder  # bulk_ingest imports this module
+    return ingest_folder(folder_path, type_)
 
 
 # Additional utility function for debugging
-def preview_pdf_text(file_path: str, num_lines: int = 20) -> str:
+def preview_pdf_text(file_path: str, num_lines: int = 20, file_hash: str = None) -> str:
     """
-    Extract and preview first few lines of PDF text for debugging
+    Extract and preview first few lines of PDF text for debugging.
+    Uses the page-text sidecar when a file hash is given and one exists, otherwise
+    stops parsing as soon as enough lines have been read.
     """
-    text = extract_text_from_pdf(file_path)
-    lines = text.split('\n')[:num_lines]
-    return '\n'.join(lines)
\ No newline at end of file
+    lines = []
+    cached = load_text_sidecar(file_path, file_hash) if file_hash else None
+    pages = cached if cached is not None else iter_pdf_pages(file_path, parallel=False)
+    for page in pages:
+        lines.extend(line for line in page["text"].split('\n') if line)
+        if len(lines) >= num_lines:
+            break  # The abandoned generator is closed, so remaining pages are never parsed
+    return '\n'.join(lines[:num_lines])
\ No newline at end of file
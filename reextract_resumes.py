@@ -0,0 +1,46 @@
+import os
+import sys
+from config import RESUME_UPLOAD_DIRECTORY
+from entities import extract_entities
+from file_storage import content_path
+from pdf_loader import extract_text_cached, log_pdf_extraction_stats
+from service.resumes_service import get_stored_resume_files, update_resume_extraction
+from service.user_profiles_service import update_profile_from_resume
+
+
+def reextract_resumes(limit: int = None):
+    """
+    Re-run entity extraction for stored resumes, e.g. after a taxonomy or extractor upgrade.
+    Page text comes from the sidecar next to each PDF, so pdfplumber only runs for files
+    without a sidecar for the current PDF extractor version.
+    """
+    resumes = get_stored_resume_files()
+    if limit:
+        resumes = resumes[:limit]
+    print(f"[INFO] Re-extracting {len(resumes)} resumes")
+
+    updated = 0
+    for resume in resumes:
+        file_path = content_path(RESUME_UPLOAD_DIRECTORY, resume["file_hash"])
+        if not os.path.exists(file_path):
+            print(f"⚠️ Skipped resume {resume['id']}: stored file missing")
+            continue
+
+        raw_text = extract_text_cached(file_path, resume["file_hash"])
+        if not raw_text or len(raw_text.strip()) < 50:
+            print(f"⚠️ Skipped resume {resume['id']}: No sufficient text found")
+            continue
+
+        entities = extract_entities(raw_text)
+        if not update_resume_extraction(resume["id"], raw_text, entities):
+            continue
+        if resume["user_id"]:
+            update_profile_from_resume(resume["user_id"], resume["name"], file_path, entities)
+        updated += 1
+
+    print(f"✅ Re-extracted {updated}/{len(resumes)} resumes")
+    log_pdf_extraction_stats("re-extraction")
+
+
+if __name__ == "__main__":
+    reextract_resumes(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from service.users_service import create_user, get_user_by_username, get_user_by_email
-from auth import hash_password, verify_password, create_access_token
+from service.users_service import create_user, get_user_by_username, get_user_by_email, invalidate_principal
+from auth import hash_password, verify_password, create_access_token, token_claims
 from datetime import timedelta
 from models.auth_models import SignUpRequest
  
@@ -32,7 +32,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
         raise HTTPException(status_code=400, detail="Invalid email or password")
 
     access_token_expires = timedelta(minutes=30)
-    token = create_access_token(data={"sub": user[2]}, expires_delta=access_token_expires)  # user[2] for email
+    token = create_access_token(data=token_claims(user), expires_delta=access_token_expires)
+    # The row just read is current; drop any cached copy so this process re-reads it once
+    invalidate_principal(user[2])
 
     user_data = {
         "id": user[0],
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from service.candidates_service import (
-    get_candidates_by_recruiter,
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import Optional
+from service.async_db import (
+    run_db,
     get_candidate_by_id,
     update_candidate_status,
-    get_candidate_statistics
+    get_candidate_statistics,
+    update_job_status_to_closed,
 )
-from service.recommendation_service import update_job_status_to_closed
+from service.candidates_service import get_candidates_by_recruiter
+from service.pagination import paginate, InvalidCursor, NEXT_CURSOR_HEADER
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from models.candidates_models import (
     CandidateDetailResponse,
     CandidateStatusUpdate,
@@ -14,17 +18,18 @@ from models.candidates_models import (
     CandidateListResponse,
 )
 from auth import get_current_user
-from email_invitations.interview_email_invitation import send_interview_invitation_email
-from email_invitations.hiring_email_invitation import send_hiring_email
-from email_invitations.rejection_email_invitation import send_rejection_email
+from tasks import submit_email
 
 router = APIRouter(prefix="/candidates", tags=["Candidates"])
 
 @router.get("/my-candidates", response_model=CandidateListResponse)
 async def get_my_candidates(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     user: tuple = Depends(get_current_user)
 ):
-    """Get all candidates for the current recruiter without filters"""
+    """Get the current recruiter's candidates without filters, best match first, one page at a time"""
 
     try:
         user_dict = {
@@ -44,11 +49,21 @@ async def get_my_candidates(
                 detail="Only recruiters can access candidate management"
             )
 
-        # Fetch all candidates for recruiter without any filters
-        candidates = get_candidates_by_recruiter(creator_email=recruiter_email)
+        # Fetch one page of the recruiter's candidates without any filters
+        try:
+            candidates, next_cursor = await run_db(
+                paginate,
+                lambda page_limit, after: get_candidates_by_recruiter(recruiter_email, page_limit, after),
+                ("candidate_id",), limit, cursor
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
         return CandidateListResponse(
-            candidates=candidates
+            candidates=candidates,
+            next_cursor=next_cursor
         )
 
     except HTTPException:
@@ -82,7 +97,7 @@ async def get_recruiter_statistics(user: tuple = Depends(get_current_user)):
                 detail="Only recruiters can access statistics"
             )
         
-        statistics = get_candidate_statistics(recruiter_email)
+        statistics = await get_candidate_statistics(recruiter_email)
         return CandidateStatisticsResponse(**statistics)
         
     except HTTPException:
@@ -118,7 +133,7 @@ async def get_candidate_details(
                 detail="Only recruiters can access candidate details"
             )
         
-        candidate = get_candidate_by_id(candidate_id)
+        candidate = await get_candidate_by_id(candidate_id)
         
         if not candidate:
             raise HTTPException(
@@ -161,7 +176,7 @@ async def update_status(
     candidate_id = status_update.candidate_id
     candidate_status = status_update.status
 
-    candidate = get_candidate_by_id(candidate_id)
+    candidate = await get_candidate_by_id(candidate_id)
     if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -169,7 +184,7 @@ async def update_status(
         )
 
     # Update the candidate status
-    success = update_candidate_status(candidate_id, candidate_status.value)
+    success = await update_candidate_status(candidate_id, candidate_status.value)
 
     if not success:
         raise HTTPException(
@@ -180,13 +195,16 @@ async def update_status(
     # Close the job if status is hired or rejected
     if candidate_status.value.lower() in ["hired", "rejected"]:
         if status_update.match_id:
-            update_job_status_to_closed(status_update.match_id)
+            await update_job_status_to_closed(status_update.match_id)
 
 
     # Send email based on status change
-    email_sent = False
+    # Emails are delivered by the task queue workers (retried on SMTP failures)
+    email_task_id = None
     if candidate_status.value.lower() == "hired":
-        email_sent = send_hiring_email(
+        email_task_id = await run_db(
+            submit_email,
+            "hiring",
             candidate_email=status_update.candidate_email or candidate.get("email"),
             candidate_name=status_update.candidate_name or candidate.get("name"),
             recruiter_email=user_dict.get("email"),
@@ -196,7 +214,9 @@ async def update_status(
             additional_notes=status_update.additional_notes
         )
     elif candidate_status.value.lower() == "rejected":
-        email_sent = send_rejection_email(
+        email_task_id = await run_db(
+            submit_email,
+            "rejection",
             candidate_email=status_update.candidate_email or candidate.get("email"),
             candidate_name=status_update.candidate_name or candidate.get("name"),
             recruiter_email=user_dict.get("email"),
@@ -212,12 +232,13 @@ async def update_status(
         "new_status": candidate_status.value
     }
     
-    if email_sent:
+    if email_task_id is not None:
         response["email_sent"] = True
-        response["email_message"] = f"{'Hiring' if candidate_status.value.lower() == 'hired' else 'Rejection'} email sent to candidate"
+        response["email_task_id"] = email_task_id
+        response["email_message"] = f"{'Hiring' if candidate_status.value.lower() == 'hired' else 'Rejection'} email queued for delivery to candidate"
     elif candidate_status.value.lower() in ["hired", "rejected"]:
         response["email_sent"] = False
-        response["email_message"] = "Status updated but email failed to send"
+        response["email_message"] = "Status updated but email could not be queued"
 
     return response
 
@@ -246,14 +267,14 @@ async def schedule_interview(
 
     candidate_id = interview_request.candidate_id
 
-    candidate = get_candidate_by_id(candidate_id)
+    candidate = await get_candidate_by_id(candidate_id)
     if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Candidate not found"
         )
 
-    success = update_candidate_status(candidate_id, "interview_scheduled")
+    success = await update_candidate_status(candidate_id, "interview_scheduled")
 
     if not success:
         raise HTTPException(
@@ -261,7 +282,9 @@ async def schedule_interview(
             detail="Failed to update candidate status"
         )
 
-    email_sent = send_interview_invitation_email(
+    email_task_id = await run_db(
+        submit_email,
+        "interview",
         candidate_email=candidate["email"],
         candidate_name=candidate["name"],
         recruiter_email=recruiter_email,
@@ -278,7 +301,8 @@ async def schedule_interview(
     return {
         "message": "Interview scheduled successfully",
         "candidate_id": candidate_id,
-        "email_sent": email_sent,
+        "email_sent": email_task_id is not None,
+        "email_task_id": email_task_id,
         "candidate_email": candidate["email"],
         "interview_date": interview_request.interview_date,
         "interview_time": interview_request.interview_time
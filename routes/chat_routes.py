@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Any
 from models.chat_models import ChatRequest, ChatResponse
@@ -116,7 +117,9 @@ IMPORTANT: Format your response using proper markdown:
         print(f"Sending to Gemini - User: {user_dict['username']}")
         print(f"Is job listing query: {is_job_listing_query}")
         
-        reply, usage = generate_chat_reply(
+        # The Gemini client is blocking: keep it off the event loop
+        reply, usage = await asyncio.to_thread(
+            generate_chat_reply,
             prompt=prompt,
             system_prompt=request.system_prompt,
             temperature=0.3 if is_job_listing_query else 0.7  # Lower temperature for more consistent formatting
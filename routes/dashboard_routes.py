@@ -1,23 +1,44 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
 from auth import get_current_user
-from service.resumes_service import get_all_resumes
-from service.jobs_service import get_all_jobs
-from service.matches_service import get_match_scores
+from service.async_db import run_db, get_table_counts
+from service import resumes_service, jobs_service, matches_service
+from service.pagination import paginate_lists, InvalidCursor, NEXT_CURSOR_HEADER
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
  
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
  
 @router.get("/recruiter")
-async def recruiter_dashboard(user: dict = Depends(get_current_user)):
-    resumes = get_all_resumes()
-    jobs = get_all_jobs()
-    scores = get_match_scores()
-    return {"resumes": resumes, "jobs": jobs, "scores": scores}
+async def recruiter_dashboard(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    """Resumes, jobs and match scores, one page of each per request (one cursor advances all three)"""
+    try:
+        pages, next_cursor = await run_db(paginate_lists, {
+            "resumes": (resumes_service.get_all_resumes, ("id",)),
+            "jobs": (jobs_service.get_all_jobs, jobs_service.JOB_PAGE_KEY),
+            "scores": (matches_service.get_match_scores, ("final_score", "id")),
+        }, limit, cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return {"resumes": pages["resumes"], "jobs": pages["jobs"], "scores": pages["scores"], "next_cursor": next_cursor}
  
 @router.get("/stats")
 async def stats(user: dict = Depends(get_current_user)):
+    """Row counts from the trigger-maintained counters table; never scans resumes or jobs"""
+    counts = await get_table_counts()
+    if counts is None:
+        raise HTTPException(status_code=500, detail="Could not load dashboard stats")
     return {
-        "total_resumes": len(get_all_resumes()),
-        "total_jobs": len(get_all_jobs()),
+        "total_resumes": counts["resumes"],
+        "total_jobs": counts["jobs"],
+        "total_posted_jobs": counts["posted_jobs"],
+        "total_users": counts["users"],
         # "top_skills": ["Python", "SQL", "React"],  
     }
  
\ No newline at end of file
@@ -1,19 +1,36 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Response
+from typing import Optional
+from fastapi.responses import JSONResponse
 import pandas as pd
 from io import BytesIO
 import json            
 from service.jobs_service import insert_job, get_all_jobs, get_jobs_by_creator, update_job
 from service.posted_jobs_service import insert_posted_job, get_all_posted_jobs, get_posted_jobs_by_creator, update_posted_job
-from pdf_loader import extract_text_from_uploaded_file
+from service import async_db
+from service.async_db import run_db
+from service.pagination import paginate_lists, InvalidCursor, NEXT_CURSOR_HEADER
+from service.jobs_service import JOB_PAGE_KEY
+from service.posted_jobs_service import POSTED_JOB_PAGE_KEY
+from pdf_loader import extract_text_async
 from entities import extract_entities
+from cpu_pool import run_cpu_bound
 from preprocess import clean_text
+from file_storage import store_upload_by_hash
+from upload_processing import submit_upload
+from tasks import submit_scoring
+from task_queue import TASK_CLASS_BATCH
+from config import JOB_UPLOAD_DIRECTORY, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from auth import get_current_user
 from models.job_models import JobUploadResponse, JobPosting, JobListResponse, JobUpdateResponse, JobUpdateRequest
  
 router = APIRouter(prefix="/job", tags=["Job"])
  
 @router.post("/uploadJob", response_model=JobUploadResponse)
-async def upload_job(job: UploadFile = File(...), user: tuple = Depends(get_current_user)):
+async def upload_job(job: UploadFile = File(...), async_mode: bool = False, user: tuple = Depends(get_current_user)):
+    """
+    Upload a job description PDF. With async_mode=true the file is stored, processing is
+    queued and 202 is returned with a job ID to poll at /uploads/{job_id}.
+    """
     try:
         print(f"[INFO] Processing uploaded job: {job.filename}")
         
@@ -27,8 +44,19 @@ async def upload_job(job: UploadFile = File(...), user: tuple = Depends(get_curr
         # Get creator email from user
         creator_email = user_dict.get("email")
         
-        # Extract text using the improved function
-        raw_text = extract_text_from_uploaded_file(job.file)
+        if async_mode:
+            saved = await store_upload_by_hash(job, JOB_UPLOAD_DIRECTORY)
+            upload_job_id = await submit_upload("job", user_dict.get("user_id"), creator_email, job.filename, saved)
+            return JSONResponse(status_code=202, content={
+                "status": "queued",
+                "job_id": upload_job_id,
+                "job": job.filename,
+                "status_url": f"/uploads/{upload_job_id}"
+            })
+        
+        # Extract text, page ranges in parallel on the CPU pool
+        contents = await job.read()
+        raw_text = await extract_text_async(contents)
         
         if not raw_text or len(raw_text.strip()) < 50:
             return {
@@ -41,17 +69,19 @@ async def upload_job(job: UploadFile = File(...), user: tuple = Depends(get_curr
         print(f"[INFO] Extracted {len(raw_text)} characters from {job.filename}")
         
         # Extract entities
-        entities = extract_entities(raw_text)
+        entities = await run_cpu_bound(extract_entities, raw_text)
         print(f"[INFO] Entities extracted: {entities}")
         
         # Store the raw text (not cleaned) to preserve formatting for preview
         # job_source will be automatically set to 'jobs' in insert_job
-        job_id = insert_job(
+        job_id = await async_db.insert_job(
             title=job.filename, 
             description=raw_text, 
             entities=entities,
             creator_email=creator_email
         )
+        if job_id is not None:
+            await run_db(submit_scoring, job_id=job_id, job_source="jobs")
         
         return {
             "status": "success",
@@ -113,6 +143,7 @@ def post_job(job: JobPosting, user: tuple = Depends(get_current_user)):
 
         if job_id is None:
             raise HTTPException(status_code=500, detail="Failed to insert job into database")
+        submit_scoring(job_id=job_id, job_source="posted_jobs")
 
         return JobUploadResponse(
             status="success",
@@ -279,7 +310,7 @@ async def bulk_upload_jobs(
                             errors.append(f"Row {row_num}: Invalid status '{status}'. Valid values: {', '.join(valid_status)}")
                     
                     # Insert into database using insert_posted_job
-                    job_id = insert_posted_job(
+                    job_id = await async_db.insert_posted_job(
                         title=title,
                         description=description,
                         entities=entities,
@@ -292,6 +323,8 @@ async def bulk_upload_jobs(
                     
                     if job_id:
                         successful_uploads += 1
+                        # Bulk imports are scored as batch work, behind interactive scoring
+                        await run_db(submit_scoring, job_id=job_id, job_source="posted_jobs", task_class=TASK_CLASS_BATCH)
                         print(f"[INFO] Successfully uploaded job: {title} - Row {row_num} (ID: {job_id})")
                     else:
                         failed_uploads += 1
@@ -334,22 +367,44 @@ async def bulk_upload_jobs(
             "errors": [str(e)]
         }
     
+def _job_list_page(fetch_jobs, fetch_posted_jobs, limit: int, cursor: Optional[str], response: Response):
+    """One keyset page of jobs and posted jobs side by side (one cursor advances both lists)"""
+    try:
+        pages, next_cursor = paginate_lists({
+            "jobs": (fetch_jobs, JOB_PAGE_KEY),
+            "posted_jobs": (fetch_posted_jobs, POSTED_JOB_PAGE_KEY),
+        }, limit, cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return JobListResponse(
+        jobs=pages["jobs"],
+        posted_jobs=pages["posted_jobs"],
+        next_cursor=next_cursor
+    )
+
 @router.get("/getAllJobs", response_model=JobListResponse)
-def list_jobs():
+def list_jobs(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Fetch all jobs for recruiter dashboard.
+    Fetch jobs for recruiter dashboard, newest first, one page at a time.
+    Pass next_cursor (also sent as X-Next-Cursor) back as cursor for the next page.
     """
-    jobs = get_all_jobs()
-    posted_jobs = get_all_posted_jobs()
-    return JobListResponse(
-        jobs=jobs,
-        posted_jobs=posted_jobs
-        )
+    return _job_list_page(get_all_jobs, get_all_posted_jobs, limit, cursor, response)
 
 @router.get("/getJobsByCreator", response_model=JobListResponse)
-def list_jobs(user: tuple = Depends(get_current_user)):
+def list_jobs(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user: tuple = Depends(get_current_user)
+):
     """
-    Fetch all jobs and posted jobs created by the logged-in recruiter.
+    Fetch jobs and posted jobs created by the logged-in recruiter, newest first, one page at a time.
     """
     user_dict = {
         "user_id": user[0],
@@ -364,11 +419,10 @@ def list_jobs(user: tuple = Depends(get_current_user)):
             status_code=403,
             detail="Unauthorized Access"
         )
-    jobs = get_jobs_by_creator(creator_email)
-    posted_jobs = get_posted_jobs_by_creator(creator_email)
-    return JobListResponse(
-        jobs=jobs,
-        posted_jobs=posted_jobs
+    return _job_list_page(
+        lambda page_limit, after: get_jobs_by_creator(creator_email, page_limit, after),
+        lambda page_limit, after: get_posted_jobs_by_creator(creator_email, page_limit, after),
+        limit, cursor, response
     )
 
 @router.put("/updateJob", response_model=JobUpdateResponse)
@@ -433,6 +487,7 @@ def update_job_endpoint(
                 status_code=404,
                 detail=f"{job_type_name} not found or you don't have permission to update it"
             )
+        submit_scoring(job_id=job_id, job_source=job_source)
         
         return JobUpdateResponse(
             success=True,
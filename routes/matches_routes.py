@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Optional
-from service.matches_service import get_matches_for_recruiter, get_detailed_match_explanation
+from service.async_db import run_db, get_detailed_match_explanation
+from service.matches_service import get_matches_for_recruiter
+from service.pagination import paginate, InvalidCursor, NEXT_CURSOR_HEADER
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from models.matches_models import RecruiterMatchSummary, MatchExplanation, MatchExplanationRequest
 from auth import get_current_user
 
@@ -8,10 +11,14 @@ router = APIRouter(prefix="/matches", tags=["Matches"])
 
 @router.get("/getMatches", response_model=List[RecruiterMatchSummary])
 async def recruiter_matches(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     user: tuple = Depends(get_current_user)
 ):
     """
-    Get all matches for a recruiter (status 'applied').
+    Get matches for a recruiter (status 'applied'), most recently updated first, one page at a time.
+    The cursor of the next page is returned in the X-Next-Cursor header.
     """
     try:
         user_dict = {
@@ -30,7 +37,16 @@ async def recruiter_matches(
                 detail="Only recruiters can access matches"
             )
 
-        matches = get_matches_for_recruiter(recruiter_email)
+        try:
+            matches, next_cursor = await run_db(
+                paginate,
+                lambda page_limit, after: get_matches_for_recruiter(recruiter_email, page_limit, after),
+                ("updated_at", "match_id"), limit, cursor
+            )
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return matches
 
     except HTTPException:
@@ -66,7 +82,7 @@ async def match_explanation(
                 detail="Only recruiters can access match explanations"
             )
 
-        explanation = get_detailed_match_explanation(
+        explanation = await get_detailed_match_explanation(
             request.resume_id, 
             request.job_id, 
             request.job_source
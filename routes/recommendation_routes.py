@@ -1,11 +1,13 @@
+import asyncio
 from fastapi import APIRouter, Depends
 from auth import get_current_user
-from service.recommendation_service import run_matcher, get_top_recommendations, get_user_active_resume_id
-from service.candidates_service import create_candidate_from_match
+from service.recommendation_service import score_resume
+from service.async_db import (
+    get_top_matches, get_top_recommendations, get_user_active_resume_id, create_candidate_from_match,
+    fetch_saved_jobs, update_job_save_status, update_job_status_to_applied,
+)
 from fastapi import HTTPException, status
 from models.recommendation_models import ApplyJobRequest, SaveJobRequest, SaveJobResponse, SaveJobStatus, SavedJobsRequest
-from service.recommendation_service import fetch_saved_jobs
-from service.recommendation_service import update_job_save_status, update_job_status_to_applied
 from models.recommendation_models import RecommendationsRequest, RecommendationResponse
  
 router = APIRouter(prefix="/recommendation", tags=["Recommendation"])
@@ -16,13 +18,20 @@ async def recommendations(
     user: tuple = Depends(get_current_user)  
 ):
     user_id = user[0]
-    resume_id = get_user_active_resume_id(user_id)  
+    resume_id = await get_user_active_resume_id(user_id)  
     
     if not resume_id:
         raise HTTPException(status_code=404, detail="Active resume not found for user")
     
-    run_matcher()
-    recs = get_top_recommendations(resume_id, request.top_n)
+    # Matches (and each resume's materialized top list) are kept current by background scoring
+    # (uploads, job changes, nightly rematch); only a resume that has never been scored is scored
+    # here, on its own. top_n beyond the materialized list is read from matches directly.
+    recs = await get_top_matches(resume_id, request.top_n)
+    if recs is None:
+        recs = await get_top_recommendations(resume_id, request.top_n)
+    if not recs:
+        await asyncio.to_thread(score_resume, resume_id)
+        recs = await get_top_recommendations(resume_id, request.top_n)
     return RecommendationResponse(
         resume_id=resume_id,
         recommendations=recs
@@ -49,14 +58,14 @@ async def apply_job(request: ApplyJobRequest, user: tuple = Depends(get_current_
             detail="Unauthorized Access"
         )
 
-    success = create_candidate_from_match(request.match_id)
+    success = await create_candidate_from_match(request.match_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to apply for job"
         )
 
-    update_result = update_job_status_to_applied(request.match_id)
+    update_result = await update_job_status_to_applied(request.match_id)
     if not update_result.get('success'):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -94,7 +103,7 @@ async def save_job(
         )
     
     try:
-        result = update_job_save_status(
+        result = await update_job_save_status(
             match_id=request.match_id,
             save_status=SaveJobStatus.saved,
         )
@@ -134,9 +143,9 @@ async def get_saved_jobs(
     }
 
     user_id = user_dict.get("user_id")
-    resume_id = get_user_active_resume_id(user_id) 
+    resume_id = await get_user_active_resume_id(user_id) 
 
-    results = fetch_saved_jobs(resume_id)
+    results = await fetch_saved_jobs(resume_id)
     return RecommendationResponse(
         resume_id=resume_id,
         recommendations=results
@@ -1,25 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse
+from typing import Optional
 import os
-from service.resumes_service import insert_resume
-from service.user_profiles_service import update_profile_from_resume
-from pdf_loader import extract_text_from_uploaded_file
-from entities import extract_entities
+from service.async_db import run_db, get_resume_by_user, get_user_profile
+from file_storage import store_upload_by_hash, content_path, conditional_file_response
+from upload_processing import process_resume_file, discard_new_resume_file, submit_upload
+from tasks import submit_scoring
 from auth import get_current_user
 from models.resume_models import ResumeUploadResponse, ResumeDownloadRequest
-import MySQLdb as sql
-from config import DB_CONFIG
-
-conn = sql.connect(**DB_CONFIG)
-cursor = conn.cursor() 
+from config import RESUME_UPLOAD_DIRECTORY
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
 # Create uploads directory if it doesn't exist
-UPLOAD_DIRECTORY = "uploads/resumes"
+UPLOAD_DIRECTORY = RESUME_UPLOAD_DIRECTORY
 os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
 
 @router.post("/uploadResume", response_model=ResumeUploadResponse)
-async def upload_resume(resume: UploadFile = File(...), user: tuple = Depends(get_current_user)):
+async def upload_resume(resume: UploadFile = File(...), async_mode: bool = False, user: tuple = Depends(get_current_user)):
+    """
+    Upload a resume PDF. With async_mode=true the file is stored, processing is queued and
+    202 is returned with a job ID to poll at /uploads/{job_id}.
+    """
+    saved = None
     try:
         print(f"[INFO] Processing uploaded resume: {resume.filename}")
         
@@ -41,26 +44,10 @@ async def upload_resume(resume: UploadFile = File(...), user: tuple = Depends(ge
                 detail="Only PDF files are supported"
             )
         
-        # Create safe filename with standardized pattern: userid_username.pdf
-        safe_filename = f"{user_id}_{username}.pdf"
-        file_path = os.path.join(UPLOAD_DIRECTORY, safe_filename)
-        
-        # Check if user already has a resume and delete it (overwrite)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"[INFO] Removed existing resume for user {user_id}")
-            except Exception as e:
-                print(f"[WARNING] Could not remove existing resume: {str(e)}")
-        
-        # Save file to disk
+        # Stream the upload into content-addressed storage (uploads/resumes/<sha[:2]>/<sha>.pdf)
         try:
-            contents = await resume.read()
-            with open(file_path, "wb") as f:
-                f.write(contents)
-            
-            # Reset file pointer for text extraction
-            await resume.seek(0)
+            saved = await store_upload_by_hash(resume, UPLOAD_DIRECTORY)
+            print(f"[INFO] Stored {saved['size']} bytes for user {user_id} (sha256 {saved['sha256'][:12]})")
         except Exception as e:
             print(f"[ERROR] Failed to save file: {str(e)}")
             raise HTTPException(
@@ -68,94 +55,55 @@ async def upload_resume(resume: UploadFile = File(...), user: tuple = Depends(ge
                 detail="Failed to save resume file"
             )
         
-        # Extract text using the improved function
-        raw_text = extract_text_from_uploaded_file(resume.file)
-        
-        if not raw_text or len(raw_text.strip()) < 50:
-            # Clean up saved file if text extraction failed
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            
-            return {
-                "status": "error", 
-                "resume": resume.filename, 
-                "message": "Could not extract sufficient text from PDF",
-                "entities": {"skills": [], "education": [], "experience": []},
-                "profile_updated": False
-            }
-        
-        print(f"[INFO] Extracted {len(raw_text)} characters from {resume.filename}")
-        
-        # Extract entities
-        entities = extract_entities(raw_text)
-        print(f"[INFO] Entities extracted: {entities}")
-        
-        # Check if resume already exists in database for this user
-        try:
-            # Delete existing resume record if exists
-            delete_existing_resume_query = """
-                DELETE FROM resumes WHERE user_id = %s
-            """
-            cursor.execute(delete_existing_resume_query, (user_id,))
-            conn.commit()
-            print(f"[INFO] Removed existing resume record for user {user_id}")
-        except Exception as e:
-            print(f"[WARNING] Error checking/deleting existing resume: {str(e)}")
-            conn.rollback()
-        
-        # Store the raw text (not cleaned) to preserve formatting for preview
-        try:
-            insert_resume(name=safe_filename, description=raw_text, entities=entities, user_id=user_id)
-            
-            # Update user profile with resume data
-            profile_updated = update_profile_from_resume(
-                user_id, 
-                safe_filename, 
-                file_path, 
-                entities
-            )
-            
-            if not profile_updated:
-                print(f"[WARNING] Failed to update profile for user {user_id}")
-            
-        except Exception as e:
-            # Clean up saved file if database operations failed
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise e
-        
-        return {
-            "status": "success", 
-            "resume": resume.filename, 
-            "entities": entities,
-            "text_preview": raw_text[:500] + "..." if len(raw_text) > 500 else raw_text,
-            "profile_updated": profile_updated,
-            "message": "Resume uploaded and profile updated successfully (previous resume overwritten if existed)"
-        }
+        if async_mode:
+            job_id = await submit_upload("resume", user_id, username, resume.filename, saved)
+            return JSONResponse(status_code=202, content={
+                "status": "queued",
+                "job_id": job_id,
+                "resume": resume.filename,
+                "status_url": f"/uploads/{job_id}"
+            })
+        
+        result = await process_resume_file(user_id, username, saved, resume.filename)
+        if result["status"] == "success":
+            await run_db(submit_scoring, resume_id=result["resume_id"])
+        else:
+            # Clean up the stored file if text extraction failed
+            await run_db(discard_new_resume_file, saved)
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
         print(f"[ERROR] Failed to process {resume.filename}: {str(e)}")
         
-        # Clean up any saved files in case of error
-        safe_filename = f"{user_id}_{username}.pdf"
-        file_path = os.path.join(UPLOAD_DIRECTORY, safe_filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        # Clean up the stored file in case of error
+        await run_db(discard_new_resume_file, saved)
         
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process resume: {str(e)}"
         )
 
+
 @router.post("/download")
-async def download_resume(request: ResumeDownloadRequest, user: tuple = Depends(get_current_user)):
+async def download_resume(request: ResumeDownloadRequest, http_request: Request, user: tuple = Depends(get_current_user)):
     """
     Download resume file. 
     - Regular users can download their own resume (don't need to provide user_id)
     - Admin/Recruiter can download any user's resume by providing user_id
+    Supports If-None-Match (304) and Range (206) requests.
     """
+    return await _serve_resume(http_request, request.user_id, user)
+
+
+@router.get("/download")
+async def download_resume_get(http_request: Request, user_id: Optional[int] = None, user: tuple = Depends(get_current_user)):
+    """GET variant of /resume/download so browsers and proxies can revalidate with the ETag"""
+    return await _serve_resume(http_request, user_id, user)
+
+
+async def _serve_resume(http_request: Request, target_user_id: Optional[int], user: tuple):
     try:
         user_dict = {
             "user_id": user[0],
@@ -168,9 +116,6 @@ async def download_resume(request: ResumeDownloadRequest, user: tuple = Depends(
         current_user_id = user_dict.get("user_id")
         current_user_role = user_dict.get("role")
         
-        # Determine which user's resume to download
-        target_user_id = request.user_id
-        
         # If no user_id provided, use current user's ID
         if target_user_id is None:
             target_user_id = current_user_id
@@ -182,40 +127,35 @@ async def download_resume(request: ResumeDownloadRequest, user: tuple = Depends(
                 detail="You can only download your own resume"
             )
         
-        # Get the target user's username from database
-        try:
-            query = "SELECT name FROM user_profiles WHERE user_id = %s"
-            cursor.execute(query, (target_user_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                raise HTTPException(
-                    status_code=404,
-                    detail="User not found"
-                )
-            
-            target_username = result[0]
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch user: {str(e)}")
+        resume = await get_resume_by_user(target_user_id)
+        if not resume:
             raise HTTPException(
-                status_code=500,
-                detail="Failed to retrieve user information"
+                status_code=404,
+                detail=f"Resume not found for user {target_user_id}"
             )
+        download_name = f"{os.path.splitext(resume['name'] or str(target_user_id))[0]}_resume.pdf"
         
-        # Construct filename using standardized pattern
-        filename = f"{target_user_id}_{target_username}.pdf"
-        file_path = os.path.join(UPLOAD_DIRECTORY, filename)
+        # Content-addressed file: the hash doubles as a strong ETag
+        if resume["file_hash"]:
+            file_path = content_path(UPLOAD_DIRECTORY, resume["file_hash"])
+            if not os.path.exists(file_path):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Resume file not found for user {target_user_id}"
+                )
+            return conditional_file_response(http_request, file_path, resume["file_hash"], download_name)
         
-        if not os.path.exists(file_path):
+        # Resumes uploaded before content addressing: path recorded on the profile
+        profile = await get_user_profile(target_user_id)
+        file_path = profile.get("resume_file_path") if profile else None
+        if not file_path or not os.path.exists(file_path):
             raise HTTPException(
                 status_code=404,
-                detail=f"Resume file not found for user {target_username}"
+                detail=f"Resume file not found for user {target_user_id}"
             )
-        
-        from fastapi.responses import FileResponse
         return FileResponse(
             path=file_path,
-            filename=f"{target_username}_resume.pdf",
+            filename=download_name,
             media_type='application/pdf'
         )
         
@@ -226,4 +166,4 @@ async def download_resume(request: ResumeDownloadRequest, user: tuple = Depends(
         raise HTTPException(
             status_code=500,
             detail="Failed to download resume"
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+from service.async_db import get_upload_job
+from models.upload_models import UploadStatusResponse
+from auth import get_current_user
+
+router = APIRouter(prefix="/uploads", tags=["Uploads"])
+
+@router.get("/{job_id}", response_model=UploadStatusResponse)
+async def upload_status(job_id: str, user: tuple = Depends(get_current_user)):
+    """
+    Status of an upload submitted in async mode: queued -> extracting -> extracted -> stored -> scored
+    (or failed). result holds the entities once extracted and the full upload response once stored.
+    """
+    user_dict = {
+        "user_id": user[0],
+        "username": user[1],
+        "email": user[2],
+        "hashed_password": user[3],
+        "role": user[4]
+    }
+
+    job = await get_upload_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    # Users only see their own uploads
+    if job["user_id"] != user_dict.get("user_id") and user_dict.get("role") != "admin":
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    return job
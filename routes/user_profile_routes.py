@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from typing import List, Optional
 from auth import get_current_user
-from service.user_profiles_service import (
+from service.async_db import (
+    run_db,
     get_user_profile, 
-    update_user_profile, 
-    get_all_user_profiles
+    update_user_profile
 )
+from service.user_profiles_service import get_all_user_profiles
+from service.pagination import paginate, InvalidCursor, NEXT_CURSOR_HEADER
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from models.user_profile_models import (
     UserProfileResponse, 
     UserProfileUpdate, 
@@ -29,7 +32,7 @@ async def get_my_profile(user: tuple = Depends(get_current_user)):
         
         user_id = user_dict.get("user_id")
         print(f"[INFO] Fetching profile for user_id: {user_id}")
-        profile = get_user_profile(user_id)
+        profile = await get_user_profile(user_id)
         
         if not profile:
             raise HTTPException(
@@ -73,7 +76,7 @@ async def update_my_profile(
             )
         
         # Get current profile to merge with updates
-        current_profile = get_user_profile(user_id)
+        current_profile = await get_user_profile(user_id)
         if not current_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
@@ -101,7 +104,7 @@ async def update_my_profile(
         update_data["completion_percentage"] = completion_percentage
         
         # Update profile with completion percentage
-        success = update_user_profile(user_id, update_data)
+        success = await update_user_profile(user_id, update_data)
         
         if not success:
             raise HTTPException(
@@ -110,7 +113,7 @@ async def update_my_profile(
             )
         
         # Return updated profile
-        updated_profile = get_user_profile(user_id)
+        updated_profile = await get_user_profile(user_id)
         return updated_profile
         
     except HTTPException:
@@ -124,8 +127,16 @@ async def update_my_profile(
 
 
 @router.get("/all", response_model=List[UserProfileSummary])
-async def get_all_profiles(user: tuple = Depends(get_current_user)):
-    """Get all user profiles summary (admin only)"""
+async def get_all_profiles(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user: tuple = Depends(get_current_user)
+):
+    """
+    User profile summaries (admin only), most recently updated first, one page at a time.
+    The cursor of the next page is returned in the X-Next-Cursor header.
+    """
     try:
         # Check if current user is admin
         user_dict = {
@@ -136,14 +147,19 @@ async def get_all_profiles(user: tuple = Depends(get_current_user)):
             "role": user[4]
         }
         
-        user_role = user_dict.get("user_role")
+        user_role = user_dict.get("role")
         if user_role != "admin":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Admin access required"
             )
         
-        profiles = get_all_user_profiles()
+        try:
+            profiles, next_cursor = await run_db(paginate, get_all_user_profiles, ("updated_at", "id"), limit, cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         # Convert to summary format
         profile_summaries = []
@@ -157,7 +173,7 @@ async def get_all_profiles(user: tuple = Depends(get_current_user)):
                 "location": profile["location"],
                 "skills_count": len(profile["skills"]) if profile["skills"] else 0,
                 "experience_count": len(profile["experience"]) if profile["experience"] else 0,
-                "profile_completed": profile["profile_completed"],
+                "profile_completed": profile["completion_percentage"] >= 100,
                 "resume_uploaded": bool(profile["resume_filename"]),
                 "last_updated": profile["updated_at"]
             })
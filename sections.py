@@ -0,0 +1,120 @@
+# sections.py
+import re
+from typing import List
+
+# Heading phrases per section type. A line is a heading when, after lowercasing and
+# dropping punctuation/numbering, it is exactly one of these phrases ("Skills & Tools"
+# matches "skills and tools": the "and" of a phrase is optional). Multi-word variants are
+# listed explicitly, so job-title lines such as "Project Manager" are not headings.
+SECTION_HEADINGS = {
+    "summary": [
+        "professional summary", "career summary", "career objective", "summary",
+        "objective", "profile", "about me", "overview", "job summary", "about the role",
+        "profile summary", "executive summary", "professional profile",
+    ],
+    "skills": [
+        "technical skills", "key skills", "core competencies", "competencies", "skills",
+        "technologies", "tech stack", "tools", "skills and tools", "skill set", "skills summary",
+        "technical skills and tools", "skills and competencies",
+    ],
+    "experience": [
+        "work experience", "professional experience", "employment history", "work history",
+        "career history", "experience", "employment", "internships", "internship",
+        "key responsibilities", "roles and responsibilities", "responsibilities",
+        "experience details", "relevant experience", "internship experience", "work experience details",
+    ],
+    "education": [
+        "educational qualifications", "educational qualification", "academic qualifications",
+        "academic background", "academic details", "academics", "education", "degree",
+        "education details", "education and training", "educational background", "educational details",
+        "education background", "academic qualification",
+    ],
+    "projects": [
+        "academic projects", "personal projects", "key projects", "projects", "project",
+        "projects and achievements", "project details", "major projects", "project work",
+    ],
+    "requirements": [
+        "job requirements", "requirements", "preferred qualifications", "qualifications",
+        "qualification", "eligibility", "what we are looking for", "must have",
+        "required qualifications", "minimum qualifications", "requirements and qualifications",
+    ],
+    "other": [
+        "certifications", "certificates", "achievements", "awards", "languages", "hobbies",
+        "interests", "references", "personal details", "declaration", "publications",
+        "about us", "benefits", "certifications and achievements", "awards and achievements",
+        "hobbies and interests", "extra curricular activities", "extracurricular activities",
+        "languages known",
+    ],
+}
+
+SECTION_TYPES = ("header",) + tuple(SECTION_HEADINGS)
+
+EDUCATION_SECTION_TYPES = ("education", "requirements")
+EXPERIENCE_SECTION_TYPES = ("header", "summary", "experience", "requirements")
+
+def _phrase_pattern(phrase: str) -> str:
+    """Regex for a heading phrase on normalized text, with its "and" words optional"""
+    words = [r"(?:and\s+)?" if word == "and" else re.escape(word) + r"\s+" for word in phrase.split()]
+    return "".join(words)[:-len(r"\s+")]
+
+
+HEADING_REGEX = re.compile(
+    "^(?:"
+    + "|".join(
+        f"(?P<{section_type}>" + "|".join(_phrase_pattern(p) for p in phrases) + ")"
+        for section_type, phrases in SECTION_HEADINGS.items()
+    )
+    + ")$"
+)
+LINE_REGEX = re.compile(r"[^\n]*\n?")
+MAX_HEADING_LENGTH = 50
+
+
+def heading_type(line: str):
+    """Return the section type if the line looks like a section heading, else None"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADING_LENGTH or stripped.endswith("."):
+        return None
+    normalized = re.sub(r"[^a-z]+", " ", stripped.lower()).strip()
+    match = HEADING_REGEX.match(normalized)
+    return match.lastgroup if match else None
+
+
+def segment_document(text: str) -> List[dict]:
+    """
+    Split a resume or job description once into typed sections with character offsets.
+    Text before the first heading is a "header" section. Each section's text includes its
+    heading line, so keyword context ("Work Experience") stays visible to extractors.
+    """
+    if not text:
+        return []
+
+    sections = []
+    current_type = "header"
+    current_start = 0
+    for match in LINE_REGEX.finditer(text):
+        if match.start() == match.end():
+            break
+        section_type = heading_type(match.group())
+        if section_type is None:
+            continue
+        if match.start() > current_start:
+            sections.append(_make_section(text, current_type, current_start, match.start()))
+        current_type = section_type
+        current_start = match.start()
+
+    sections.append(_make_section(text, current_type, current_start, len(text)))
+    return sections
+
+
+def _make_section(text: str, section_type: str, start: int, end: int) -> dict:
+    return {"type": section_type, "start": start, "end": end, "text": text[start:end]}
+
+
+def select_sections(sections: List[dict], types) -> List[dict]:
+    """
+    Sections of the requested types, in document order. Falls back to every section when
+    none of the requested types were found, so documents without headings are still scanned.
+    """
+    selected = [section for section in sections if section["type"] in types]
+    return selected if selected else sections
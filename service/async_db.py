@@ -0,0 +1,97 @@
+# service/async_db.py
+"""
+Awaitable versions of the service functions, for async route handlers.
+
+MySQLdb is blocking, so each call runs the regular service function on a bounded thread
+pool (DB_ASYNC_WORKERS threads, each borrowing a pooled connection). The event loop stays
+free and concurrent requests overlap their database waits. Signatures match service/*.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config import DB_ASYNC_WORKERS
+from service import (
+    candidates_service, jobs_service, matches_service, posted_jobs_service, recommendation_service,
+    resumes_service, stats_service, top_matches_service, upload_jobs_service, user_profiles_service,
+    users_service,
+)
+
+_executor = ThreadPoolExecutor(max_workers=max(1, DB_ASYNC_WORKERS), thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call on the DB thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def awaitable(func):
+    """Async wrapper with the same signature as a blocking service function"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+
+def shutdown_async_db():
+    _executor.shutdown(wait=False)
+
+
+# ---------- CANDIDATES ----------
+create_candidate_from_match = awaitable(candidates_service.create_candidate_from_match)
+get_candidates_by_recruiter = awaitable(candidates_service.get_candidates_by_recruiter)
+get_candidate_by_id = awaitable(candidates_service.get_candidate_by_id)
+update_candidate_status = awaitable(candidates_service.update_candidate_status)
+get_candidate_statistics = awaitable(candidates_service.get_candidate_statistics)
+
+# ---------- JOBS ----------
+insert_job = awaitable(jobs_service.insert_job)
+get_all_jobs = awaitable(jobs_service.get_all_jobs)
+get_jobs_by_creator = awaitable(jobs_service.get_jobs_by_creator)
+update_job = awaitable(jobs_service.update_job)
+
+# ---------- POSTED JOBS ----------
+insert_posted_job = awaitable(posted_jobs_service.insert_posted_job)
+get_all_posted_jobs = awaitable(posted_jobs_service.get_all_posted_jobs)
+get_posted_jobs_by_creator = awaitable(posted_jobs_service.get_posted_jobs_by_creator)
+update_posted_job = awaitable(posted_jobs_service.update_posted_job)
+
+# ---------- MATCHES ----------
+get_match_scores = awaitable(matches_service.get_match_scores)
+get_matches_for_recruiter = awaitable(matches_service.get_matches_for_recruiter)
+get_detailed_match_explanation = awaitable(matches_service.get_detailed_match_explanation)
+
+# ---------- RECOMMENDATIONS ----------
+fetch_saved_jobs = awaitable(recommendation_service.fetch_saved_jobs)
+get_user_active_resume_id = awaitable(recommendation_service.get_user_active_resume_id)
+get_top_recommendations = awaitable(recommendation_service.get_top_recommendations)
+update_job_save_status = awaitable(recommendation_service.update_job_save_status)
+update_job_status_to_applied = awaitable(recommendation_service.update_job_status_to_applied)
+update_job_status_to_closed = awaitable(recommendation_service.update_job_status_to_closed)
+
+# ---------- RESUMES ----------
+replace_user_resume = awaitable(resumes_service.replace_user_resume)
+get_all_resumes = awaitable(resumes_service.get_all_resumes)
+get_resume_by_user = awaitable(resumes_service.get_resume_by_user)
+get_resume_by_hash = awaitable(resumes_service.get_resume_by_hash)
+count_resumes_with_hash = awaitable(resumes_service.count_resumes_with_hash)
+
+# ---------- STATS ----------
+get_table_counts = awaitable(stats_service.get_table_counts)
+
+# ---------- TOP MATCHES ----------
+get_top_matches = awaitable(top_matches_service.get_top_matches)
+
+# ---------- UPLOAD JOBS ----------
+create_upload_job = awaitable(upload_jobs_service.create_upload_job)
+update_upload_job = awaitable(upload_jobs_service.update_upload_job)
+get_upload_job = awaitable(upload_jobs_service.get_upload_job)
+
+# ---------- USER PROFILES ----------
+get_user_profile = awaitable(user_profiles_service.get_user_profile)
+update_user_profile = awaitable(user_profiles_service.update_user_profile)
+get_all_user_profiles = awaitable(user_profiles_service.get_all_user_profiles)
+
+# ---------- USERS ----------
+get_user_by_username = awaitable(users_service.get_user_by_username)
+get_user_by_email = awaitable(users_service.get_user_by_email)
@@ -1,8 +1,13 @@
 import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection
+from cache import TTLCache
+from config import CANDIDATE_STATS_TTL_SECONDS, CANDIDATE_STATS_CACHE_SIZE
 from datetime import datetime
 
+# /candidates/statistics is polled by every open recruiter dashboard
+_statistics_cache = TTLCache("candidate_statistics", CANDIDATE_STATS_TTL_SECONDS, CANDIDATE_STATS_CACHE_SIZE)
+
 def safe_json_loads(data):
     if data and data.strip():  # data is not None and not empty/whitespace
         try:
@@ -15,7 +20,7 @@ def safe_json_loads(data):
 def create_candidate_from_match(match_id: int):
     """Create a candidate entry when a match is created"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Get match details
@@ -53,6 +58,7 @@ def create_candidate_from_match(match_id: int):
         
         conn.commit()
         conn.close()
+        invalidate_candidate_statistics(creator_email)
         print(f"✅ Candidate created for match_id: {match_id}")
         return True
         
@@ -68,11 +74,25 @@ def create_candidate_from_match(match_id: int):
         return False
 
 
-def get_candidates_by_recruiter(creator_email: str):
-    """Get all candidates for a specific recruiter without filters"""
+def get_candidates_by_recruiter(creator_email: str, limit: int = None, after: tuple = None):
+    """
+    Get candidates for a specific recruiter without filters, best match first.
+    limit/after (candidate_id,) select one keyset page: the seek reads the last candidate's raw
+    match score on the server, so the rounded score in the response is never compared.
+    """
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        params = [creator_email]
+        seek_sql = ""
+        if after is not None:
+            anchor = "(SELECT ma.final_score FROM candidates ca JOIN matches ma ON ca.match_id = ma.id WHERE ca.id = %s)"
+            seek_sql = f" AND (m.final_score < {anchor} OR (m.final_score = {anchor} AND c.id < %s))"
+            params.extend([after[0], after[0], after[0]])
+        limit_sql = ""
+        if limit is not None:
+            limit_sql = " LIMIT %s"
+            params.append(limit)
         
         query = """
             SELECT 
@@ -100,24 +120,17 @@ def get_candidates_by_recruiter(creator_email: str):
                 up.experience,
                 up.resume_filename,
                 up.upload_date,
-                CASE 
-                    WHEN c.job_source = 'jobs' THEN j.title
-                    ELSE pj.title
-                END as job_title,
-                CASE 
-                    WHEN c.job_source = 'jobs' THEN j.company
-                    ELSE pj.company
-                END as company
+                jc.title as job_title,
+                jc.company
             FROM candidates c
             JOIN matches m ON c.match_id = m.id
             JOIN user_profiles up ON c.profile_id = up.id
-            LEFT JOIN jobs j ON c.job_id = j.id AND c.job_source = 'jobs'
-            LEFT JOIN posted_jobs pj ON c.job_id = pj.id AND c.job_source = 'posted_jobs'
-            WHERE c.creator_email = %s
-            ORDER BY m.final_score DESC
+            LEFT JOIN job_catalog jc ON jc.source = c.job_source AND jc.source_id = c.job_id
+            WHERE c.creator_email = %s""" + seek_sql + """
+            ORDER BY m.final_score DESC, c.id DESC""" + limit_sql + """
         """
 
-        cursor.execute(query, (creator_email,))
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         conn.close()
 
@@ -165,7 +178,7 @@ def get_candidates_by_recruiter(creator_email: str):
 def get_candidate_by_id(candidate_id: int):
     """Get detailed information about a specific candidate"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -194,23 +207,13 @@ def get_candidate_by_id(candidate_id: int):
                 up.resume_filename,
                 up.resume_file_path,
                 up.upload_date,
-                CASE 
-                    WHEN c.job_source = 'jobs' THEN j.title
-                    ELSE pj.title
-                END as job_title,
-                CASE 
-                    WHEN c.job_source = 'jobs' THEN j.company
-                    ELSE pj.company
-                END as company,
-                CASE 
-                    WHEN c.job_source = 'jobs' THEN j.description
-                    ELSE pj.description
-                END as job_description
+                jc.title as job_title,
+                jc.company,
+                jc.description as job_description
             FROM candidates c
             JOIN matches m ON c.match_id = m.id
             JOIN user_profiles up ON c.profile_id = up.id
-            LEFT JOIN jobs j ON c.job_id = j.id AND c.job_source = 'jobs'
-            LEFT JOIN posted_jobs pj ON c.job_id = pj.id AND c.job_source = 'posted_jobs'
+            LEFT JOIN job_catalog jc ON jc.source = c.job_source AND jc.source_id = c.job_id
             WHERE c.id = %s
         """, (candidate_id,))
         
@@ -258,17 +261,17 @@ def update_candidate_status(candidate_id: int, new_status: str):
     """Update candidate status"""
     conn = None
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT status FROM candidates WHERE id = %s", (candidate_id,))
+        cursor.execute("SELECT status, creator_email FROM candidates WHERE id = %s", (candidate_id,))
         current_row = cursor.fetchone()
         
         if not current_row:
             print(f"❌ Candidate ID {candidate_id} not found")
             return False
         
-        current_status = current_row[0]
+        current_status, creator_email = current_row
         
         # Update with proper timestamp logic
         if current_status == 'available' and new_status == 'interview_scheduled':
@@ -293,6 +296,7 @@ def update_candidate_status(candidate_id: int, new_status: str):
         rows_affected = cursor.rowcount
         
         if rows_affected > 0:
+            invalidate_candidate_statistics(creator_email)
             print(f"✅ Candidate status updated: ID {candidate_id} -> {new_status}")
             return True
         
@@ -307,60 +311,55 @@ def update_candidate_status(candidate_id: int, new_status: str):
             conn.close()
 
 
-def get_candidate_statistics(creator_email: str):
-    """Get candidate statistics for a recruiter's dashboard"""
+def invalidate_candidate_statistics(creator_email: str):
+    """Drop a recruiter's cached statistics after their candidates changed"""
+    _statistics_cache.invalidate(creator_email)
+
+
+def _load_candidate_statistics(creator_email: str):
+    conn = None
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
-        
-        # Total candidates
-        cursor.execute("""
-            SELECT COUNT(*) FROM candidates WHERE creator_email = %s
-        """, (creator_email,))
-        total_candidates = cursor.fetchone()[0]
-        
-        # Candidates by status
-        cursor.execute("""
-            SELECT status, COUNT(*) as count
-            FROM candidates
-            WHERE creator_email = %s
-            GROUP BY status
-        """, (creator_email,))
-        status_counts = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        # Average match score
+
+        # Totals, per-status counts, average match score and last-7-days count in one pass
         cursor.execute("""
-            SELECT AVG(m.final_score)
+            SELECT COUNT(*),
+                   COALESCE(SUM(c.status = 'available'), 0),
+                   COALESCE(SUM(c.status = 'interview_scheduled'), 0),
+                   COALESCE(SUM(c.status = 'under_review'), 0),
+                   COALESCE(SUM(c.status = 'hired'), 0),
+                   COALESCE(SUM(c.status = 'rejected'), 0),
+                   AVG(m.final_score),
+                   COALESCE(SUM(c.created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)), 0)
             FROM candidates c
-            JOIN matches m ON c.match_id = m.id
+            LEFT JOIN matches m ON c.match_id = m.id
             WHERE c.creator_email = %s
         """, (creator_email,))
-        avg_score_row = cursor.fetchone()
-        avg_score = round(avg_score_row[0], 2) if avg_score_row[0] else 0
-        
-        # Recent candidates (last 7 days)
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM candidates
-            WHERE creator_email = %s
-            AND created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-        """, (creator_email,))
-        recent_candidates = cursor.fetchone()[0]
-        
-        conn.close()
-        
+        total, available, interview_scheduled, under_review, hired, rejected, avg_score, recent = cursor.fetchone()
+
         return {
-            "total_candidates": total_candidates,
-            "available": status_counts.get('available', 0),
-            "interview_scheduled": status_counts.get('interview_scheduled', 0),
-            "under_review": status_counts.get('under_review', 0),
-            "hired": status_counts.get('hired', 0),
-            "rejected": status_counts.get('rejected', 0),
-            "average_match_score": avg_score,
-            "recent_candidates": recent_candidates
+            "total_candidates": int(total),
+            "available": int(available),
+            "interview_scheduled": int(interview_scheduled),
+            "under_review": int(under_review),
+            "hired": int(hired),
+            "rejected": int(rejected),
+            "average_match_score": round(avg_score, 2) if avg_score else 0,
+            "recent_candidates": int(recent)
         }
     except Exception as e:
         print(f"❌ Error fetching candidate statistics: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_candidate_statistics(creator_email: str):
+    """Get candidate statistics for a recruiter's dashboard (cached per recruiter for a few seconds)"""
+    statistics = _statistics_cache.get_or_load(creator_email, lambda: _load_candidate_statistics(creator_email))
+    if statistics is None:
         return {
             "total_candidates": 0,
             "available": 0,
@@ -370,4 +369,5 @@ def get_candidate_statistics(creator_email: str):
             "rejected": 0,
             "average_match_score": 0,
             "recent_candidates": 0
-        }
\ No newline at end of file
+        }
+    return dict(statistics)
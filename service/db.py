@@ -1,13 +1,388 @@
 import MySQLdb as sql
+import os
 import json
-from config import DB_CONFIG
+import time
+import threading
+from collections import deque
+from config import (
+    DB_CONFIG, DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_PING_INTERVAL_SECONDS,
+)
 from datetime import datetime
+
+
+# ---------- CONNECTION POOL ----------
+class PoolTimeout(sql.OperationalError):
+    """No connection became available within DB_POOL_TIMEOUT_SECONDS"""
+
+
+class PooledConnection:
+    """
+    A pooled MySQLdb connection. close() (or leaving a `with` block) returns it to the pool
+    instead of closing the socket, so existing `conn.close()` call sites keep working.
+    Everything else is delegated to the underlying connection.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise sql.InterfaceError("Connection already returned to the pool")
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for code paths that return or raise before closing
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe MySQL connection pool. Keeps up to `size` idle connections and allows `max_overflow`
+    extra ones under load (closed on release); further checkouts wait up to `timeout` seconds.
+    Connections idle for longer than `ping_interval` are pinged on checkout and replaced if dead.
+    Open transactions are rolled back when a connection is returned.
+    """
+
+    def __init__(self, size: int, max_overflow: int, timeout: float, ping_interval: float, **connect_kwargs):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.connect_kwargs = connect_kwargs
+        self._reset_for_process()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_for_process)
+
+    def _reset_for_process(self):
+        # Connections must never be shared with forked worker processes: children start empty
+        self._pid = os.getpid()
+        self._lock = threading.Condition()
+        self._idle = deque()  # (raw connection, returned at)
+        self._open = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "discarded": 0,
+        }
+
+    def _healthy(self, raw, returned_at: float) -> bool:
+        if time.monotonic() - returned_at < self.ping_interval:
+            return True
+        try:
+            raw.ping()
+            return True
+        except sql.Error:
+            return False
+
+    def _discard(self, raw):
+        self._stats["discarded"] += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def connect(self) -> PooledConnection:
+        """Check out a connection (blocks while the pool and overflow are exhausted)"""
+        with self._lock:
+            self._stats["checkouts"] += 1
+            waited_from = None
+            while True:
+                while self._idle:
+                    raw, returned_at = self._idle.pop()
+                    if self._healthy(raw, returned_at):
+                        self._record_wait(waited_from)
+                        return PooledConnection(self, raw)
+                    self._open -= 1
+                    self._discard(raw)
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._stats["waits"] += 1
+                remaining = self.timeout - (time.monotonic() - waited_from)
+                if remaining <= 0 or not self._lock.wait(remaining):
+                    if not self._idle and self._open >= self.size + self.max_overflow:
+                        self._stats["timeouts"] += 1
+                        self._record_wait(waited_from)
+                        raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        self._record_wait(waited_from)
+
+        # Open the new connection outside the lock
+        try:
+            raw = sql.connect(**self.connect_kwargs)
+        except Exception:
+            with self._lock:
+                self._open -= 1
+                self._lock.notify()
+            raise
+        self._stats["created"] += 1
+        return PooledConnection(self, raw)
+
+    def _record_wait(self, waited_from):
+        if waited_from is not None:
+            waited = time.monotonic() - waited_from
+            self._stats["wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def release(self, raw):
+        if self._pid != os.getpid():
+            return  # Checked out before a fork; never reuse it here
+        try:
+            raw.rollback()
+            reusable = True
+        except sql.Error:
+            reusable = False
+        with self._lock:
+            if reusable and len(self._idle) < self.size:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._open -= 1
+                self._discard(raw)
+            self._lock.notify()
+
+    def close_idle(self):
+        with self._lock:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._open -= 1
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+            checkouts = self._stats["checkouts"]
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": idle,
+                "in_use": self._open - idle,
+                "checkouts": checkouts,
+                "waits": self._stats["waits"],
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_seconds": round(self._stats["wait_seconds"] / self._stats["waits"], 4) if self._stats["waits"] else 0.0,
+                "max_wait_seconds": round(self._stats["max_wait_seconds"], 4),
+                "created": self._stats["created"],
+                "discarded": self._stats["discarded"],
+            }
+
+
+_pool = ConnectionPool(
+    DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_PING_INTERVAL_SECONDS, **DB_CONFIG
+)
+
+
+def get_connection() -> PooledConnection:
+    """
+    Pooled replacement for sql.connect(**DB_CONFIG). Use as `with get_connection() as conn:`
+    or call conn.close() as before; either returns the connection to the pool.
+    """
+    return _pool.connect()
+
+
+def get_db_pool_stats() -> dict:
+    return _pool.stats()
+
+
+def close_db_pool():
+    """Close idle pooled connections (app shutdown)"""
+    _pool.close_idle()
+
  
 # ---------- INIT ----------
+def _ensure_column(cursor, table: str, column: str, definition: str, index: str = None):
+    """Add a column (and optional single-column index) to an existing table if it is missing"""
+    cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        print(f"🔹 Added column {table}.{column}")
+    if index:
+        _ensure_index(cursor, table, index, column)
+
+
+def _ensure_index(cursor, table: str, index: str, columns: str):
+    """Add an index to an existing table if it is missing"""
+    cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index,))
+    if cursor.fetchone() is None:
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+        print(f"🔹 Added index {table}.{index}")
+
+
+# ---------- CACHE TABLES ----------
+def evict_overflow(cursor, table: str, max_entries: int, order_by: str) -> int:
+    """
+    Delete exactly the rows beyond max_entries from a cache table, least recently used first.
+    order_by must end with the primary key so rows sharing a (one-second) timestamp are
+    evicted one by one instead of all at once. Returns the number of rows deleted.
+    """
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    overflow = cursor.fetchone()[0] - max_entries
+    if overflow <= 0:
+        return 0
+    cursor.execute(f"DELETE FROM {table} ORDER BY {order_by} LIMIT %s", (overflow,))
+    return cursor.rowcount
+
+
+# Tables whose row counts are kept in table_counters by AFTER INSERT/DELETE triggers, so
+# dashboards read a few counter rows instead of counting (or loading) the tables.
+# FK cascades do not fire MySQL triggers, so only tables the app never deletes from by
+# cascade are counted; init_db reconciles the counters with COUNT(*) on every start.
+COUNTED_TABLES = ("users", "resumes", "jobs", "posted_jobs")
+
+
+def counter_trigger_names(table: str) -> tuple:
+    return f"trg_{table}_count_insert", f"trg_{table}_count_delete"
+
+
+def _ensure_trigger(cursor, trigger: str, definition: str):
+    """Create a trigger if it is missing; definition is everything after CREATE TRIGGER <name>"""
+    cursor.execute("SELECT 1 FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() "
+                   "AND TRIGGER_NAME = %s", (trigger,))
+    if cursor.fetchone() is None:
+        cursor.execute(f"CREATE TRIGGER {trigger} {definition}")
+        print(f"🔹 Added trigger {trigger}")
+
+
+def _ensure_counter_triggers(cursor, table: str):
+    """Create the triggers keeping table_counters in step with inserts and deletes on table"""
+    for trigger, event, delta in zip(counter_trigger_names(table), ("INSERT", "DELETE"), ("+ 1", "- 1")):
+        _ensure_trigger(cursor, trigger, f"""AFTER {event} ON {table} FOR EACH ROW
+            UPDATE table_counters SET row_count = row_count {delta} WHERE table_name = '{table}'""")
+
+
+def _reconcile_table_counters(cursor):
+    """Reset every counter to the table's real row count (repairs drift from cascades or downtime)"""
+    for table in COUNTED_TABLES:
+        cursor.execute(f"""
+            INSERT INTO table_counters (table_name, row_count)
+            SELECT %s, COUNT(*) FROM {table}
+            ON DUPLICATE KEY UPDATE row_count = VALUES(row_count)
+        """, (table,))
+
+
+# Unified job catalog: every row of jobs and posted_jobs under (source, source_id), the same
+# key matches and candidates use as (job_source, job_id). Read paths join this one indexed
+# relation instead of UNIONing both tables or LEFT JOINing both with CASE. It is kept in
+# step by triggers on the two source tables and reconciled by init_db on every start.
+JOB_CATALOG_SOURCES = ("jobs", "posted_jobs")
+JOB_CATALOG_COLUMNS = ("title", "description", "skills", "education", "experience", "company", "location",
+                       "creator_email", "job_type", "salary", "status", "created_at", "updated_at")
+
+
+def _ensure_job_catalog_triggers(cursor, source: str):
+    """Create the triggers mirroring inserts, updates and deletes on a source table into job_catalog"""
+    columns = ", ".join(JOB_CATALOG_COLUMNS)
+    values = ", ".join(f"NEW.{column}" for column in JOB_CATALOG_COLUMNS)
+    assignments = ", ".join(f"{column} = NEW.{column}" for column in JOB_CATALOG_COLUMNS)
+    upsert = f"""INSERT INTO job_catalog (source, source_id, {columns})
+            VALUES ('{source}', NEW.id, {values})
+            ON DUPLICATE KEY UPDATE {assignments}"""
+    _ensure_trigger(cursor, f"trg_{source}_catalog_insert", f"AFTER INSERT ON {source} FOR EACH ROW {upsert}")
+    _ensure_trigger(cursor, f"trg_{source}_catalog_update", f"AFTER UPDATE ON {source} FOR EACH ROW {upsert}")
+    _ensure_trigger(cursor, f"trg_{source}_catalog_delete", f"""AFTER DELETE ON {source} FOR EACH ROW
+            DELETE FROM job_catalog WHERE source = '{source}' AND source_id = OLD.id""")
+
+
+_job_catalog_triggers_ready = False
+
+
+def _job_catalog_triggers_exist(cursor) -> bool:
+    """True once every job_catalog trigger exists (remembered per process once seen)"""
+    global _job_catalog_triggers_ready
+    if not _job_catalog_triggers_ready:
+        names = [f"trg_{source}_catalog_{event}" for source in JOB_CATALOG_SOURCES
+                 for event in ("insert", "update", "delete")]
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN ({', '.join(['%s'] * len(names))})
+        """, names)
+        _job_catalog_triggers_ready = cursor.fetchone()[0] == len(names)
+    return _job_catalog_triggers_ready
+
+
+def sync_job_catalog(cursor, source: str, ids: list = None, after_id: int = None):
+    """
+    Mirror written rows of jobs / posted_jobs into job_catalog when its triggers could not be
+    created (no-op when they exist). ids are the rows inserted, updated or deleted; after_id
+    selects every row with a larger id instead (bulk inserts). Call after the write, inside
+    the same transaction, so the catalog commits with it.
+    """
+    if (not ids and after_id is None) or _job_catalog_triggers_exist(cursor):
+        return
+    if after_id is not None:
+        where, params = "s.id > %s", [after_id]
+    else:
+        where, params = f"s.id IN ({', '.join(['%s'] * len(ids))})", list(ids)
+    cursor.execute(f"""
+        INSERT INTO job_catalog (source, source_id, {", ".join(JOB_CATALOG_COLUMNS)})
+        SELECT %s, s.id, {", ".join(f"s.{column}" for column in JOB_CATALOG_COLUMNS)}
+        FROM {source} s
+        WHERE {where}
+        ON DUPLICATE KEY UPDATE {", ".join(f"{column} = VALUES({column})" for column in JOB_CATALOG_COLUMNS)}
+    """, [source] + params)
+    if ids:
+        cursor.execute(f"""
+            DELETE jc FROM job_catalog jc
+            LEFT JOIN {source} s ON jc.source_id = s.id
+            WHERE jc.source = %s AND s.id IS NULL AND jc.source_id IN ({', '.join(['%s'] * len(ids))})
+        """, [source] + list(ids))
+
+
+def _reconcile_job_catalog(cursor):
+    """Backfill missing catalog rows, refresh rows whose source changed and drop orphans"""
+    columns = ", ".join(JOB_CATALOG_COLUMNS)
+    for source in JOB_CATALOG_SOURCES:
+        cursor.execute(f"""
+            INSERT INTO job_catalog (source, source_id, {columns})
+            SELECT %s, s.id, {", ".join(f"s.{column}" for column in JOB_CATALOG_COLUMNS)}
+            FROM {source} s
+            LEFT JOIN job_catalog jc ON jc.source = %s AND jc.source_id = s.id
+            WHERE jc.source_id IS NULL
+        """, (source, source))
+        added = cursor.rowcount
+        cursor.execute(f"""
+            UPDATE job_catalog jc
+            JOIN {source} s ON jc.source = %s AND jc.source_id = s.id
+            SET {", ".join(f"jc.{column} = s.{column}" for column in JOB_CATALOG_COLUMNS)}
+            WHERE NOT (jc.updated_at <=> s.updated_at)
+        """, (source,))
+        refreshed = cursor.rowcount
+        cursor.execute(f"""
+            DELETE jc FROM job_catalog jc
+            LEFT JOIN {source} s ON jc.source_id = s.id
+            WHERE jc.source = %s AND s.id IS NULL
+        """, (source,))
+        if added or refreshed or cursor.rowcount:
+            print(f"🔹 job_catalog {source}: {added} added, {refreshed} refreshed, {cursor.rowcount} removed")
+
+
 def init_db():
     try:
         print("🔹 Connecting to MySQL...")
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
  
         # Users table (no changes)
@@ -54,10 +429,14 @@ def init_db():
             skills JSON,
             education JSON,
             experience JSON,
+            file_hash CHAR(64),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            INDEX idx_file_hash (file_hash)
         );
         """)
+        # Databases created before content-addressed storage have no file_hash yet
+        _ensure_column(cursor, "resumes", "file_hash", "CHAR(64)", index="idx_file_hash")
  
         # Jobs table
         cursor.execute("""
@@ -159,7 +538,175 @@ def init_db():
             UNIQUE KEY unique_candidate (match_id, creator_email)
         );
         """)
- 
+
+        # Entity cache table - extract_entities results keyed by text hash + extractor/taxonomy version
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS entity_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            entities JSON NOT NULL,
+            hit_count INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_last_used (last_used_at)
+        );
+        """)
+
+        # Embedding cache table - BERT description embeddings (float32) keyed by model and description hash
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            model VARCHAR(100) NOT NULL,
+            text_hash CHAR(64) NOT NULL,
+            embedding MEDIUMBLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (model, text_hash),
+            INDEX idx_last_used (last_used_at)
+        );
+        """)
+
+        # Upload jobs table - status of uploads processed in the background (async upload mode)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS upload_jobs (
+            id CHAR(32) PRIMARY KEY,
+            kind ENUM('resume', 'job') NOT NULL,
+            user_id INT NOT NULL,
+            owner VARCHAR(255),
+            filename VARCHAR(255),
+            file_path VARCHAR(500) NOT NULL,
+            file_hash CHAR(64) NOT NULL,
+            status ENUM('queued', 'extracting', 'extracted', 'stored', 'scored', 'failed') NOT NULL DEFAULT 'queued',
+            result JSON,
+            record_id INT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_user_id (user_id),
+            INDEX idx_status (status),
+            INDEX idx_file_hash (file_hash)
+        );
+        """)
+        # Row created by the upload (set in the same transaction, so retries do not insert it twice)
+        _ensure_column(cursor, "upload_jobs", "record_id", "INT")
+        _ensure_index(cursor, "upload_jobs", "idx_file_hash", "file_hash")
+
+        # Task queue table - durable background tasks (higher priority first, leased while running)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_queue (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            task_type VARCHAR(100) NOT NULL,
+            task_class ENUM('interactive', 'batch') NOT NULL DEFAULT 'batch',
+            payload JSON,
+            priority INT NOT NULL DEFAULT 50,
+            status ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+            attempts INT NOT NULL DEFAULT 0,
+            max_attempts INT NOT NULL DEFAULT 5,
+            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            locked_by VARCHAR(255),
+            locked_until TIMESTAMP NULL,
+            result JSON,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_claim (status, priority DESC, run_after),
+            INDEX idx_locked_until (status, locked_until)
+        );
+        """)
+        _ensure_column(cursor, "task_queue", "task_class", "ENUM('interactive', 'batch') NOT NULL DEFAULT 'batch'")
+
+        # Indexes backing the keyset-paginated list endpoints (sort key, then id)
+        _ensure_index(cursor, "jobs", "idx_created_id", "created_at, id")
+        _ensure_index(cursor, "jobs", "idx_creator_created_id", "creator_email, created_at, id")
+        _ensure_index(cursor, "posted_jobs", "idx_created_id", "created_at, id")
+        _ensure_index(cursor, "posted_jobs", "idx_creator_created_id", "creator_email, created_at, id")
+        _ensure_index(cursor, "user_profiles", "idx_updated_id", "updated_at, id")
+        _ensure_index(cursor, "matches", "idx_score_id", "final_score, id")
+        _ensure_index(cursor, "matches", "idx_status_updated_id", "save_status, updated_at, id")
+
+        # Covers the per-recruiter candidate statistics aggregate
+        _ensure_index(cursor, "candidates", "idx_creator_status_created", "creator_email, status, created_at")
+
+        # Table counters - row counts for the dashboard, maintained by triggers
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_counters (
+            table_name VARCHAR(64) PRIMARY KEY,
+            row_count BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        );
+        """)
+        try:
+            for table in COUNTED_TABLES:
+                _ensure_counter_triggers(cursor, table)
+        except sql.Error as err:
+            # e.g. binary logging without log_bin_trust_function_creators; stats fall back to COUNT(*)
+            print(f"[WARNING] Could not create counter triggers, dashboard stats will use COUNT(*): {err}")
+        _reconcile_table_counters(cursor)
+
+        # Job catalog - jobs and posted_jobs as one relation keyed (source, source_id)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_catalog (
+            source ENUM('jobs', 'posted_jobs') NOT NULL,
+            source_id INT NOT NULL,
+            title VARCHAR(255),
+            description LONGTEXT,
+            skills JSON,
+            education JSON,
+            experience JSON,
+            company VARCHAR(255),
+            location VARCHAR(255),
+            creator_email VARCHAR(255),
+            job_type ENUM('full-time', 'part-time', 'internship', 'remote'),
+            salary VARCHAR(255),
+            status ENUM('active', 'closed') DEFAULT 'active',
+            created_at TIMESTAMP NULL,
+            updated_at TIMESTAMP NULL,
+            PRIMARY KEY (source, source_id),
+            INDEX idx_creator_email (creator_email)
+        );
+        """)
+        try:
+            for source in JOB_CATALOG_SOURCES:
+                _ensure_job_catalog_triggers(cursor, source)
+        except sql.Error as err:
+            # e.g. binary logging without log_bin_trust_function_creators; the job services then
+            # keep job_catalog in step themselves (sync_job_catalog)
+            print(f"[WARNING] Could not create job catalog triggers, job writes will sync job_catalog directly: {err}")
+        _reconcile_job_catalog(cursor)
+
+        # Resume top matches - each resume's best RESUME_TOP_MATCHES matches with the job fields
+        # the recommendations response needs, rebuilt by the matcher (service/top_matches_service.py)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resume_top_matches (
+            resume_id INT NOT NULL,
+            rank_no SMALLINT NOT NULL,
+            match_id INT NOT NULL,
+            job_id INT NOT NULL,
+            job_source ENUM('jobs', 'posted_jobs') NOT NULL,
+            final_score FLOAT,
+            bert_score FLOAT,
+            skill_score FLOAT,
+            education_score FLOAT,
+            experience_score FLOAT,
+            title VARCHAR(255),
+            company VARCHAR(255),
+            location VARCHAR(255),
+            job_type ENUM('full-time', 'part-time', 'internship', 'remote'),
+            salary VARCHAR(255),
+            skills JSON,
+            education JSON,
+            experience JSON,
+            PRIMARY KEY (resume_id, rank_no),
+            FOREIGN KEY (resume_id) REFERENCES resumes(id) ON DELETE CASCADE,
+            INDEX idx_job (job_id, job_source)
+        );
+        """)
+        # Databases scored before the table existed: materialize every resume's list once
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM resume_top_matches), EXISTS (SELECT 1 FROM matches)")
+        has_top_matches, has_matches = cursor.fetchone()
+        if has_matches and not has_top_matches:
+            from service.top_matches_service import refresh_top_matches  # imports this module
+            refresh_top_matches(cursor)
+            print("🔹 Materialized resume_top_matches from existing matches")
+
         conn.commit()
         conn.close()
         print("✅ Database and tables initialized successfully.")
@@ -0,0 +1,66 @@
+from config import EMBEDDING_CACHE_MAX_ENTRIES, MATCHER_FETCH_ROWS
+from service.db import get_connection, evict_overflow
+
+# ---------- EMBEDDING CACHE FUNCTIONS ----------
+def get_cached_embeddings(model: str, text_hashes) -> dict:
+    """Cached embeddings (raw float32 bytes) for the given description hashes: {text_hash: bytes}."""
+    text_hashes = list(text_hashes)
+    if not text_hashes:
+        return {}
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        found = {}
+        for start in range(0, len(text_hashes), MATCHER_FETCH_ROWS):
+            block = text_hashes[start:start + MATCHER_FETCH_ROWS]
+            placeholders = ", ".join(["%s"] * len(block))
+            cursor.execute(f"""
+                SELECT text_hash, embedding FROM embedding_cache
+                WHERE model = %s AND text_hash IN ({placeholders})
+            """, [model] + block)
+            hits = dict(cursor.fetchall())
+            if hits:
+                hit_placeholders = ", ".join(["%s"] * len(hits))
+                cursor.execute(f"""
+                    UPDATE embedding_cache SET last_used_at = CURRENT_TIMESTAMP
+                    WHERE model = %s AND text_hash IN ({hit_placeholders})
+                """, [model] + list(hits))
+            found.update(hits)
+        conn.commit()
+        return found
+    except Exception as e:
+        print(f"⚠️ Embedding cache lookup failed: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+
+def store_cached_embeddings(model: str, embeddings: dict):
+    """Store {text_hash: float32 bytes} and evict the least recently used rows beyond the size limit."""
+    if not embeddings:
+        return
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO embedding_cache (model, text_hash, embedding)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                embedding = VALUES(embedding),
+                last_used_at = CURRENT_TIMESTAMP
+        """, [(model, text_hash, embedding) for text_hash, embedding in embeddings.items()])
+
+        evicted = evict_overflow(cursor, "embedding_cache", EMBEDDING_CACHE_MAX_ENTRIES,
+                                 "last_used_at, model, text_hash")
+        if evicted:
+            print(f"[INFO] Evicted {evicted} embedding cache entries")
+
+        conn.commit()
+    except Exception as e:
+        print(f"⚠️ Embedding cache store failed: {e}")
+    finally:
+        if conn:
+            conn.close()
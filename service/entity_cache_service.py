@@ -0,0 +1,55 @@
+import json
+from config import ENTITY_CACHE_MAX_ENTRIES
+from service.db import get_connection, evict_overflow
+
+# ---------- ENTITY CACHE FUNCTIONS ----------
+def get_cached_entities(cache_key: str):
+    """Return cached entities for a cache key, or None on a miss."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT entities FROM entity_cache WHERE cache_key = %s", (cache_key,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        cursor.execute("""
+            UPDATE entity_cache
+            SET hit_count = hit_count + 1, last_used_at = CURRENT_TIMESTAMP
+            WHERE cache_key = %s
+        """, (cache_key,))
+        conn.commit()
+        return json.loads(row[0])
+    except Exception as e:
+        print(f"⚠️ Entity cache lookup failed: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def store_cached_entities(cache_key: str, entities: dict):
+    """Store extracted entities and evict the least recently used rows beyond the size limit."""
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO entity_cache (cache_key, entities)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE
+                entities = VALUES(entities),
+                last_used_at = CURRENT_TIMESTAMP
+        """, (cache_key, json.dumps(entities, ensure_ascii=False)))
+
+        evicted = evict_overflow(cursor, "entity_cache", ENTITY_CACHE_MAX_ENTRIES, "last_used_at, cache_key")
+        if evicted:
+            print(f"[INFO] Evicted {evicted} entity cache entries")
+
+        conn.commit()
+    except Exception as e:
+        print(f"⚠️ Entity cache store failed: {e}")
+    finally:
+        if conn:
+            conn.close()
@@ -1,17 +1,28 @@
 import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection, sync_job_catalog
+from service.pagination import keyset_query
 from datetime import datetime
 
 # ---------- JOB FUNCTIONS ----------
 def insert_job(title: str, description: str, entities: dict, company: str = None, 
-               location: str = None, creator_email: str = None):
+               location: str = None, creator_email: str = None, upload_job_id: str = None):
     """
-    Insert job into jobs table with creator email and job_source automatically set to 'jobs'
+    Insert job into jobs table with creator email and job_source automatically set to 'jobs'.
+    With upload_job_id the new id is recorded on the background upload in the same transaction,
+    and a retried upload gets the job it already created instead of a duplicate row.
     """
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+
+        if upload_job_id:
+            cursor.execute("SELECT record_id FROM upload_jobs WHERE id = %s FOR UPDATE", (upload_job_id,))
+            row = cursor.fetchone()
+            if row and row[0] is not None:
+                conn.commit()
+                print(f"[INFO] Upload {upload_job_id} already stored job {row[0]}")
+                return row[0]
  
         cursor.execute("""
             INSERT INTO jobs (
@@ -30,9 +41,12 @@ def insert_job(title: str, description: str, entities: dict, company: str = None
             json.dumps(entities.get("experience", []), ensure_ascii=False),
             'jobs'  # Explicitly set job_source to 'jobs'
         ))
+        job_id = cursor.lastrowid
+        sync_job_catalog(cursor, "jobs", [job_id])
+        if upload_job_id:
+            cursor.execute("UPDATE upload_jobs SET record_id = %s WHERE id = %s", (job_id, upload_job_id))
  
         conn.commit()
-        job_id = cursor.lastrowid
         print(f"✅ Job inserted: {title} (ID: {job_id}, Source: jobs)")
         return job_id
     except sql.Error as err:
@@ -47,17 +61,65 @@ def insert_job(title: str, description: str, entities: dict, company: str = None
             conn.close()
 
 
-def get_all_jobs():
-    """Fetch all jobs for dashboard."""
+def insert_jobs_batch(rows: list) -> int:
+    """
+    Insert many jobs in one transaction (bulk ingestion), job_source 'jobs'.
+    rows: dicts with title, description, entities and optional company / location / creator_email.
+    Returns the number of rows inserted (0 on failure, nothing is committed then).
+    """
+    if not rows:
+        return 0
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM jobs")
+        last_id = cursor.fetchone()[0]
+        cursor.executemany("""
+            INSERT INTO jobs (
+                title, description, company, location, creator_email, 
+                skills, education, experience, job_source
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [(
+            row["title"],
+            row["description"],
+            row.get("company"),
+            row.get("location"),
+            row.get("creator_email"),
+            json.dumps(row["entities"].get("skills", []), ensure_ascii=False),
+            json.dumps(row["entities"].get("education", []), ensure_ascii=False),
+            json.dumps(row["entities"].get("experience", []), ensure_ascii=False),
+            'jobs'
+        ) for row in rows])
+        sync_job_catalog(cursor, "jobs", after_id=last_id)
+        conn.commit()
+        print(f"✅ Inserted batch of {len(rows)} jobs")
+        return len(rows)
+    except Exception as e:
+        print(f"❌ Error inserting job batch: {e}")
+        if conn:
+            conn.rollback()
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+JOB_PAGE_KEY = ("created_at", "id")
+
+
+def get_all_jobs(limit: int = None, after: tuple = None):
+    """Fetch jobs for dashboard, newest first; limit/after (created_at, id) select one keyset page."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        tail, params = keyset_query(JOB_PAGE_KEY, after, limit)
         cursor.execute("""
             SELECT id, title, description, skills, education, experience, 
                    company, location, creator_email, job_type, salary, status, created_at
             FROM jobs
-            ORDER BY created_at DESC
-        """)
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -84,18 +146,17 @@ def get_all_jobs():
         return []
 
 
-def get_jobs_by_creator(creator_email: str):
-    """Get all jobs created by a specific recruiter"""
+def get_jobs_by_creator(creator_email: str, limit: int = None, after: tuple = None):
+    """Get jobs created by a specific recruiter, newest first (optionally one keyset page)"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        tail, params = keyset_query(JOB_PAGE_KEY, after, limit, ["creator_email = %s"], [creator_email])
         cursor.execute("""
             SELECT id, title, description, skills, education, experience, 
                    company, location, creator_email, job_type, salary, status, job_source, created_at, updated_at
             FROM jobs
-            WHERE creator_email = %s
-            ORDER BY created_at DESC
-        """, (creator_email,))
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -133,7 +194,7 @@ def update_job(job_id: int, creator_email: str, update_data: dict):
         return dict(zip(columns, row))
 
     try:
-        connection = sql.connect(**DB_CONFIG)
+        connection = get_connection()
         cursor = connection.cursor()
 
         # Verify job belongs to creator
@@ -172,6 +233,7 @@ def update_job(job_id: int, creator_email: str, update_data: dict):
         """
 
         cursor.execute(query, params)
+        sync_job_catalog(cursor, "jobs", [job_id])
         connection.commit()
 
         # Fetch updated job
@@ -1,6 +1,6 @@
-import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection
+from service.pagination import keyset_query, as_float32
 from datetime import datetime
 
 
@@ -14,17 +14,19 @@ def safe_json_loads(data):
 
 
 # ---------- MATCH FUNCTIONS ----------
-def get_match_scores():
-    """Fetch all match scores for admin dashboard."""
+def get_match_scores(limit: int = None, after: tuple = None):
+    """Fetch match scores for admin dashboard, best first; limit/after (final_score, id) select one keyset page."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        if after is not None:
+            after = (as_float32(after[0]),) + tuple(after[1:])
+        tail, params = keyset_query(("m.final_score", "m.id"), after, limit)
         cursor.execute("""
             SELECT m.id, m.resume_id, m.job_id, m.job_source, m.final_score,
                    m.bert_score, m.skill_score, m.education_score, m.experience_score
             FROM matches m
-            ORDER BY m.final_score DESC
-        """)
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -46,33 +48,28 @@ def get_match_scores():
         print(f"❌ Error fetching match scores: {e}")
         return []
 
-def get_matches_for_recruiter(creator_email: str):
+def get_matches_for_recruiter(creator_email: str, limit: int = None, after: tuple = None):
     """
-    Fetch matches for recruiter dashboard with status 'applied'.
+    Fetch matches for recruiter dashboard with status 'applied', most recently updated first.
     Candidate name comes from users table via resumes.user_id.
+    limit/after (updated_at, match id) select one keyset page.
     """
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("""
+        tail, params = keyset_query(
+            ("m.updated_at", "m.id"), after, limit,
+            ["jc.creator_email = %s", "m.save_status = 'applied'"], [creator_email]
+        )
+        query = """
             SELECT m.id, m.resume_id, m.job_id, m.job_source, m.final_score,
-                   j.title, u.username, m.updated_at
+                   jc.title, u.username, m.updated_at
             FROM matches m
-            JOIN jobs j ON m.job_id = j.id AND m.job_source = 'jobs'
+            JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
             JOIN resumes r ON m.resume_id = r.id
             JOIN users u ON r.user_id = u.id
-            WHERE j.creator_email = %s AND m.save_status = 'applied'
-
-            UNION ALL
-
-            SELECT m.id, m.resume_id, m.job_id, m.job_source, m.final_score,
-                   pj.title, u.username, m.updated_at
-            FROM matches m
-            JOIN posted_jobs pj ON m.job_id = pj.id AND m.job_source = 'posted_jobs'
-            JOIN resumes r ON m.resume_id = r.id
-            JOIN users u ON r.user_id = u.id
-            WHERE pj.creator_email = %s AND m.save_status = 'applied'
-        """, (creator_email, creator_email))
+        """ + tail
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         conn.close()
 
@@ -97,35 +94,22 @@ def get_detailed_match_explanation(resume_id, job_id, job_source='jobs'):
     """Get detailed explanation of why a resume matches a job from specific source, including status and updated_at.
     Candidate name comes from users table via resumes.user_id.
     """
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
 
-    if job_source == 'jobs':
-        cursor.execute("""
-        SELECT r.skills AS resume_skills, r.education AS resume_education, r.experience AS resume_experience,
-            j.title AS job_title, j.skills AS job_skills, j.education AS job_education, j.experience AS job_experience,
-            m.final_score, m.bert_score, m.skill_score, m.education_score, m.experience_score,
-            m.updated_at, u.username AS name, c.status AS status
-        FROM matches m
-        JOIN resumes r ON m.resume_id = r.id
-        JOIN users u ON r.user_id = u.id
-        JOIN candidates c ON u.id = c.user_id
-        JOIN jobs j ON m.job_id = j.id AND m.job_source = 'jobs'
-        WHERE m.resume_id = %s AND m.job_id = %s AND m.job_source = 'jobs'
-        """, (resume_id, job_id))
-    else:
-        cursor.execute("""
-        SELECT r.skills AS resume_skills, r.education AS resume_education, r.experience AS resume_experience,
-            pj.title AS job_title, pj.skills AS job_skills, pj.education AS job_education, pj.experience AS job_experience,
-            m.final_score, m.bert_score, m.skill_score, m.education_score, m.experience_score,
-            m.updated_at, u.username AS name, c.status AS status
-        FROM matches m
-        JOIN resumes r ON m.resume_id = r.id
-        JOIN users u ON r.user_id = u.id
-        JOIN candidates c ON u.id = c.user_id
-        JOIN posted_jobs pj ON m.job_id = pj.id AND m.job_source = 'posted_jobs'
-        WHERE m.resume_id = %s AND m.job_id = %s AND m.job_source = 'posted_jobs'
-        """, (resume_id, job_id))
+    source = 'jobs' if job_source == 'jobs' else 'posted_jobs'
+    cursor.execute("""
+    SELECT r.skills AS resume_skills, r.education AS resume_education, r.experience AS resume_experience,
+        jc.title AS job_title, jc.skills AS job_skills, jc.education AS job_education, jc.experience AS job_experience,
+        m.final_score, m.bert_score, m.skill_score, m.education_score, m.experience_score,
+        m.updated_at, u.username AS name, c.status AS status
+    FROM matches m
+    JOIN resumes r ON m.resume_id = r.id
+    JOIN users u ON r.user_id = u.id
+    JOIN candidates c ON u.id = c.user_id
+    JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
+    WHERE m.resume_id = %s AND m.job_id = %s AND m.job_source = %s
+    """, (resume_id, job_id, source))
 
     result = cursor.fetchone()
     conn.close()
@@ -0,0 +1,174 @@
+# service/pagination.py
+"""
+Keyset pagination for list endpoints.
+
+A page is `limit` rows ordered by an indexed sort key (always ending in the row id, so it is
+unique), all columns descending. The cursor is an opaque token holding the sort key of the
+last row returned; the next page seeks past it with a range condition on the index instead
+of OFFSET, so every page costs the same however deep the client goes.
+"""
+import base64
+import json
+import struct
+from datetime import datetime, date
+from decimal import Decimal
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this API (or is from an incompatible endpoint)"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise InvalidCursor("Invalid cursor")
+    return value
+
+
+def encode_cursor(state) -> str:
+    """Opaque, URL-safe cursor for a sort key tuple (or a {list name: sort key} dict)"""
+    if isinstance(state, dict):
+        payload = {name: None if key is None else [_encode_value(v) for v in key] for name, key in state.items()}
+    else:
+        payload = [_encode_value(v) for v in state]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor; raises InvalidCursor for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if isinstance(payload, dict):
+            return {name: None if key is None else tuple(_decode_value(v) for v in key)
+                    for name, key in payload.items()}
+        return tuple(_decode_value(v) for v in payload)
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def as_float32(value: float) -> float:
+    """
+    A FLOAT column value as read by the client (shortest decimal) back to the exact stored
+    single-precision value, so seek comparisons on FLOAT sort keys match ties exactly.
+    """
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def page_limit(limit: int = None) -> int:
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def seek_condition(columns: tuple, after: tuple):
+    """
+    SQL condition (with params) selecting the rows that come after `after` in
+    ORDER BY <columns> DESC, e.g. (created_at < %s OR (created_at = %s AND id < %s)).
+    Returns (None, []) for the first page.
+    """
+    if after is None:
+        return None, []
+    if len(after) != len(columns):
+        raise InvalidCursor("Invalid cursor")
+    clauses = []
+    params = []
+    for i, column in enumerate(columns):
+        terms = [f"{prior} = %s" for prior in columns[:i]] + [f"{column} < %s"]
+        clauses.append("(" + " AND ".join(terms) + ")")
+        params.extend(after[:i])
+        params.append(after[i])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def keyset_query(columns: tuple, after: tuple = None, limit: int = None, conditions: list = None, params: list = None):
+    """
+    WHERE / ORDER BY / LIMIT tail for a keyset page: (sql, params).
+    conditions/params are the query's own filters, ANDed with the seek condition.
+    """
+    conditions = list(conditions or [])
+    params = list(params or [])
+    seek, seek_params = seek_condition(columns, after)
+    if seek:
+        conditions.append(seek)
+        params.extend(seek_params)
+    sql = ""
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(f"{column} DESC" for column in columns)
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+
+def paginate(fetch, key_fields: tuple, limit: int = None, cursor: str = None):
+    """
+    One page from fetch(limit, after) -> list of dicts, ordered by key_fields descending.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    limit = page_limit(limit)
+    after = decode_cursor(cursor) if cursor else None
+    if isinstance(after, dict):
+        raise InvalidCursor("Invalid cursor")
+    rows = fetch(limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(tuple(rows[-1][field] for field in key_fields))
+    return rows, next_cursor
+
+
+def paginate_lists(sources: dict, limit: int = None, cursor: str = None):
+    """
+    Page several lists with one cursor (e.g. jobs and posted_jobs side by side).
+    sources: {name: (fetch, key_fields)}. Each list advances independently, up to `limit` rows
+    per page; lists that are exhausted come back empty. Returns ({name: items}, next_cursor).
+    """
+    limit = page_limit(limit)
+    state = decode_cursor(cursor) if cursor else {name: () for name in sources}
+    if not isinstance(state, dict):
+        raise InvalidCursor("Invalid cursor")
+
+    pages = {}
+    next_state = {}
+    for name, (fetch, key_fields) in sources.items():
+        after = state.get(name)
+        if after is None:
+            # Exhausted on an earlier page (or not part of this cursor)
+            pages[name] = []
+            next_state[name] = None
+            continue
+        rows = fetch(limit + 1, after or None)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_state[name] = tuple(rows[-1][field] for field in key_fields)
+        else:
+            next_state[name] = None
+        pages[name] = rows
+
+    more = any(key is not None for key in next_state.values())
+    return pages, encode_cursor(next_state) if more else None
@@ -1,6 +1,9 @@
 import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection, sync_job_catalog
+from service.pagination import keyset_query
+from service.candidates_service import invalidate_candidate_statistics
+from service.top_matches_service import refresh_top_matches, resumes_affected_by_job
 from datetime import datetime
 
 # ---------- POSTED JOB FUNCTIONS ----------
@@ -11,7 +14,7 @@ def insert_posted_job(title: str, description: str, entities: dict, company: str
     Insert posted job into posted_jobs table with creator email and job_source automatically set to 'posted_jobs'
     """
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
  
         cursor.execute("""
@@ -33,9 +36,10 @@ def insert_posted_job(title: str, description: str, entities: dict, company: str
             json.dumps(entities.get("experience", []), ensure_ascii=False),
             'posted_jobs'  # Explicitly set job_source to 'posted_jobs'
         ))
+        job_id = cursor.lastrowid
+        sync_job_catalog(cursor, "posted_jobs", [job_id])
  
         conn.commit()
-        job_id = cursor.lastrowid
         print(f"✅ Posted job inserted: {title} (ID: {job_id}, Source: posted_jobs)")
         return job_id
     except sql.Error as err:
@@ -49,17 +53,20 @@ def insert_posted_job(title: str, description: str, entities: dict, company: str
             cursor.close()
             conn.close()
 
-def get_all_posted_jobs():
-    """Fetch all posted jobs for dashboard."""
+POSTED_JOB_PAGE_KEY = ("created_at", "id")
+
+
+def get_all_posted_jobs(limit: int = None, after: tuple = None):
+    """Fetch posted jobs for dashboard, newest first; limit/after (created_at, id) select one keyset page."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        tail, params = keyset_query(POSTED_JOB_PAGE_KEY, after, limit)
         cursor.execute("""
             SELECT id, title, description, company, location, job_type, salary, 
                    skills, education, experience, creator_email, status, created_at, updated_at 
             FROM posted_jobs
-            ORDER BY created_at DESC
-        """)
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -87,18 +94,17 @@ def get_all_posted_jobs():
         return []
 
 
-def get_posted_jobs_by_creator(creator_email: str):
-    """Get all posted jobs created by a specific recruiter"""
+def get_posted_jobs_by_creator(creator_email: str, limit: int = None, after: tuple = None):
+    """Get posted jobs created by a specific recruiter, newest first (optionally one keyset page)"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        tail, params = keyset_query(POSTED_JOB_PAGE_KEY, after, limit, ["creator_email = %s"], [creator_email])
         cursor.execute("""
             SELECT id, title, description, company, location, job_type, salary, 
                    skills, education, experience, creator_email, status, job_source, created_at, updated_at 
             FROM posted_jobs
-            WHERE creator_email = %s
-            ORDER BY created_at DESC
-        """, (creator_email,))
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -130,18 +136,26 @@ def get_posted_jobs_by_creator(creator_email: str):
 def delete_posted_job(job_id: int):
     """Delete a posted job."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Delete associated matches and candidates
+        cursor.execute("SELECT DISTINCT creator_email FROM candidates WHERE job_id = %s AND job_source = 'posted_jobs'",
+                       (job_id,))
+        recruiters = [row[0] for row in cursor.fetchall()]
+        affected_resumes = resumes_affected_by_job(cursor, job_id, "posted_jobs")
         cursor.execute("DELETE FROM candidates WHERE job_id = %s AND job_source = 'posted_jobs'", (job_id,))
         cursor.execute("DELETE FROM matches WHERE job_id = %s AND job_source = 'posted_jobs'", (job_id,))
+        refresh_top_matches(cursor, resume_ids=affected_resumes)
         
         # Delete the job
         cursor.execute("DELETE FROM posted_jobs WHERE id = %s", (job_id,))
-        conn.commit()
         rows_affected = cursor.rowcount
+        sync_job_catalog(cursor, "posted_jobs", [job_id])
+        conn.commit()
         conn.close()
+        for recruiter in recruiters:
+            invalidate_candidate_statistics(recruiter)
         
         if rows_affected > 0:
             print(f"✅ Posted job deleted: ID {job_id}")
@@ -166,7 +180,7 @@ def update_posted_job(job_id: int, creator_email: str, update_data: dict):
         return dict(zip(columns, row))
 
     try:
-        connection = sql.connect(**DB_CONFIG)
+        connection = get_connection()
         cursor = connection.cursor()
         
         # First verify the job belongs to the creator
@@ -207,6 +221,7 @@ def update_posted_job(job_id: int, creator_email: str, update_data: dict):
         """
         
         cursor.execute(query, params)
+        sync_job_catalog(cursor, "posted_jobs", [job_id])
         connection.commit()
         
         # Fetch updated job
@@ -1,7 +1,10 @@
-from service.db import init_db
-from matcher import compute_similarity_bert
-import MySQLdb as sql
-from config import DB_CONFIG
+from service.db import init_db, get_connection
+from service.embedding_cache_service import get_cached_embeddings, store_cached_embeddings
+from service.top_matches_service import refresh_top_matches, resumes_affected_by_job
+from matcher import compute_similarity_bert, get_bert_matcher, EMBEDDING_CACHE_KEY
+from config import MATCHER_FETCH_ROWS
+from MySQLdb.cursors import SSCursor
+import numpy as np
 import json
 from models.recommendation_models import SaveJobStatus
 
@@ -14,20 +17,119 @@ def safe_json_loads(data):
     return []
 
 
-def run_matcher():
-    """Run the enhanced BERT matcher and store results into DB"""
-    conn = sql.connect(**DB_CONFIG)
-    cursor = conn.cursor()
+# Matcher input columns, in the positional layout compute_similarity_bert expects
+RESUME_MATCH_COLUMNS = ("id", "user_id", "name", "description", "skills", "education", "experience")
+JOB_MATCH_COLUMNS = ("id", "title", "description", "skills", "education", "experience",
+                     "company", "location", "creator_email")
+DESCRIPTION_HASH = "SHA2(COALESCE(description, ''), 256)"
 
-    # Fetch resumes and jobs
-    cursor.execute("SELECT * FROM resumes")
-    resumes = cursor.fetchall()
+# Recommendation rows: matches joined to the unified job catalog (jc), one relation for both job tables
+RECOMMENDATION_COLUMNS = """jc.source_id AS job_id, jc.title, jc.description, m.final_score,
+            m.bert_score, m.skill_score, m.education_score, m.experience_score,
+            m.job_source, jc.source AS table_source, m.id AS match_id,
+            jc.company, jc.location, jc.job_type, jc.experience,
+            jc.salary, jc.education, jc.skills"""
+
+
+def _stream_rows(conn, query: str, params=()):
+    """Rows of a query read through a server-side cursor, MATCHER_FETCH_ROWS at a time"""
+    cursor = conn.cursor(SSCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            block = cursor.fetchmany(MATCHER_FETCH_ROWS)
+            if not block:
+                return
+            yield from block
+    finally:
+        cursor.close()
 
-    cursor.execute("SELECT * FROM jobs")
-    jobs = cursor.fetchall()
 
-    cursor.execute("SELECT * FROM posted_jobs")
-    posted_jobs = cursor.fetchall()
+def _load_match_rows(conn, table: str, columns: tuple, where: str = "", params=()):
+    """
+    Matcher rows of a table. The description slot holds the description's SHA-256 computed by
+    MySQL, so the LONGTEXT stays on the server; _description_embeddings reads only changed texts.
+    """
+    select = ", ".join(DESCRIPTION_HASH if column == "description" else column for column in columns)
+    return list(_stream_rows(conn, f"SELECT {select} FROM {table} {where}", params))
+
+
+def _description_embeddings(conn, table: str, rows: list, hash_index: int):
+    """
+    Description embeddings aligned with rows. Embeddings of unchanged descriptions come from the
+    embedding cache; only descriptions missing from it are fetched (in blocks) and encoded.
+    """
+    hashes = [row[hash_index] for row in rows]
+    cached = get_cached_embeddings(EMBEDDING_CACHE_KEY, set(hashes))
+
+    missing = {}  # description hash -> id of one row with that description
+    for row in rows:
+        if row[hash_index] not in cached:
+            missing.setdefault(row[hash_index], row[0])
+
+    fresh_by_id = {}
+    missing_ids = list(missing.values())
+    for start in range(0, len(missing_ids), MATCHER_FETCH_ROWS):
+        block_ids = missing_ids[start:start + MATCHER_FETCH_ROWS]
+        placeholders = ", ".join(["%s"] * len(block_ids))
+        texts = list(_stream_rows(conn, f"""
+            SELECT id, {DESCRIPTION_HASH}, COALESCE(description, '') FROM {table} WHERE id IN ({placeholders})
+        """, block_ids))
+        if not texts:
+            continue
+        vectors = get_bert_matcher().encode_texts([text for _, _, text in texts])
+        encoded = {}
+        for (row_id, text_hash, _), vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            fresh_by_id[row_id] = vector
+            encoded[text_hash] = vector.tobytes()
+        store_cached_embeddings(EMBEDDING_CACHE_KEY, encoded)
+        cached.update(encoded)
+
+    if rows:
+        print(f"[INFO] {table}: {len(rows) - len(missing)} description embeddings cached, {len(missing)} encoded")
+
+    vectors = []
+    for text_hash in hashes:
+        if text_hash in cached:
+            vectors.append(np.frombuffer(cached[text_hash], dtype=np.float32))
+        else:
+            # Description changed (or the row was deleted) between the two reads
+            vector = fresh_by_id.get(missing[text_hash])
+            if vector is None:
+                vector = np.asarray(get_bert_matcher().encode_texts([""])[0], dtype=np.float32)
+            vectors.append(vector)
+    return vectors
+
+
+def run_matcher(resume_id: int = None, job_id: int = None, job_source: str = "jobs", resume_id_range: tuple = None):
+    """
+    Run the enhanced BERT matcher and store results into DB.
+    With resume_id, only that resume is scored against all jobs; with resume_id_range
+    (first_id, last_id), one block of resumes is; with job_id, only that job (from job_source)
+    is scored against all resumes. Without any of them, everything is rematched.
+    Input is streamed with explicit columns; descriptions are only read when their embedding
+    is not cached. The affected resumes' resume_top_matches rows are rebuilt in the same transaction.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Fetch resumes and jobs
+    if resume_id is not None:
+        resumes = _load_match_rows(conn, "resumes", RESUME_MATCH_COLUMNS, "WHERE id = %s", (resume_id,))
+    elif resume_id_range is not None:
+        resumes = _load_match_rows(conn, "resumes", RESUME_MATCH_COLUMNS, "WHERE id BETWEEN %s AND %s",
+                                   tuple(resume_id_range))
+    else:
+        resumes = _load_match_rows(conn, "resumes", RESUME_MATCH_COLUMNS)
+
+    if job_id is not None:
+        table = "posted_jobs" if job_source == "posted_jobs" else "jobs"
+        rows = _load_match_rows(conn, table, JOB_MATCH_COLUMNS, "WHERE id = %s", (job_id,))
+        jobs, posted_jobs = ([], rows) if table == "posted_jobs" else (rows, [])
+    else:
+        jobs = _load_match_rows(conn, "jobs", JOB_MATCH_COLUMNS)
+        posted_jobs = _load_match_rows(conn, "posted_jobs", JOB_MATCH_COLUMNS)
 
     if not resumes:
         print("No resumes found in database")
@@ -39,6 +141,10 @@ def run_matcher():
         conn.close()
         return
 
+    resume_embeddings = np.vstack(_description_embeddings(conn, "resumes", resumes, 3))
+    job_embeddings = np.vstack(_description_embeddings(conn, "jobs", jobs, 2)
+                               + _description_embeddings(conn, "posted_jobs", posted_jobs, 2))
+
     print(f"Computing BERT-based matches for {len(resumes)} resumes, {len(jobs) if jobs else 0} jobs, and {len(posted_jobs) if posted_jobs else 0} posted_jobs...")
     
     # Use the new BERT matcher with priority weighting
@@ -47,11 +153,22 @@ def run_matcher():
         weight_bert=0.4,        # BERT semantic similarity
         weight_skills=0.35,     # Skills matching (highest priority)
         weight_education=0.15,  # Education matching  
-        weight_experience=0.1   # Experience matching
+        weight_experience=0.1,  # Experience matching
+        resume_embeddings=resume_embeddings,
+        job_embeddings=job_embeddings
     )
 
-    # Clear old matches that are not saved
-    cursor.execute("DELETE FROM matches WHERE save_status = 'not_saved'")
+    # Clear old matches that are not saved (only those being recomputed)
+    if resume_id is not None:
+        cursor.execute("DELETE FROM matches WHERE save_status = 'not_saved' AND resume_id = %s", (resume_id,))
+    elif resume_id_range is not None:
+        cursor.execute("DELETE FROM matches WHERE save_status = 'not_saved' AND resume_id BETWEEN %s AND %s",
+                       tuple(resume_id_range))
+    elif job_id is not None:
+        cursor.execute("DELETE FROM matches WHERE save_status = 'not_saved' AND job_id = %s AND job_source = %s",
+                       (job_id, job_source))
+    else:
+        cursor.execute("DELETE FROM matches WHERE save_status = 'not_saved'")
 
     # Insert matches with BERT scores
     for r in results:
@@ -69,9 +186,40 @@ def run_matcher():
         """, (r["resume_id"], r["job_id"], r["job_source"], r["creator_email"], r["final_score"], r["bert_score"],
             r["skill_score"], r["education_score"], r["experience_score"]))
 
+    # Rebuild the materialized top matches of the resumes whose scores changed
+    if resume_id is not None:
+        refresh_top_matches(cursor, resume_ids=[resume_id])
+    elif resume_id_range is not None:
+        refresh_top_matches(cursor, resume_id_range=tuple(resume_id_range))
+    elif job_id is not None:
+        refresh_top_matches(cursor, resume_ids=resumes_affected_by_job(cursor, job_id, job_source))
+    else:
+        refresh_top_matches(cursor)
+
     conn.commit()
     conn.close()
     print(f"Stored {len(results)} BERT-enhanced match results")
+    return len(results)
+
+
+def score_resume(resume_id: int):
+    """Score one (new or updated) resume against all jobs"""
+    return run_matcher(resume_id=resume_id)
+
+
+def score_job(job_id: int, job_source: str = "jobs"):
+    """Score one (new or updated) job against all resumes"""
+    return run_matcher(job_id=job_id, job_source=job_source)
+
+
+def plan_rematch_blocks(block_size: int):
+    """Split all resume ids into contiguous (first_id, last_id) blocks of at most block_size resumes"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM resumes ORDER BY id")
+    ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return [(ids[i], ids[min(i + block_size, len(ids)) - 1]) for i in range(0, len(ids), block_size)]
 
 
 def fetch_saved_jobs(resume_id):
@@ -84,30 +232,17 @@ def fetch_saved_jobs(resume_id):
     Returns:
         List of saved job recommendations
     """
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        cursor.execute("""
-        (SELECT j.id AS job_id, j.title, j.description, m.final_score,
-            m.bert_score, m.skill_score, m.education_score, m.experience_score,
-            m.job_source, 'jobs' as table_source, m.id as match_id,
-            j.company, j.location, j.job_type, j.experience,
-            j.salary, j.education, j.skills
-        FROM matches m
-        JOIN jobs j ON m.job_id = j.id AND m.job_source = 'jobs'
-        WHERE m.resume_id = %s AND m.save_status = 'saved')
-        UNION ALL
-        (SELECT pj.id AS job_id, pj.title, pj.description, m.final_score,
-               m.bert_score, m.skill_score, m.education_score, m.experience_score,
-               m.job_source, 'posted_jobs' as table_source, m.id as match_id,
-               pj.company, pj.location, pj.job_type, pj.experience,
-               pj.salary, pj.education, pj.skills
+        cursor.execute(f"""
+        SELECT {RECOMMENDATION_COLUMNS}
         FROM matches m
-        JOIN posted_jobs pj ON m.job_id = pj.id AND m.job_source = 'posted_jobs'
-        WHERE m.resume_id = %s AND m.save_status = 'saved')
-        ORDER BY final_score DESC
-        """, (resume_id, resume_id))
+        JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
+        WHERE m.resume_id = %s AND m.save_status = 'saved'
+        ORDER BY m.final_score DESC
+        """, (resume_id,))
         
         results = cursor.fetchall()
         conn.close()
@@ -145,7 +280,7 @@ def fetch_saved_jobs(resume_id):
 
 
 def get_user_active_resume_id(user_id):
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id FROM resumes
@@ -159,32 +294,19 @@ def get_user_active_resume_id(user_id):
 
 
 def get_top_recommendations(resume_id, top_n=5):
-    """Fetch top N job recommendations for a resume from BOTH jobs and posted_jobs tables"""
-    conn = sql.connect(**DB_CONFIG)
+    """Fetch top N job recommendations for a resume from BOTH jobs and posted_jobs (via job_catalog)"""
+    conn = get_connection()
     cursor = conn.cursor()
 
-    # Updated UNION query to select m.id as match_id
-    cursor.execute("""
-    (SELECT j.id AS job_id, j.title, j.description, m.final_score,
-            m.bert_score, m.skill_score, m.education_score, m.experience_score,
-            m.job_source, 'jobs' as table_source, m.id as match_id,
-            j.company, j.location, j.job_type, j.experience,
-            j.salary, j.education, j.skills
-        FROM matches m
-        JOIN jobs j ON m.job_id = j.id AND m.job_source = 'jobs'
-        WHERE m.resume_id = %s)
-        UNION ALL
-        (SELECT pj.id AS job_id, pj.title, pj.description, m.final_score,
-               m.bert_score, m.skill_score, m.education_score, m.experience_score,
-               m.job_source, 'posted_jobs' as table_source, m.id as match_id,
-               pj.company, pj.location, pj.job_type, pj.experience,
-               pj.salary, pj.education, pj.skills
+    # One relation to join, so idx_resume_score (resume_id, final_score DESC) serves the top N directly
+    cursor.execute(f"""
+        SELECT {RECOMMENDATION_COLUMNS}
         FROM matches m
-        JOIN posted_jobs pj ON m.job_id = pj.id AND m.job_source = 'posted_jobs'
-        WHERE m.resume_id = %s)
-        ORDER BY final_score DESC
-    LIMIT %s
-    """, (resume_id, resume_id, top_n))
+        JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
+        WHERE m.resume_id = %s
+        ORDER BY m.final_score DESC
+        LIMIT %s
+    """, (resume_id, top_n))
 
     results = cursor.fetchall()
     conn.close()
@@ -226,7 +348,7 @@ def update_job_save_status(match_id: int, save_status: SaveJobStatus):
     Returns:
         Dictionary with success status and message
     """
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -282,7 +404,7 @@ def update_job_status_to_applied(match_id: int):
     Returns:
         Dictionary with success status and message
     """
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -337,7 +459,7 @@ def update_job_status_to_closed(match_id: int):
     Returns:
         Dictionary with success status and message
     """
-    conn = sql.connect(**DB_CONFIG)
+    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -406,27 +528,20 @@ def update_job_status_to_closed(match_id: int):
         }   
 
 def get_skills_based_recommendations(resume_id, top_n=5):
-    """Get recommendations prioritized by skills similarity from BOTH tables"""
-    conn = sql.connect(**DB_CONFIG)
+    """Get recommendations prioritized by skills similarity from BOTH job tables (via job_catalog)"""
+    conn = get_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
-    (SELECT j.id AS job_id, j.title, j.description, m.final_score,
-           m.bert_score, m.skill_score, m.education_score, m.experience_score,
-           m.job_source
-    FROM matches m
-    JOIN jobs j ON m.job_id = j.id AND m.job_source = 'jobs'
-    WHERE m.resume_id = %s)
-    UNION ALL
-    (SELECT pj.id AS job_id, pj.title, pj.description, m.final_score,
+    SELECT jc.source_id AS job_id, jc.title, jc.description, m.final_score,
            m.bert_score, m.skill_score, m.education_score, m.experience_score,
            m.job_source
     FROM matches m
-    JOIN posted_jobs pj ON m.job_id = pj.id AND m.job_source = 'posted_jobs'
-    WHERE m.resume_id = %s)
-    ORDER BY skill_score DESC, final_score DESC
+    JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
+    WHERE m.resume_id = %s
+    ORDER BY m.skill_score DESC, m.final_score DESC
     LIMIT %s
-    """, (resume_id, resume_id, top_n))
+    """, (resume_id, top_n))
 
     results = cursor.fetchall()
     conn.close()
@@ -1,45 +1,144 @@
 import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection
+from service.user_profiles_service import apply_resume_to_profile
+from service.pagination import keyset_query
 from datetime import datetime
 
 # ---------- RESUME FUNCTIONS ---------- 
-def insert_resume(name: str, description: str, entities: dict, user_id: int = None):
+def insert_resume(name: str, description: str, entities: dict, user_id: int = None, file_hash: str = None):
     """Insert resume into DB with formatting preserved."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
  
         cursor.execute("""
-            INSERT INTO resumes (user_id, name, description, skills, education, experience)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            INSERT INTO resumes (user_id, name, description, skills, education, experience, file_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
         """, (
             user_id,
             name,
             description,  # ✅ Keep line breaks (\n)
             json.dumps(entities.get("skills", []), ensure_ascii=False),
             json.dumps(entities.get("education", []), ensure_ascii=False),
-            json.dumps(entities.get("experience", []), ensure_ascii=False)
+            json.dumps(entities.get("experience", []), ensure_ascii=False),
+            file_hash
         ))
  
         conn.commit()
         print(f"✅ Resume inserted: {name}")
+        return cursor.lastrowid
     except sql.Error as err:
         print(f"❌ MySQL Error while inserting resume: {err}")
+        return None
     except Exception as e:
         print(f"⚠️ Unexpected Error while inserting resume: {e}")
+        return None
     finally:
         if conn:
             cursor.close()
             conn.close()
  
  
-def get_all_resumes():
-    """Fetch all resumes for dashboard."""
+def delete_resumes_by_user(user_id: int) -> bool:
+    """Delete a user's existing resume rows before storing a new upload (overwrite)."""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, user_id, name, description, skills, education, experience FROM resumes")
+        cursor.execute("DELETE FROM resumes WHERE user_id = %s", (user_id,))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"❌ Error deleting resumes for user {user_id}: {e}")
+        return False
+ 
+ 
+def replace_user_resume(user_id: int, name: str, description: str, entities: dict, file_hash: str,
+                        file_path: str):
+    """
+    Overwrite a user's resume in one transaction on one connection: delete the old rows,
+    insert the new resume and point the profile at it. Returns the new resume id, or None
+    (nothing is committed then).
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM resumes WHERE user_id = %s", (user_id,))
+        replaced = cursor.rowcount
+        cursor.execute("""
+            INSERT INTO resumes (user_id, name, description, skills, education, experience, file_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (
+            user_id,
+            name,
+            description,  # ✅ Keep line breaks (\n)
+            json.dumps(entities.get("skills", []), ensure_ascii=False),
+            json.dumps(entities.get("education", []), ensure_ascii=False),
+            json.dumps(entities.get("experience", []), ensure_ascii=False),
+            file_hash
+        ))
+        resume_id = cursor.lastrowid
+        apply_resume_to_profile(cursor, user_id, name, file_path, entities)
+        conn.commit()
+        print(f"✅ Resume stored for user {user_id} ({replaced} previous record(s) replaced)")
+        return resume_id
+    except Exception as e:
+        print(f"❌ Error replacing resume for user {user_id}: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if conn:
+            conn.close()
+ 
+ 
+def insert_resumes_batch(rows: list) -> int:
+    """
+    Insert many resumes in one transaction (bulk ingestion).
+    rows: dicts with name, description, entities and optional user_id / file_hash.
+    Returns the number of rows inserted (0 on failure, nothing is committed then).
+    """
+    if not rows:
+        return 0
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT INTO resumes (user_id, name, description, skills, education, experience, file_hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [(
+            row.get("user_id"),
+            row["name"],
+            row["description"],
+            json.dumps(row["entities"].get("skills", []), ensure_ascii=False),
+            json.dumps(row["entities"].get("education", []), ensure_ascii=False),
+            json.dumps(row["entities"].get("experience", []), ensure_ascii=False),
+            row.get("file_hash")
+        ) for row in rows])
+        conn.commit()
+        print(f"✅ Inserted batch of {len(rows)} resumes")
+        return len(rows)
+    except Exception as e:
+        print(f"❌ Error inserting resume batch: {e}")
+        if conn:
+            conn.rollback()
+        return 0
+    finally:
+        if conn:
+            conn.close()
+ 
+ 
+def get_all_resumes(limit: int = None, after: tuple = None):
+    """Fetch resumes for dashboard, newest first; limit/after (id,) select one keyset page."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        tail, params = keyset_query(("id",), after, limit)
+        cursor.execute("SELECT id, user_id, name, description, skills, education, experience FROM resumes" + tail,
+                       params)
         rows = cursor.fetchall()
         conn.close()
  
@@ -57,4 +156,103 @@ def get_all_resumes():
         return resumes
     except Exception as e:
         print(f"❌ Error fetching resumes: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+def _resume_row_to_dict(row):
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "name": row[2],
+        "description": row[3],
+        "skills": json.loads(row[4]) if row[4] else [],
+        "education": json.loads(row[5]) if row[5] else [],
+        "experience": json.loads(row[6]) if row[6] else [],
+        "file_hash": row[7],
+    }
+
+
+def get_resume_by_user(user_id: int):
+    """Latest resume of a user, or None."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, user_id, name, description, skills, education, experience, file_hash
+            FROM resumes WHERE user_id = %s ORDER BY id DESC LIMIT 1
+        """, (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return _resume_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"❌ Error fetching resume for user {user_id}: {e}")
+        return None
+
+
+def get_resume_by_hash(file_hash: str):
+    """Any resume stored with this file content hash (used to skip re-extraction), or None."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, user_id, name, description, skills, education, experience, file_hash
+            FROM resumes WHERE file_hash = %s ORDER BY id DESC LIMIT 1
+        """, (file_hash,))
+        row = cursor.fetchone()
+        conn.close()
+        return _resume_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"❌ Error fetching resume by hash: {e}")
+        return None
+
+
+def count_resumes_with_hash(file_hash: str) -> int:
+    """Number of resume rows referencing a stored file (0 means the file can be removed)."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM resumes WHERE file_hash = %s", (file_hash,))
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    except Exception as e:
+        print(f"❌ Error counting resumes by hash: {e}")
+        # Report the file as referenced so it is never deleted on a lookup failure
+        return 1
+
+
+def get_stored_resume_files():
+    """Resumes that have a content-addressed file, for maintenance jobs such as re-extraction."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, user_id, name, file_hash FROM resumes WHERE file_hash IS NOT NULL ORDER BY id")
+        rows = cursor.fetchall()
+        conn.close()
+        return [{"id": row[0], "user_id": row[1], "name": row[2], "file_hash": row[3]} for row in rows]
+    except Exception as e:
+        print(f"❌ Error fetching stored resume files: {e}")
+        return []
+
+
+def update_resume_extraction(resume_id: int, description: str, entities: dict) -> bool:
+    """Replace the stored text and entities of a resume (after re-extraction)."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE resumes SET description = %s, skills = %s, education = %s, experience = %s
+            WHERE id = %s
+        """, (
+            description,
+            json.dumps(entities.get("skills", []), ensure_ascii=False),
+            json.dumps(entities.get("education", []), ensure_ascii=False),
+            json.dumps(entities.get("experience", []), ensure_ascii=False),
+            resume_id
+        ))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"❌ Error updating resume {resume_id}: {e}")
+        return False
@@ -0,0 +1,48 @@
+from cache import TTLCache
+from config import DASHBOARD_STATS_TTL_SECONDS
+from service.db import get_connection, COUNTED_TABLES, counter_trigger_names
+
+# Row counts change on every upload; a few seconds of staleness keeps dashboard polling off the database
+_counts_cache = TTLCache("dashboard_counts", DASHBOARD_STATS_TTL_SECONDS, max_entries=1)
+_triggers_ready = False
+
+
+def _counter_triggers_ready(cursor) -> bool:
+    """True once every counter trigger exists (init_db may have lacked the privilege to create them)"""
+    global _triggers_ready
+    if not _triggers_ready:
+        names = [name for table in COUNTED_TABLES for name in counter_trigger_names(table)]
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM information_schema.TRIGGERS
+            WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN ({', '.join(['%s'] * len(names))})
+        """, names)
+        _triggers_ready = cursor.fetchone()[0] == len(names)
+    return _triggers_ready
+
+
+# ---------- STATS FUNCTIONS ----------
+def _load_table_counts():
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        if _counter_triggers_ready(cursor):
+            cursor.execute("SELECT table_name, row_count FROM table_counters")
+            counts = dict(cursor.fetchall())
+        else:
+            counts = {}
+            for table in COUNTED_TABLES:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cursor.fetchone()[0]
+        return {table: int(counts.get(table, 0)) for table in COUNTED_TABLES}
+    except Exception as e:
+        print(f"❌ Error fetching table counts: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_table_counts():
+    """{table: row count} for COUNTED_TABLES, read from the trigger-maintained counters (None on error)"""
+    return _counts_cache.get_or_load("all", _load_table_counts)
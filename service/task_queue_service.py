@@ -0,0 +1,210 @@
+import json
+from config import TASK_MAX_ATTEMPTS, TASK_RETRY_BASE_SECONDS
+from service.db import get_connection
+
+
+# ---------- TASK QUEUE FUNCTIONS ----------
+def enqueue_task(task_type: str, payload: dict = None, priority: int = 50,
+                 max_attempts: int = TASK_MAX_ATTEMPTS, delay_seconds: int = 0, task_class: str = "batch"):
+    """Insert a queued task; returns its id (None on failure)"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO task_queue (task_type, task_class, payload, priority, max_attempts, run_after)
+            VALUES (%s, %s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+        """, (task_type, task_class, json.dumps(payload or {}, ensure_ascii=False, default=str), priority,
+              max_attempts, delay_seconds))
+        conn.commit()
+        task_id = cursor.lastrowid
+        conn.close()
+        return task_id
+    except Exception as e:
+        print(f"❌ Error enqueueing task {task_type}: {e}")
+        return None
+
+
+def _task_row_to_dict(row):
+    return {
+        "id": row[0],
+        "task_type": row[1],
+        "task_class": row[2],
+        "payload": json.loads(row[3]) if row[3] else {},
+        "priority": row[4],
+        "status": row[5],
+        "attempts": row[6],
+        "max_attempts": row[7],
+        "locked_by": row[8],
+        "locked_until": row[9],
+        "result": json.loads(row[10]) if row[10] else None,
+        "last_error": row[11],
+        "created_at": row[12],
+        "updated_at": row[13],
+    }
+
+
+TASK_COLUMNS = """id, task_type, task_class, payload, priority, status, attempts, max_attempts, locked_by,
+                  locked_until, result, last_error, created_at, updated_at"""
+
+
+def count_running_tasks_by_class(cursor) -> dict:
+    cursor.execute("""
+        SELECT task_class, COUNT(*) FROM task_queue
+        WHERE status = 'running' AND locked_until >= NOW()
+        GROUP BY task_class
+    """)
+    return {task_class: count for task_class, count in cursor.fetchall()}
+
+
+def claim_task(worker_id: str, lease_seconds: int, task_types: list = None, class_limits: dict = None):
+    """
+    Lease the highest-priority runnable task: queued and due, or running with an expired
+    lease (its worker died or stalled). Concurrent workers skip each other's locked rows.
+    class_limits ({task_class: max running}) caps how many tasks of each class run at once
+    across all workers; classes at their limit are not claimed from (best effort, the count
+    is read without locking).
+    Returns the task dict, or None when nothing is runnable.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        type_filter = ""
+        params = []
+        if task_types:
+            type_filter = f"AND task_type IN ({', '.join(['%s'] * len(task_types))})"
+            params.extend(task_types)
+        if class_limits:
+            running = count_running_tasks_by_class(cursor)
+            open_classes = [task_class for task_class, limit in class_limits.items()
+                            if running.get(task_class, 0) < limit]
+            if not open_classes:
+                conn.commit()
+                return None
+            type_filter += f" AND task_class IN ({', '.join(['%s'] * len(open_classes))})"
+            params.extend(open_classes)
+
+        cursor.execute(f"""
+            SELECT id FROM task_queue
+            WHERE ((status = 'queued' AND run_after <= NOW())
+                   OR (status = 'running' AND locked_until < NOW()))
+              {type_filter}
+            ORDER BY priority DESC, id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """, params)
+        row = cursor.fetchone()
+        if not row:
+            conn.commit()
+            return None
+
+        cursor.execute("""
+            UPDATE task_queue
+            SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                locked_until = NOW() + INTERVAL %s SECOND
+            WHERE id = %s
+        """, (worker_id, lease_seconds, row[0]))
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM task_queue WHERE id = %s", (row[0],))
+        task = _task_row_to_dict(cursor.fetchone())
+        conn.commit()
+        return task
+    except Exception as e:
+        print(f"❌ Error claiming task: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def extend_task_lease(task_id: int, worker_id: str, lease_seconds: int) -> bool:
+    """Heartbeat: push the lease forward while a long task is still running"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE task_queue SET locked_until = NOW() + INTERVAL %s SECOND
+            WHERE id = %s AND locked_by = %s AND status = 'running'
+        """, (lease_seconds, task_id, worker_id))
+        conn.commit()
+        extended = cursor.rowcount == 1
+        conn.close()
+        return extended
+    except Exception as e:
+        print(f"❌ Error extending lease of task {task_id}: {e}")
+        return False
+
+
+def complete_task(task_id: int, worker_id: str, result: dict = None) -> bool:
+    """Mark a task done, unless its lease was lost to another worker meanwhile"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE task_queue
+            SET status = 'done', result = %s, locked_by = NULL, locked_until = NULL
+            WHERE id = %s AND locked_by = %s
+        """, (json.dumps(result, ensure_ascii=False, default=str) if result is not None else None, task_id, worker_id))
+        conn.commit()
+        completed = cursor.rowcount == 1
+        conn.close()
+        return completed
+    except Exception as e:
+        print(f"❌ Error completing task {task_id}: {e}")
+        return False
+
+
+def fail_task(task_id: int, worker_id: str, error: str, attempts: int, max_attempts: int) -> str:
+    """
+    Record a failed attempt. The task is retried with exponential backoff
+    (TASK_RETRY_BASE_SECONDS * 2^(attempts-1)) until max_attempts, then marked failed.
+    Returns the new status.
+    """
+    retry = attempts < max_attempts
+    status = "queued" if retry else "failed"
+    backoff = TASK_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1))
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE task_queue
+            SET status = %s, last_error = %s, locked_by = NULL, locked_until = NULL,
+                run_after = NOW() + INTERVAL %s SECOND
+            WHERE id = %s AND locked_by = %s
+        """, (status, error, backoff if retry else 0, task_id, worker_id))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"❌ Error recording failure of task {task_id}: {e}")
+    return status
+
+
+def get_task(task_id: int):
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM task_queue WHERE id = %s", (task_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return _task_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"❌ Error fetching task {task_id}: {e}")
+        return None
+
+
+def get_task_queue_counts() -> dict:
+    """Task counts per status and type, for the metrics endpoint"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT task_type, status, COUNT(*) FROM task_queue GROUP BY task_type, status")
+        rows = cursor.fetchall()
+        conn.close()
+        counts = {}
+        for task_type, status, count in rows:
+            counts.setdefault(task_type, {})[status] = count
+        return counts
+    except Exception as e:
+        print(f"❌ Error fetching task queue counts: {e}")
+        return {}
@@ -0,0 +1,122 @@
+import json
+from config import RESUME_TOP_MATCHES, MATCHER_FETCH_ROWS
+from service.db import get_connection
+
+
+def safe_json_loads(data):
+    if data and data.strip():  # data is not None and not empty/whitespace
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError:
+            print(f"Warning: Failed to parse JSON: {data}")
+    return []
+
+
+# Denormalized copies of the job fields in the recommendations response. Descriptions stay in
+# job_catalog (LONGTEXT, copying them per resume would multiply their storage by RESUME_TOP_MATCHES)
+# and are joined by primary key on read.
+TOP_MATCH_FIELDS = ("match_id", "job_id", "job_source", "final_score", "bert_score", "skill_score",
+                    "education_score", "experience_score", "title", "company", "location", "job_type",
+                    "salary", "skills", "education", "experience")
+
+
+# ---------- REFRESH (called by the matcher inside its transaction) ----------
+def _rebuild(cursor, where: str, params: list):
+    """where filters on the unqualified resume_id column, valid for both statements"""
+    cursor.execute(f"DELETE FROM resume_top_matches {where}", params)
+    cursor.execute(f"""
+        INSERT INTO resume_top_matches (resume_id, rank_no, {", ".join(TOP_MATCH_FIELDS)})
+        SELECT resume_id, rank_no, {", ".join(TOP_MATCH_FIELDS)}
+        FROM (
+            SELECT m.resume_id,
+                   ROW_NUMBER() OVER (PARTITION BY m.resume_id ORDER BY m.final_score DESC, m.id) AS rank_no,
+                   m.id AS match_id, m.job_id, m.job_source, m.final_score, m.bert_score, m.skill_score,
+                   m.education_score, m.experience_score, jc.title, jc.company, jc.location, jc.job_type,
+                   jc.salary, jc.skills, jc.education, jc.experience
+            FROM matches m
+            JOIN job_catalog jc ON jc.source = m.job_source AND jc.source_id = m.job_id
+            {where}
+        ) ranked
+        WHERE rank_no <= %s
+    """, params + [RESUME_TOP_MATCHES])
+
+
+def refresh_top_matches(cursor, resume_ids: list = None, resume_id_range: tuple = None):
+    """
+    Rebuild the materialized top matches of the given resumes (or of a (first_id, last_id)
+    range, or of every resume when neither is given) from matches, in the caller's transaction.
+    """
+    if resume_id_range is not None:
+        _rebuild(cursor, "WHERE resume_id BETWEEN %s AND %s", list(resume_id_range))
+    elif resume_ids is not None:
+        resume_ids = sorted(set(resume_ids))
+        for start in range(0, len(resume_ids), MATCHER_FETCH_ROWS):
+            block = resume_ids[start:start + MATCHER_FETCH_ROWS]
+            _rebuild(cursor, f"WHERE resume_id IN ({', '.join(['%s'] * len(block))})", block)
+    else:
+        _rebuild(cursor, "", [])
+
+
+def resumes_affected_by_job(cursor, job_id: int, job_source: str) -> list:
+    """
+    Resumes whose top list can change after a job was (re)scored or removed: the job is in their
+    list, their list is not full, or the job's new score reaches their lowest listed score.
+    """
+    cursor.execute("""
+        SELECT m.resume_id
+        FROM matches m
+        LEFT JOIN (
+            SELECT resume_id, COUNT(*) AS listed, MIN(final_score) AS lowest
+            FROM resume_top_matches GROUP BY resume_id
+        ) t ON t.resume_id = m.resume_id
+        WHERE m.job_id = %s AND m.job_source = %s
+          AND (t.resume_id IS NULL OR t.listed < %s OR m.final_score >= t.lowest)
+        UNION
+        SELECT resume_id FROM resume_top_matches WHERE job_id = %s AND job_source = %s
+    """, (job_id, job_source, RESUME_TOP_MATCHES, job_id, job_source))
+    return [row[0] for row in cursor.fetchall()]
+
+
+# ---------- READ ----------
+def get_top_matches(resume_id: int, top_n: int = 5):
+    """
+    Top N recommendations of a resume from its materialized list (one primary-key range read),
+    in the get_top_recommendations format. None when top_n exceeds RESUME_TOP_MATCHES.
+    """
+    if top_n > RESUME_TOP_MATCHES:
+        return None
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT t.job_id, t.title, jc.description, t.final_score,
+               t.bert_score, t.skill_score, t.education_score, t.experience_score,
+               t.job_source, t.match_id, t.company, t.location, t.job_type, t.experience,
+               t.salary, t.education, t.skills
+        FROM resume_top_matches t
+        LEFT JOIN job_catalog jc ON jc.source = t.job_source AND jc.source_id = t.job_id
+        WHERE t.resume_id = %s AND t.rank_no <= %s
+        ORDER BY t.rank_no
+    """, (resume_id, top_n))
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [{
+        'job_id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'final_score': row[3],
+        'bert_score': row[4],
+        'skill_score': row[5],
+        'education_score': row[6],
+        'experience_score': row[7],
+        'job_source': row[8],
+        'table_source': row[8],
+        'match_id': row[9],
+        'company': row[10],
+        'location': row[11],
+        'job_type': row[12],
+        'experience': row[13],
+        'salary': row[14],
+        'education': row[15],
+        'skills': safe_json_loads(row[16])
+    } for row in rows]
@@ -0,0 +1,99 @@
+import json
+from service.db import get_connection
+
+# Status progression of a background upload; "failed" can follow any of them
+UPLOAD_STATUSES = ("queued", "extracting", "extracted", "stored", "scored")
+
+
+# ---------- UPLOAD JOB FUNCTIONS ----------
+def create_upload_job(job_id: str, kind: str, user_id: int, owner: str, filename: str,
+                      file_path: str, file_hash: str) -> bool:
+    """
+    Record a queued upload (file already persisted at file_path).
+    owner is the username for resumes and the creator email for jobs.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO upload_jobs (id, kind, user_id, owner, filename, file_path, file_hash, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 'queued')
+        """, (job_id, kind, user_id, owner, filename, file_path, file_hash))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"❌ Error creating upload job: {e}")
+        return False
+
+
+def update_upload_job(job_id: str, status: str, result: dict = None, error: str = None) -> bool:
+    """Move an upload job to a new status; result (if given) replaces the stored result"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        if result is not None:
+            cursor.execute("""
+                UPDATE upload_jobs SET status = %s, result = %s, error = %s WHERE id = %s
+            """, (status, json.dumps(result, ensure_ascii=False, default=str), error, job_id))
+        else:
+            cursor.execute("""
+                UPDATE upload_jobs SET status = %s, error = %s WHERE id = %s
+            """, (status, error, job_id))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"❌ Error updating upload job {job_id}: {e}")
+        return False
+
+
+def _upload_job_row_to_dict(row):
+    return {
+        "job_id": row[0],
+        "kind": row[1],
+        "user_id": row[2],
+        "owner": row[3],
+        "filename": row[4],
+        "file_path": row[5],
+        "file_hash": row[6],
+        "status": row[7],
+        "result": json.loads(row[8]) if row[8] else None,
+        "error": row[9],
+        "created_at": row[10],
+        "updated_at": row[11],
+    }
+
+
+def get_upload_job(job_id: str):
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, kind, user_id, owner, filename, file_path, file_hash, status, result, error, created_at, updated_at
+            FROM upload_jobs WHERE id = %s
+        """, (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return _upload_job_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"❌ Error fetching upload job {job_id}: {e}")
+        return None
+
+
+def count_active_uploads_with_hash(kind: str, file_hash: str, exclude_job_id: str = None) -> int:
+    """Number of uploads that still need the stored file (not yet past extraction into the database)"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM upload_jobs
+            WHERE kind = %s AND file_hash = %s AND status IN ('queued', 'extracting', 'extracted') AND id <> %s
+        """, (kind, file_hash, exclude_job_id or ""))
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    except Exception as e:
+        print(f"❌ Error counting uploads by hash: {e}")
+        # Report the file as in use so it is never deleted on a lookup failure
+        return 1
@@ -1,13 +1,13 @@
-import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection
+from service.pagination import keyset_query
 from datetime import datetime
 
 # ---------- USER PROFILE FUNCTIONS ----------
 def get_user_profile(user_id: int):
     """Get user profile by user_id"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT id, user_id, name, email, experience, skills, education, location, 
@@ -45,7 +45,7 @@ def get_user_profile(user_id: int):
 def update_user_profile(user_id: int, profile_data: dict):
     """Update user profile with provided data and sync to resumes table"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
         # Build dynamic update query based on provided fields
@@ -139,36 +139,36 @@ def update_user_profile(user_id: int, profile_data: dict):
         return False
 
 
+def apply_resume_to_profile(cursor, user_id: int, filename: str, file_path: str, entities: dict):
+    """Write resume file info and extracted entities into user_profiles (caller commits)"""
+    cursor.execute("""
+        UPDATE user_profiles 
+        SET resume_filename = %s, 
+            resume_file_path = %s,
+            skills = %s,
+            experience = %s,
+            education = %s,       
+            upload_date = %s
+        WHERE user_id = %s
+    """, (
+        filename,
+        file_path,
+        json.dumps(entities.get("skills", []), ensure_ascii=False),
+        json.dumps(entities.get("experience", []), ensure_ascii=False),
+        json.dumps(entities.get("education", []), ensure_ascii=False),
+        datetime.now(),
+        user_id
+    ))
+
+
 def update_profile_from_resume(user_id: int, filename: str, file_path: str, entities: dict):
     """Update profile when resume is uploaded and sync to resumes table"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         
-        skills_json = json.dumps(entities.get("skills", []), ensure_ascii=False)
-        experience_json = json.dumps(entities.get("experience", []), ensure_ascii=False)
-        education_json = json.dumps(entities.get("education", []), ensure_ascii=False)
-        upload_date = datetime.now()
-        
         # Update user_profiles table
-        cursor.execute("""
-            UPDATE user_profiles 
-            SET resume_filename = %s, 
-                resume_file_path = %s,
-                skills = %s,
-                experience = %s,
-                education = %s,       
-                upload_date = %s
-            WHERE user_id = %s
-        """, (
-            filename,
-            file_path,
-            skills_json,
-            experience_json,
-            education_json,
-            upload_date,
-            user_id
-        ))
+        apply_resume_to_profile(cursor, user_id, filename, file_path, entities)
         
         conn.commit()
         conn.close()
@@ -181,19 +181,19 @@ def update_profile_from_resume(user_id: int, filename: str, file_path: str, enti
         return False
 
 
-def get_all_user_profiles():
-    """Get all user profiles for admin dashboard"""
+def get_all_user_profiles(limit: int = None, after: tuple = None):
+    """Get user profiles for admin dashboard, most recently updated first; after is (updated_at, id)"""
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
+        tail, params = keyset_query(("up.updated_at", "up.id"), after, limit)
         cursor.execute("""
             SELECT up.id, up.user_id, up.name, up.email, up.experience, up.skills, up.education,
                    up.location, up.resume_filename, up.upload_date, up.completion_percentage,
-                   u.username, u.role
+                   u.username, u.role, up.updated_at
             FROM user_profiles up
             JOIN users u ON up.user_id = u.id
-            ORDER BY up.updated_at DESC
-        """)
+        """ + tail, params)
         rows = cursor.fetchall()
         conn.close()
         
@@ -212,7 +212,8 @@ def get_all_user_profiles():
                 "upload_date": row[9],
                 "completion_percentage": row[10] if row[10] is not None else 0,
                 "username": row[11],
-                "role": row[12]
+                "role": row[12],
+                "updated_at": row[13]
             })
         return profiles
     except Exception as e:
@@ -1,12 +1,17 @@
-import MySQLdb as sql
 import json
-from config import DB_CONFIG
+from service.db import get_connection
+from cache import TTLCache
+from config import AUTH_PRINCIPAL_TTL_SECONDS, AUTH_PRINCIPAL_CACHE_SIZE
 from datetime import datetime
 
+# users rows by email for request authentication. Anything that changes a users row must call
+# invalidate_principal; other API processes pick the change up within the TTL.
+_principal_cache = TTLCache("auth_principals", AUTH_PRINCIPAL_TTL_SECONDS, AUTH_PRINCIPAL_CACHE_SIZE)
+
 # ---------- USER FUNCTIONS ----------
 def create_user(username: str, email: str, password: str, role: str = "user"):
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO users (username, email, password, role)
@@ -22,6 +27,7 @@ def create_user(username: str, email: str, password: str, role: str = "user"):
         
         conn.commit()
         conn.close()
+        invalidate_principal(email)
         return True
     except Exception as e:
         print(f"❌ Error creating user: {e}")
@@ -30,7 +36,7 @@ def create_user(username: str, email: str, password: str, role: str = "user"):
  
 def get_user_by_username(username: str):
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
         user = cursor.fetchone()
@@ -42,7 +48,7 @@ def get_user_by_username(username: str):
     
 def get_user_by_email(email: str):
     try:
-        conn = sql.connect(**DB_CONFIG)
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
         user = cursor.fetchone()
@@ -51,4 +57,12 @@ def get_user_by_email(email: str):
     except Exception as e:
         print(f"❌ Error fetching user: {e}")
         return None
-     
\ No newline at end of file
+
+
+def get_principal(email: str):
+    """users row for an authenticated email, cached for AUTH_PRINCIPAL_TTL_SECONDS (None if unknown)"""
+    return _principal_cache.get_or_load(email, lambda: get_user_by_email(email))
+
+
+def invalidate_principal(email: str):
+    _principal_cache.invalidate(email)
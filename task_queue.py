@@ -0,0 +1,175 @@
+# task_queue.py
+import os
+import socket
+import threading
+import traceback
+from config import (
+    TASK_VISIBILITY_TIMEOUT_SECONDS, TASK_MAX_ATTEMPTS, TASK_POLL_SECONDS,
+    TASK_INTERACTIVE_CONCURRENCY, TASK_BATCH_CONCURRENCY,
+)
+from service.task_queue_service import (
+    enqueue_task, claim_task, extend_task_lease, complete_task, fail_task, get_task_queue_counts,
+)
+
+# Higher runs first
+TASK_PRIORITY_HIGH = 100    # A user is waiting (their own upload, a notification)
+TASK_PRIORITY_NORMAL = 50
+TASK_PRIORITY_LOW = 0       # Batch work (full rematch, re-extraction, bulk imports)
+
+# Priority classes with their own concurrency limits. Interactive tasks outrank batch tasks,
+# and long batch jobs are split into blocks, so a worker picks up waiting interactive work
+# as soon as its current block finishes.
+TASK_CLASS_INTERACTIVE = "interactive"
+TASK_CLASS_BATCH = "batch"
+TASK_CLASS_LIMITS = {
+    TASK_CLASS_INTERACTIVE: TASK_INTERACTIVE_CONCURRENCY,
+    TASK_CLASS_BATCH: TASK_BATCH_CONCURRENCY,
+}
+TASK_CLASS_PRIORITIES = {
+    TASK_CLASS_INTERACTIVE: TASK_PRIORITY_HIGH,
+    TASK_CLASS_BATCH: TASK_PRIORITY_LOW,
+}
+
+# task type -> handler(payload: dict) -> optional result dict. Filled by tasks.py.
+TASK_HANDLERS = {}
+# task type -> on_give_up(payload: dict, error: str), called once a task has failed for good
+TASK_GIVE_UP_HANDLERS = {}
+
+# In-app worker threads (started from the app lifespan when TASK_WORKERS_IN_APP > 0)
+_app_workers = []
+_app_stop = None
+
+
+def register_task(task_type: str, on_give_up=None):
+    """
+    Decorator registering a handler for a task type. Handlers raise to have the task retried;
+    on_give_up(payload, error) runs after the last attempt failed (e.g. to mark a record failed).
+    """
+    def decorator(func):
+        TASK_HANDLERS[task_type] = func
+        if on_give_up is not None:
+            TASK_GIVE_UP_HANDLERS[task_type] = on_give_up
+        return func
+    return decorator
+
+
+def _give_up(task: dict, error: str):
+    on_give_up = TASK_GIVE_UP_HANDLERS.get(task["task_type"])
+    if on_give_up is None:
+        return
+    try:
+        on_give_up(task["payload"], error)
+    except Exception as e:
+        print(f"❌ [ERROR] Give-up handler of task {task['task_type']} #{task['id']} failed: {e}")
+
+
+def submit_task(task_type: str, payload: dict = None, task_class: str = TASK_CLASS_BATCH, priority: int = None,
+                max_attempts: int = TASK_MAX_ATTEMPTS, delay_seconds: int = 0):
+    """
+    Queue a task for the workers; returns the task id (None if it could not be queued).
+    priority defaults to the class priority; it only orders tasks, the class decides the concurrency limit.
+    """
+    if priority is None:
+        priority = TASK_CLASS_PRIORITIES[task_class]
+    task_id = enqueue_task(task_type, payload, priority, max_attempts, delay_seconds, task_class)
+    if task_id is not None:
+        print(f"[INFO] Queued {task_class} task {task_type} #{task_id} (priority {priority})")
+    return task_id
+
+
+class TaskWorker:
+    """
+    Claims tasks from the task_queue table and runs their handlers. While a handler runs its
+    lease is extended periodically; if the worker dies the lease expires after
+    TASK_VISIBILITY_TIMEOUT_SECONDS and another worker picks the task up again.
+    """
+
+    def __init__(self, name: str = None, task_types: list = None, class_limits: dict = None,
+                 lease_seconds: int = TASK_VISIBILITY_TIMEOUT_SECONDS, poll_seconds: float = TASK_POLL_SECONDS):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{name or threading.get_ident()}"
+        self.task_types = task_types
+        self.class_limits = class_limits if class_limits is not None else TASK_CLASS_LIMITS
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+
+    def _heartbeat(self, task_id: int, done: threading.Event):
+        while not done.wait(self.lease_seconds / 3):
+            if not extend_task_lease(task_id, self.worker_id, self.lease_seconds):
+                print(f"[WARNING] Lost lease on task #{task_id}")
+                return
+
+    def run_one(self) -> bool:
+        """Claim and run at most one task; returns False when nothing was runnable"""
+        task = claim_task(self.worker_id, self.lease_seconds, self.task_types, self.class_limits)
+        if task is None:
+            return False
+
+        handler = TASK_HANDLERS.get(task["task_type"])
+        if handler is None:
+            fail_task(task["id"], self.worker_id, f"No handler for task type {task['task_type']}", 1, 1)
+            return True
+        if task["attempts"] > task["max_attempts"]:
+            # Leases kept expiring (worker crashes or timeouts): give up instead of looping forever
+            error = task["last_error"] or "Visibility timeout exceeded"
+            fail_task(task["id"], self.worker_id, error, task["attempts"], task["max_attempts"])
+            _give_up(task, error)
+            return True
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task["id"], done), daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(task["payload"])
+            complete_task(task["id"], self.worker_id, result)
+            print(f"✅ Task {task['task_type']} #{task['id']} done")
+        except Exception as e:
+            traceback.print_exc()
+            status = fail_task(task["id"], self.worker_id, str(e), task["attempts"], task["max_attempts"])
+            print(f"❌ [ERROR] Task {task['task_type']} #{task['id']} attempt {task['attempts']} failed ({status}): {e}")
+            if status == "failed":
+                _give_up(task, str(e))
+        finally:
+            done.set()
+            heartbeat.join()
+        return True
+
+    def run_forever(self, stop_event: threading.Event = None):
+        stop_event = stop_event or threading.Event()
+        print(f"[INFO] Task worker {self.worker_id} started")
+        while not stop_event.is_set():
+            try:
+                if not self.run_one():
+                    stop_event.wait(self.poll_seconds)
+            except Exception as e:
+                print(f"❌ [ERROR] Task worker {self.worker_id} error: {e}")
+                stop_event.wait(self.poll_seconds)
+        print(f"[INFO] Task worker {self.worker_id} stopped")
+
+
+def start_app_task_workers(count: int):
+    """Run `count` worker threads inside the API process (small deployments without task_worker.py)"""
+    global _app_stop
+    if count <= 0 or _app_workers:
+        return
+    _app_stop = threading.Event()
+    for i in range(count):
+        worker = TaskWorker(name=f"app-{i}")
+        thread = threading.Thread(target=worker.run_forever, args=(_app_stop,), daemon=True)
+        thread.start()
+        _app_workers.append(thread)
+
+
+def stop_app_task_workers(timeout: float = 10.0):
+    if _app_stop is None:
+        return
+    _app_stop.set()
+    for thread in _app_workers:
+        thread.join(timeout)
+    _app_workers.clear()
+
+
+def get_task_queue_stats() -> dict:
+    return {
+        "app_workers": len(_app_workers),
+        "tasks": get_task_queue_counts(),
+    }
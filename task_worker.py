@@ -0,0 +1,46 @@
+# task_worker.py
+import argparse
+import multiprocessing
+import tasks
+from task_queue import TaskWorker
+from pdf_loader import log_pdf_extraction_stats
+
+
+def _run_worker(name: str, task_types: list):
+    try:
+        TaskWorker(name=name, task_types=task_types).run_forever()
+    finally:
+        log_pdf_extraction_stats(name)
+
+
+def run_workers(processes: int = 1, task_types: list = None):
+    """Run task queue workers in `processes` worker processes until interrupted"""
+    if processes <= 1:
+        _run_worker("worker-0", task_types)
+        return
+    workers = [
+        multiprocessing.Process(target=_run_worker, args=(f"worker-{i}", task_types))
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background task queue workers")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--types", nargs="*", default=None,
+                        help="Only run these task types (default: all registered types)")
+    parser.add_argument("--submit-rematch", action="store_true",
+                        help="Queue a full rematch (in batch blocks) and exit, e.g. from a nightly cron job")
+    args = parser.parse_args()
+    if args.submit_rematch:
+        tasks.submit_full_rematch()
+    else:
+        run_workers(args.processes, args.types)
@@ -0,0 +1,93 @@
+# tasks.py
+"""Handlers for the durable task queue. Import this module to register them (app and task_worker.py do)."""
+import asyncio
+from config import MATCHER_BLOCK_SIZE
+from task_queue import register_task, submit_task, TASK_CLASS_INTERACTIVE, TASK_CLASS_BATCH
+from service.recommendation_service import run_matcher, plan_rematch_blocks
+from upload_processing import run_upload_job, mark_upload_failed
+from reextract_resumes import reextract_resumes
+from pdf_loader import log_pdf_extraction_stats
+from bulk_ingest import ingest_folder
+from email_invitations.hiring_email_invitation import send_hiring_email
+from email_invitations.rejection_email_invitation import send_rejection_email
+from email_invitations.interview_email_invitation import send_interview_invitation_email, send_status_update_email
+
+EMAIL_SENDERS = {
+    "hiring": send_hiring_email,
+    "rejection": send_rejection_email,
+    "interview": send_interview_invitation_email,
+    "status_update": send_status_update_email,
+}
+
+
+@register_task("run_matcher")
+def run_matcher_task(payload: dict):
+    """One resume / job when resume_id / job_id is given, otherwise an unsplit full rematch"""
+    stored = run_matcher(
+        resume_id=payload.get("resume_id"),
+        job_id=payload.get("job_id"),
+        job_source=payload.get("job_source", "jobs"),
+    )
+    return {"matches": stored or 0}
+
+
+@register_task("rematch")
+def rematch_task(payload: dict):
+    """Full rematch, split into batch blocks so interactive scoring can run between them"""
+    blocks = plan_rematch_blocks(payload.get("block_size") or MATCHER_BLOCK_SIZE)
+    for first_id, last_id in blocks:
+        submit_task("rematch_block", {"first_resume_id": first_id, "last_resume_id": last_id},
+                    task_class=TASK_CLASS_BATCH)
+    return {"blocks": len(blocks)}
+
+
+@register_task("rematch_block")
+def rematch_block_task(payload: dict):
+    stored = run_matcher(resume_id_range=(payload["first_resume_id"], payload["last_resume_id"]))
+    return {"matches": stored or 0}
+
+
+@register_task("send_email")
+def send_email_task(payload: dict):
+    sender = EMAIL_SENDERS[payload["kind"]]
+    if not sender(**payload["kwargs"]):
+        raise RuntimeError(f"Failed to send {payload['kind']} email to {payload['kwargs'].get('candidate_email')}")
+
+
+def _upload_gave_up(payload: dict, error: str):
+    mark_upload_failed(payload["upload_job_id"], error)
+
+
+@register_task("process_upload", on_give_up=_upload_gave_up)
+def process_upload_task(payload: dict):
+    try:
+        asyncio.run(run_upload_job(payload["upload_job_id"]))
+    finally:
+        # Worker processes are not covered by /metrics
+        log_pdf_extraction_stats("task worker")
+
+
+@register_task("reextract_resumes")
+def reextract_resumes_task(payload: dict):
+    reextract_resumes(payload.get("limit"))
+
+
+@register_task("bulk_ingest")
+def bulk_ingest_task(payload: dict):
+    return ingest_folder(payload["folder"], payload.get("type", "resume"))
+
+
+def submit_email(kind: str, **kwargs):
+    """Queue one of the email_invitations senders; returns the task id (None if not queued)"""
+    return submit_task("send_email", {"kind": kind, "kwargs": kwargs}, task_class=TASK_CLASS_INTERACTIVE)
+
+
+def submit_scoring(resume_id: int = None, job_id: int = None, job_source: str = "jobs",
+                   task_class: str = TASK_CLASS_INTERACTIVE):
+    """Queue scoring of a single resume or job (interactive by default, so it runs ahead of rematch blocks)"""
+    return submit_task("run_matcher", {"resume_id": resume_id, "job_id": job_id, "job_source": job_source},
+                       task_class=task_class)
+
+
+def submit_full_rematch(block_size: int = None):
+    return submit_task("rematch", {"block_size": block_size}, task_class=TASK_CLASS_BATCH)
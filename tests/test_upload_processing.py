@@ -0,0 +1,93 @@
+import os
+import asyncio
+import hashlib
+
+import pytest
+
+import upload_processing
+from file_storage import content_path
+
+ENTITIES = {"skills": ["python"], "education": [], "experience": []}
+RESUME_TEXT = "Experienced Python developer with a background in data pipelines. " * 3
+
+
+@pytest.fixture
+def resume_upload(tmp_path, monkeypatch):
+    """A queued background resume upload whose file sits in a temporary upload directory"""
+    contents = b"%PDF-1.4 resume"
+    file_hash = hashlib.sha256(contents).hexdigest()
+    path = content_path(str(tmp_path), file_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(contents)
+
+    upload = {
+        "job_id": "upload-1", "kind": "resume", "user_id": 7, "owner": "alice", "filename": "cv.pdf",
+        "file_path": path, "file_hash": file_hash, "status": "queued", "result": None, "error": None,
+    }
+
+    def update_upload_job(job_id, status, result=None, error=None):
+        upload.update(status=status, error=error)
+        if result is not None:
+            upload["result"] = result
+        return True
+
+    async def update_upload_job_async(job_id, status, result=None, error=None):
+        return update_upload_job(job_id, status, result, error)
+
+    async def get_upload_job(job_id):
+        return dict(upload)
+
+    async def no_resume(*args):
+        return None
+
+    async def extract_text_cached_async(file_path, file_hash):
+        assert os.path.exists(file_path), "stored file was removed before the retry"
+        return RESUME_TEXT
+
+    async def run_cpu_bound(func, *args):
+        return ENTITIES
+
+    async def run_db(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(upload_processing, "RESUME_UPLOAD_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(upload_processing, "update_upload_job", update_upload_job)
+    monkeypatch.setattr(upload_processing.async_db, "update_upload_job", update_upload_job_async)
+    monkeypatch.setattr(upload_processing.async_db, "get_upload_job", get_upload_job)
+    monkeypatch.setattr(upload_processing.async_db, "get_resume_by_user", no_resume)
+    monkeypatch.setattr(upload_processing.async_db, "get_resume_by_hash", no_resume)
+    monkeypatch.setattr(upload_processing, "extract_text_cached_async", extract_text_cached_async)
+    monkeypatch.setattr(upload_processing, "run_cpu_bound", run_cpu_bound)
+    monkeypatch.setattr(upload_processing, "run_db", run_db)
+    # No resume references the file yet, so any cleanup would delete it
+    monkeypatch.setattr(upload_processing, "count_resumes_with_hash", lambda file_hash: 0)
+    monkeypatch.setattr(upload_processing, "count_active_uploads_with_hash", lambda *args: 0)
+    return upload
+
+
+def test_retry_after_failed_resume_store_succeeds(resume_upload, monkeypatch):
+    attempts = []
+    scored = []
+
+    async def replace_user_resume(user_id, filename, raw_text, entities, file_hash, file_path):
+        attempts.append(file_hash)
+        return None if len(attempts) == 1 else 42
+
+    monkeypatch.setattr(upload_processing.async_db, "replace_user_resume", replace_user_resume)
+    monkeypatch.setattr(upload_processing, "score_resume", scored.append)
+
+    # First attempt: the database write fails, the error is recorded and re-raised for the task queue
+    with pytest.raises(RuntimeError):
+        asyncio.run(upload_processing.run_upload_job(resume_upload["job_id"]))
+    assert resume_upload["status"] == "extracted"
+    assert resume_upload["error"] == "Failed to store resume"
+    assert os.path.exists(resume_upload["file_path"])
+
+    # Retry by the task queue: the file is still there and the upload completes
+    asyncio.run(upload_processing.run_upload_job(resume_upload["job_id"]))
+    assert len(attempts) == 2
+    assert resume_upload["status"] == "scored"
+    assert resume_upload["result"]["resume_id"] == 42
+    assert scored == [42]
+    assert os.path.exists(resume_upload["file_path"])
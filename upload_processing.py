@@ -0,0 +1,256 @@
+# upload_processing.py
+import os
+import uuid
+import asyncio
+from config import RESUME_UPLOAD_DIRECTORY, JOB_UPLOAD_DIRECTORY
+from cpu_pool import run_cpu_bound
+from entities import extract_entities
+from file_storage import remove_stored_file
+from pdf_loader import extract_text_cached_async
+from service.resumes_service import count_resumes_with_hash
+from service.recommendation_service import score_resume, score_job
+from service.upload_jobs_service import update_upload_job, get_upload_job, count_active_uploads_with_hash
+from service import async_db
+from service.async_db import run_db
+from task_queue import submit_task, TASK_CLASS_INTERACTIVE
+
+EMPTY_ENTITIES = {"skills": [], "education": [], "experience": []}
+
+
+def _no_status(status: str, result: dict = None):
+    pass
+
+
+def _text_preview(raw_text: str) -> str:
+    return raw_text[:500] + "..." if len(raw_text) > 500 else raw_text
+
+
+def _entities_of(resume: dict) -> dict:
+    return {key: resume[key] for key in ("skills", "education", "experience")}
+
+
+def discard_new_resume_file(saved: dict):
+    """Remove a stored upload that was new to storage and is not referenced by any resume"""
+    if saved and not saved.get("existing") and count_resumes_with_hash(saved["sha256"]) == 0:
+        remove_stored_file(RESUME_UPLOAD_DIRECTORY, saved["sha256"])
+
+
+def discard_upload_file(job: dict):
+    """
+    Remove the stored file of a background upload that no longer needs it, unless a resume
+    references it or another queued upload of the same file still needs it. Job PDFs are never
+    referenced once stored: the jobs row keeps the text.
+    """
+    if count_active_uploads_with_hash(job["kind"], job["file_hash"], job["job_id"]) > 0:
+        return
+    if job["kind"] == "job":
+        remove_stored_file(JOB_UPLOAD_DIRECTORY, job["file_hash"])
+    elif count_resumes_with_hash(job["file_hash"]) == 0:
+        remove_stored_file(RESUME_UPLOAD_DIRECTORY, job["file_hash"])
+
+
+def _remove_previous_file(previous_resume, user_id, username):
+    if previous_resume and previous_resume["file_hash"]:
+        if count_resumes_with_hash(previous_resume["file_hash"]) == 0:
+            remove_stored_file(RESUME_UPLOAD_DIRECTORY, previous_resume["file_hash"])
+        return
+    # Resumes stored before content addressing used a per-user file name
+    legacy_path = os.path.join(RESUME_UPLOAD_DIRECTORY, f"{user_id}_{username}.pdf")
+    if os.path.exists(legacy_path):
+        try:
+            os.remove(legacy_path)
+            print(f"[INFO] Removed legacy resume file for user {user_id}")
+        except Exception as e:
+            print(f"[WARNING] Could not remove legacy resume file: {str(e)}")
+
+
+# -------------------------------
+# Pipelines (shared by sync routes and background workers)
+# -------------------------------
+async def process_resume_file(user_id: int, username: str, saved: dict, filename: str,
+                              on_status=_no_status) -> dict:
+    """
+    Extract, store and attach a resume already persisted in content-addressed storage.
+    on_status(status, result) is called as the upload moves through extracting/extracted/stored.
+    Returns the upload response (status "error" when the PDF has too little text).
+    The stored file is left in place on errors so a retry can read it again; callers discard it
+    once the upload has failed for good.
+    """
+    file_hash = saved["sha256"]
+    file_path = saved["path"]
+    safe_filename = f"{user_id}_{username}.pdf"
+
+    # Identical re-upload of the current resume: nothing to extract or store
+    current_resume = await async_db.get_resume_by_user(user_id)
+    if current_resume and current_resume["file_hash"] == file_hash:
+        print(f"[INFO] Resume for user {user_id} unchanged, skipping extraction")
+        raw_text = current_resume["description"] or ""
+        return {
+            "status": "success",
+            "resume": filename,
+            "resume_id": current_resume["id"],
+            "entities": _entities_of(current_resume),
+            "text_preview": _text_preview(raw_text),
+            "profile_updated": False,
+            "message": "Resume is identical to the one already uploaded; extraction skipped"
+        }
+
+    # Same file uploaded before (by anyone): reuse its text and entities
+    known_resume = await async_db.get_resume_by_hash(file_hash)
+    if known_resume:
+        print(f"[INFO] Known file content, reusing extraction from resume {known_resume['id']}")
+        raw_text = known_resume["description"] or ""
+        entities = _entities_of(known_resume)
+    else:
+        on_status("extracting")
+        # Extract text from the stored file (page-text sidecar if present, otherwise
+        # page ranges in parallel on the CPU pool)
+        raw_text = await extract_text_cached_async(file_path, file_hash)
+
+        if not raw_text or len(raw_text.strip()) < 50:
+            return {
+                "status": "error",
+                "resume": filename,
+                "message": "Could not extract sufficient text from PDF",
+                "entities": EMPTY_ENTITIES,
+                "profile_updated": False
+            }
+
+        print(f"[INFO] Extracted {len(raw_text)} characters from {filename}")
+        entities = await run_cpu_bound(extract_entities, raw_text)
+        print(f"[INFO] Entities extracted: {entities}")
+    on_status("extracted", {"entities": entities})
+
+    # Replace the user's previous resume record and update the profile in one transaction.
+    # Store the raw text (not cleaned) to preserve formatting for preview
+    resume_id = await async_db.replace_user_resume(user_id, safe_filename, raw_text, entities, file_hash, file_path)
+    if resume_id is None:
+        raise RuntimeError("Failed to store resume")
+    profile_updated = True
+
+    # Garbage-collect the previous file once no resume references it any more
+    await run_db(_remove_previous_file, current_resume, user_id, username)
+
+    result = {
+        "status": "success",
+        "resume": filename,
+        "resume_id": resume_id,
+        "entities": entities,
+        "text_preview": _text_preview(raw_text),
+        "profile_updated": profile_updated,
+        "message": "Resume uploaded and profile updated successfully (previous resume overwritten if existed)"
+    }
+    on_status("stored", result)
+    return result
+
+
+async def process_job_file(creator_email: str, saved: dict, filename: str, on_status=_no_status,
+                           upload_job_id: str = None) -> dict:
+    """
+    Extract and store a job description PDF already persisted on disk.
+    upload_job_id makes the insert idempotent for retries of a background upload.
+    """
+    on_status("extracting")
+    raw_text = await extract_text_cached_async(saved["path"], saved["sha256"])
+    if not raw_text or len(raw_text.strip()) < 50:
+        return {
+            "status": "error",
+            "job": filename,
+            "message": "Could not extract sufficient text from PDF",
+            "entities": EMPTY_ENTITIES
+        }
+
+    print(f"[INFO] Extracted {len(raw_text)} characters from {filename}")
+    entities = await run_cpu_bound(extract_entities, raw_text)
+    on_status("extracted", {"entities": entities})
+
+    job_id = await async_db.insert_job(title=filename, description=raw_text, entities=entities,
+                                       creator_email=creator_email, upload_job_id=upload_job_id)
+    if job_id is None:
+        raise RuntimeError("Failed to store job")
+
+    result = {
+        "status": "success",
+        "job_id": job_id,
+        "job": filename,
+        "entities": entities,
+        "text_preview": _text_preview(raw_text)
+    }
+    on_status("stored", result)
+    return result
+
+
+# -------------------------------
+# Async upload mode
+# -------------------------------
+async def submit_upload(kind: str, user_id: int, owner: str, filename: str, saved: dict) -> str:
+    """Record a persisted upload as queued and submit it to the task queue; returns the job ID"""
+    job_id = uuid.uuid4().hex
+    if not await async_db.create_upload_job(job_id, kind, user_id, owner, filename, saved["path"], saved["sha256"]):
+        raise RuntimeError("Failed to queue upload")
+    if await run_db(submit_task, "process_upload", {"upload_job_id": job_id}, task_class=TASK_CLASS_INTERACTIVE) is None:
+        await async_db.update_upload_job(job_id, "failed", error="Could not queue processing task")
+        raise RuntimeError("Failed to queue upload")
+    print(f"[INFO] Queued {kind} upload {job_id} for user {user_id}")
+    return job_id
+
+
+async def run_upload_job(job_id: str):
+    """
+    Process one queued upload: extract -> store -> score, recording each status. Errors are
+    recorded and re-raised so the task queue retries them.
+    A retry after a worker died mid-pipeline resumes from the recorded stage: "stored" uploads
+    only need scoring, earlier stages are redone from the saved file (extraction is cached by hash).
+    """
+    job = await async_db.get_upload_job(job_id)
+    if not job or job["status"] in ("scored", "failed"):
+        return
+
+    result = {}
+    current_status = [job["status"]]
+
+    def on_status(status, stage_result=None):
+        if stage_result is not None:
+            result.clear()
+            result.update(stage_result)
+        current_status[0] = status
+        update_upload_job(job_id, status, stage_result)
+
+    saved = {"path": job["file_path"], "sha256": job["file_hash"], "existing": False}
+    id_key = "resume_id" if job["kind"] == "resume" else "job_id"
+    try:
+        if job["status"] == "stored" and (job["result"] or {}).get(id_key) is not None:
+            outcome = job["result"]
+        elif job["kind"] == "resume":
+            outcome = await process_resume_file(job["user_id"], job["owner"], saved, job["filename"], on_status)
+        else:
+            outcome = await process_job_file(job["owner"], saved, job["filename"], on_status, job_id)
+
+        if outcome["status"] != "success":
+            await async_db.update_upload_job(job_id, "failed", outcome, outcome.get("message"))
+            await run_db(discard_upload_file, job)
+            return
+
+        # Score the new resume/job against the other side (runs the BERT matcher off the event loop)
+        if job["kind"] == "resume":
+            await asyncio.to_thread(score_resume, outcome["resume_id"])
+        else:
+            # The jobs row holds the text now, so the uploaded PDF is no longer needed
+            await run_db(discard_upload_file, job)
+            await asyncio.to_thread(score_job, outcome["job_id"])
+        await async_db.update_upload_job(job_id, "scored", outcome)
+        print(f"✅ Upload {job_id} processed")
+    except Exception as e:
+        # Record the error but keep the stage: the task queue retries (the error may be transient,
+        # e.g. a dropped connection) and mark_upload_failed runs once it gives up
+        print(f"❌ [ERROR] Upload {job_id} failed: {str(e)}")
+        await async_db.update_upload_job(job_id, current_status[0], result or None, str(e))
+        raise
+
+
+def mark_upload_failed(job_id: str, error: str):
+    """Terminal failure of an upload, after the task queue's last attempt: record it and drop the file"""
+    update_upload_job(job_id, "failed", error=error)
+    job = get_upload_job(job_id)
+    if job:
+        discard_upload_file(job)